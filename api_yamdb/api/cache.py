@@ -0,0 +1,134 @@
+"""Кеши API и их инвалидация.
+
+У каждой модели есть версия, которая меняется при любой записи. Ключи
+кешей включают версию, поэтому инвалидация стоит одной записи в кеш и
+не требует перебора ключей. Ответы, привязанные к одному объекту,
+хранятся под ключом с его id и удаляются сигналами. Версии живут
+VERSION_TIMEOUT секунд и должны храниться в кеше, общем для всех
+воркеров (см. checks.py).
+"""
+import threading
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def get_version_key(model, pk=None):
+    key = f'version:{model._meta.label_lower}'
+    return key if pk is None else f'{key}:{pk}'
+
+
+def get_version_timeout():
+    return settings.RESPONSE_CACHE_SETTINGS['VERSION_TIMEOUT']
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), get_version_timeout())
+        version = cache.get(key)
+    return version
+
+
+def set_versions(keys):
+    """Меняет версии сразу и ещё раз после фиксации транзакции, чтобы
+    данные, прочитанные до её фиксации, не остались под новой версией"""
+    cache.set_many(
+        dict.fromkeys(keys, time.time_ns()), get_version_timeout()
+    )
+    transaction.on_commit(lambda: cache.set_many(
+        dict.fromkeys(keys, time.time_ns()), get_version_timeout()
+    ))
+
+
+def get_model_version(model):
+    """Текущая версия модели; при отсутствии в кеше создаётся новая"""
+    return get_version(get_version_key(model))
+
+
+def bump_model_version(*models):
+    """Меняет версии моделей, делая недействительными их кеши"""
+    set_versions([get_version_key(model) for model in models])
+
+
+def get_object_version(model, pk):
+    """Текущая версия отдельного объекта"""
+    return get_version(get_version_key(model, pk))
+
+
+def bump_object_version(model, *pks):
+    if pks:
+        set_versions([get_version_key(model, pk) for pk in pks])
+
+
+def get_request_key(request, ignored_params=()):
+    """Хеш пути и отсортированных параметров запроса"""
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        if name not in ignored_params
+        for value in values
+    )
+    return md5(f'{request.path}?{params}'.encode()).hexdigest()
+
+
+class ResponseCache:
+    """Кеш готовых байтов ответа со счётчиками попаданий.
+
+    Счётчики ведутся в процессе: этого достаточно, чтобы оценить долю
+    попаданий на отдельном воркере.
+    """
+
+    registry = {}
+
+    def __init__(self, name):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.registry[name] = self
+
+    def get_key(self, *parts):
+        return ':'.join((self.name, *map(str, parts)))
+
+    def get(self, *parts):
+        content = cache.get(self.get_key(*parts))
+        with self.lock:
+            if content is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return content
+
+    def set(self, content, *parts):
+        cache.set(
+            self.get_key(*parts), content,
+            settings.RESPONSE_CACHE_SETTINGS['TIMEOUT']
+        )
+
+    def delete_many(self, keys):
+        """Удаляет записи сразу и ещё раз после фиксации транзакции,
+        чтобы не оставить в кеше ответ, прочитанный до её фиксации."""
+        keys = [self.get_key(key) for key in keys]
+        if keys:
+            cache.delete_many(keys)
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
+    @property
+    def hit_ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+    def get_stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hit_ratio,
+        }
+
+
+title_cache = ResponseCache('title')
+list_cache = ResponseCache('list')
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Версии и кеши ответов работают верно, только если кеш общий для
+    всех процессов"""
+    if settings.CACHES['default']['BACKEND'] not in LOCAL_BACKENDS:
+        return []
+    return [Warning(
+        'Кеш по умолчанию не разделяется между процессами: запись в '
+        'одном воркере не меняет версии и кеши ответов в других.',
+        hint=(
+            'Используйте общий кеш (файловый, Redis или Memcached), если '
+            'API обслуживает больше одного процесса.'
+        ),
+        id='api.W001',
+    )]
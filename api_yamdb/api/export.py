@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from reviews.csv_import import TABLES
+
+
+CHUNK_SIZE = 2000
+
+# Выгрузки повторяют колонки файлов static/data.
+EXPORTS = {
+    'titles': TABLES['titles.csv'],
+    'reviews': TABLES['review.csv'],
+    'comments': TABLES['comments.csv'],
+}
+
+
+def format_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat(timespec='milliseconds').replace(
+            '+00:00', 'Z'
+        )
+    return value
+
+
+def iter_rows(table, chunk_size):
+    """Обходит таблицу порциями, не загружая её в память целиком"""
+    attnames = list(table.columns)
+    return table.model.objects.order_by('pk').values_list(
+        *attnames
+    ).iterator(chunk_size=chunk_size)
+
+
+def get_header(table):
+    return [column for column, _ in table.columns.values()]
+
+
+def stream_csv(table, chunk_size=CHUNK_SIZE):
+    """Отдаёт CSV кусками по chunk_size строк, начиная с заголовка"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(get_header(table))
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for number, row in enumerate(iter_rows(table, chunk_size), start=1):
+        writer.writerow([
+            '' if value is None else format_value(value) for value in row
+        ])
+        if number % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_ndjson(table, chunk_size=CHUNK_SIZE):
+    """Отдаёт по JSON-объекту на строку таблицы кусками по chunk_size"""
+    header = get_header(table)
+    lines = []
+    for row in iter_rows(table, chunk_size):
+        lines.append(json.dumps(
+            dict(zip(header, map(format_value, row))), ensure_ascii=False
+        ))
+        if len(lines) == chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
@@ -0,0 +1,94 @@
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+from reviews.search import normalize_search
+
+FTS_TABLE = 'reviews_title_fts'
+
+_fts_tables = {}
+
+
+def fts_available(alias):
+    """Есть ли в базе полнотекстовый индекс; проверяется один раз"""
+    if alias not in _fts_tables:
+        connection = connections[alias]
+        _fts_tables[alias] = (
+            connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_tables[alias]
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """Поиск произведений по индексу FTS5 с сортировкой по релевантности.
+
+    Каждое слово запроса ищется как отдельное слово названия или описания;
+    с ``search_mode=prefix`` — как начало слова, для автодополнения.
+    Явная сортировка ``ordering`` заменяет сортировку по релевантности.
+    Если индекса нет, работает обычный SearchFilter.
+    """
+
+    search_mode_param = 'search_mode'
+
+    def get_match_expression(self, terms, prefix):
+        suffix = '*' if prefix else ''
+        # Индекс хранит текст с ё, заменённой на е.
+        return ' AND '.join(
+            '"{}"{}'.format(
+                term.replace('"', '""').replace('ё', 'е').replace('Ё', 'Е'),
+                suffix
+            )
+            for term in terms
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or not fts_available(queryset.db):
+            return super().filter_queryset(request, queryset, view)
+        prefix = request.query_params.get(self.search_mode_param) == 'prefix'
+        match = self.get_match_expression(terms, prefix)
+        connection = connections[queryset.db]
+        table = connection.ops.quote_name(queryset.model._meta.db_table)
+        # Строки находит MATCH по индексу, а релевантность читается
+        # подзапросом по rowid каждой найденной строки. В отличие от
+        # соединения через extra() это обычные выражения: они сочетаются
+        # с values(), а OrderingFilter заменяет сортировку по рангу.
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (match,)
+        )).alias(search_rank=RawSQL(
+            f'SELECT rank FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id',
+            (match,)
+        )).order_by('search_rank', 'id')
+
+
+class NormalizedSearchFilter(filters.SearchFilter):
+    """Поиск по полям SearchField с нормализованным текстом.
+
+    Запрос нормализуется так же, как значения полей, поэтому регистр, ё
+    и знаки препинания не влияют на совпадение, и ищется целиком, а не
+    по отдельным словам. Префикс ``^`` ищет начало строки диапазоном по
+    индексу, ``=`` — точное совпадение, без префикса ищется подстрока по
+    индексу trigram (см. TrigramContains).
+    """
+
+    lookup_prefixes = {
+        '^': 'prefix',
+        '=': 'exact',
+    }
+
+    def get_search_terms(self, request):
+        term = normalize_search(
+            request.query_params.get(self.search_param, '')
+        )
+        return [term] if term else []
+
+    def construct_search(self, field_name, queryset):
+        lookup = self.lookup_prefixes.get(field_name[0])
+        if lookup:
+            field_name = field_name[1:]
+        else:
+            lookup = 'contains'
+        return f'{field_name}__{lookup}'
@@ -0,0 +1,349 @@
+from datetime import datetime, timezone
+from hashlib import md5
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import MethodNotAllowed, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .cache import get_model_version, get_request_key, list_cache
+
+
+class ParentObjectMixin:
+    """Родительский объект вложенного маршрута, один на запрос.
+
+    parent_lookups сопоставляет поля parent_model аргументам URL, так что
+    один запрос находит родителя и заодно проверяет всю цепочку URL.
+    Найденный объект переиспользуется при построении queryset, проверке
+    данных и сохранении.
+    """
+
+    parent_model = None
+    parent_lookups = {}
+
+    def get_parent_queryset(self):
+        return self.parent_model.objects.filter(**{
+            field: self.kwargs[kwarg]
+            for field, kwarg in self.parent_lookups.items()
+        })
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(self.get_parent_queryset())
+        return self._parent
+
+
+class ConditionalGetMixin:
+    """Условные GET-запросы: ETag, Last-Modified и ответ 304.
+
+    Вьюсет описывает текущее состояние ресурса методом
+    get_resource_version, который возвращает значения для ETag и время
+    последнего изменения. Версия вычисляется без сериализации ответа,
+    поэтому проверка If-None-Match стоит не больше одного лёгкого запроса.
+    """
+
+    version_models = ()
+
+    def get_resource_version(self):
+        """Версии моделей из version_models и время последней записи"""
+        versions = [get_model_version(model) for model in self.version_models]
+        return versions, version_to_datetime(max(versions))
+
+    def add_collection_version(self, related_name, parts, modified):
+        """Дополняет версию количеством, последним id и датой записей
+        related_name родителя из ParentObjectMixin.
+
+        Запрос читает строку родителя и индекс дочерних записей; если
+        родителя нет, ответ 404, даже когда удаление родителя не изменило
+        версии моделей. Страницы курсора стоят одинаково при любом размере
+        коллекции, поэтому для них хватает версий моделей.
+        """
+        cursor_param = getattr(self.paginator, 'cursor_query_param', None)
+        if cursor_param in self.request.query_params:
+            self.get_parent()
+            return parts, modified
+        stats = self.get_parent_queryset().values('pk').annotate(
+            count=Count(related_name),
+            last_id=Max(f'{related_name}__pk'),
+            last_date=Max(f'{related_name}__pub_date'),
+        ).first()
+        if stats is None:
+            raise Http404
+        del stats['pk']
+        if stats['last_date'] and stats['last_date'] > modified:
+            modified = stats['last_date']
+        return (*parts, *stats.values()), modified
+
+    def get_conditional(self, handler, request, *args, **kwargs):
+        parts, modified = self.get_resource_version()
+        etag = quote_etag(md5(repr((
+            request.accepted_media_type, get_request_key(request), *parts
+        )).encode()).hexdigest())
+        last_modified = int(modified.timestamp()) if modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.get_conditional(super().list, request, *args, **kwargs)
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_conditional(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+def version_to_datetime(version):
+    """Время изменения, записанное в версии (наносекунды)"""
+    return datetime.fromtimestamp(version / 10 ** 9, tz=timezone.utc)
+
+
+class CachedListMixin:
+    """Кеширует готовые JSON-страницы списка.
+
+    Ключ страницы складывается из версии модели и нормализованных
+    параметров запроса, включая фильтры, поиск и номер страницы. Запись в
+    модель меняет её версию, и старые страницы просто перестают
+    запрашиваться. Кешируются только чтения: записи идут мимо кеша.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_media_type != JSONRenderer.media_type:
+            return super().list(request, *args, **kwargs)
+        model = self.get_queryset().model
+        key = (
+            model._meta.label_lower,
+            get_model_version(model),
+            get_request_key(request, ('format',)),
+        )
+        content = list_cache.get(*key)
+        if content is None:
+            response = super().list(request, *args, **kwargs)
+            content = request.accepted_renderer.render(
+                response.data, request.accepted_media_type,
+                self.get_renderer_context()
+            )
+            list_cache.set(content, *key)
+        return HttpResponse(content, content_type=JSONRenderer.media_type)
+
+
+class CachedRetrieveMixin:
+    """Кеширует готовый JSON объекта в retrieve_cache по его id."""
+
+    retrieve_cache = None
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_field]
+        if (
+            request.accepted_media_type != JSONRenderer.media_type
+            or not pk.isdigit()
+        ):
+            return super().retrieve(request, *args, **kwargs)
+        content = self.retrieve_cache.get(int(pk))
+        if content is None:
+            serializer = self.get_serializer(self.get_object())
+            content = request.accepted_renderer.render(
+                serializer.data, request.accepted_media_type,
+                self.get_renderer_context()
+            )
+            self.retrieve_cache.set(content, int(pk))
+        return HttpResponse(content, content_type=JSONRenderer.media_type)
+
+
+class RowReadMixin:
+    """Чтение JSON через сериализатор строк values().
+
+    Для действий из row_actions queryset после фильтров превращается в
+    values(), а ответ собирает row_serializer_class простыми словарями,
+    без полей DRF. Остальные форматы, включая браузерный API, идут через
+    обычный сериализатор.
+    """
+
+    row_serializer_class = None
+    row_actions = ('list', 'retrieve')
+
+    def use_rows(self):
+        return (
+            self.action in self.row_actions
+            and getattr(self.request, 'accepted_media_type', None)
+            == JSONRenderer.media_type
+        )
+
+    def get_serializer_class(self):
+        if self.use_rows():
+            return self.row_serializer_class
+        return super().get_serializer_class()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.use_rows():
+            return self.row_serializer_class.get_rows(queryset)
+        return queryset
+
+    def get_batch_objects(self, ids):
+        if not self.use_rows():
+            return super().get_batch_objects(ids)
+        rows = self.row_serializer_class.get_rows(
+            self.get_queryset().filter(pk__in=ids)
+        )
+        return {row['id']: row for row in rows}
+
+
+class BatchListMixin:
+    """Список объектов по id: ``?ids=1,2,3``.
+
+    Объекты читаются одним запросом по id и возвращаются в порядке
+    запроса без пагинации и фильтров; id, которых нет, перечисляются
+    в ``missing``. Число id ограничено BATCH_SETTINGS['MAX_SIZE'].
+    """
+
+    batch_param = 'ids'
+
+    def get_batch_ids(self):
+        value = self.request.query_params[self.batch_param]
+        try:
+            ids = [int(pk) for pk in value.split(',') if pk.strip()]
+        except ValueError:
+            raise ValidationError(
+                {self.batch_param: 'Ожидается список id через запятую.'}
+            )
+        ids = list(dict.fromkeys(ids))
+        max_size = settings.BATCH_SETTINGS['MAX_SIZE']
+        if len(ids) > max_size:
+            raise ValidationError(
+                {self.batch_param: f'Не больше {max_size} id за запрос.'}
+            )
+        return ids
+
+    def get_batch_objects(self, ids):
+        """Объекты с данными id в словаре по id"""
+        return self.get_queryset().in_bulk(ids)
+
+    def list(self, request, *args, **kwargs):
+        if self.batch_param not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        ids = self.get_batch_ids()
+        objects = self.get_batch_objects(ids)
+        serializer = self.get_serializer(
+            [objects[pk] for pk in ids if pk in objects], many=True
+        )
+        return Response({
+            'results': serializer.data,
+            'missing': [pk for pk in ids if pk not in objects],
+        })
+
+
+class BulkWriteMixin:
+    """Массовая запись списком объектов на ``bulk/``.
+
+    POST создаёт объекты, PATCH частично обновляет их по id, DELETE
+    удаляет по списку значений lookup_field. Весь список пишется одной
+    транзакцией: если хотя бы один элемент не прошёл проверку, ничего не
+    сохраняется, а ответ 400 содержит ошибки по позициям списка.
+    Сериализатор записи должен использовать BulkListSerializer.
+    """
+
+    bulk_methods = ('POST', 'DELETE')
+
+    def get_bulk_data(self):
+        data = self.request.data
+        if not isinstance(data, list):
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: ['Ожидается список.']
+            })
+        max_size = settings.BATCH_SETTINGS['MAX_WRITE_SIZE']
+        if len(data) > max_size:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                f'Не больше {max_size} элементов за запрос.'
+            ]})
+        return data
+
+    @action(
+        methods=['post', 'patch', 'delete'], detail=False, url_path='bulk'
+    )
+    def bulk(self, request, *args, **kwargs):
+        if request.method not in self.bulk_methods:
+            raise MethodNotAllowed(request.method)
+        data = self.get_bulk_data()
+        try:
+            with transaction.atomic():
+                if request.method == 'DELETE':
+                    return self.bulk_destroy(data)
+                if request.method == 'PATCH':
+                    return self.bulk_update(data)
+                return self.bulk_create(data)
+        except IntegrityError as error:
+            self.handle_bulk_integrity_error(error)
+            raise
+
+    def handle_bulk_integrity_error(self, error):
+        """Ограничение БД нарушено при фиксации списка.
+
+        Вьюсет может превратить ошибку в ответ 400; по умолчанию она
+        пробрасывается дальше.
+        """
+
+    def bulk_create(self, data):
+        serializer = self.get_serializer(data=data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, data):
+        ids = [
+            item['id'] for item in data
+            if isinstance(item, dict) and isinstance(item.get('id'), int)
+        ]
+        serializer = self.get_serializer(
+            list(self.get_queryset().filter(pk__in=ids)),
+            data=data, many=True, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
+    def bulk_destroy(self, data):
+        queryset = self.get_queryset()
+        opts = queryset.model._meta
+        field = opts.pk if self.lookup_field == 'pk' else opts.get_field(
+            self.lookup_field
+        )
+        values, errors = [], []
+        for value in data:
+            try:
+                values.append(field.to_python(value))
+            except DjangoValidationError as error:
+                errors.append(error.messages)
+            else:
+                errors.append([])
+        if any(errors):
+            raise ValidationError(errors)
+        objects = queryset.filter(**{f'{field.name}__in': values})
+        found = set(objects.values_list(field.name, flat=True))
+        objects.delete()
+        return Response({
+            'deleted': len(found),
+            'missing': [value for value in values if value not in found],
+        })
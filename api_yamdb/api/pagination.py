@@ -0,0 +1,202 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from functools import partial
+from math import ceil
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .cache import get_model_version, get_request_key
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который берёт количество объектов из кеша.
+
+    Если задан estimate_threshold, то при промахе считается не больше
+    estimate_threshold + 1 строк, и для больших выборок возвращается
+    оценка «больше estimate_threshold». Точный подсчёт выполняется,
+    только когда запрошенная страница выходит за пределы оценки.
+    """
+
+    def __init__(self, object_list, per_page, cache_key=None, timeout=None,
+                 estimate_threshold=None, page_number=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.timeout = timeout
+        self.estimate_threshold = estimate_threshold
+        self.page_number = page_number
+        self.is_estimate = False
+
+    def needs_exact_count(self, count):
+        return (
+            self.page_number is None
+            or self.page_number * self.per_page > count
+        )
+
+    @cached_property
+    def count(self):
+        cached = cache.get(self.cache_key) if self.cache_key else None
+        if cached is not None:
+            count, is_estimate = cached
+            if not is_estimate or not self.needs_exact_count(count):
+                self.is_estimate = is_estimate
+                return count
+        count, self.is_estimate = self.count_objects()
+        if self.cache_key:
+            cache.set(
+                self.cache_key, (count, self.is_estimate), self.timeout
+            )
+        return count
+
+    @cached_property
+    def num_pages(self):
+        if self.count and self.is_estimate:
+            # Строк больше оценки, поэтому за ней есть ещё страница.
+            return ceil((self.count + 1) / self.per_page)
+        return super().num_pages
+
+    def count_objects(self):
+        threshold = self.estimate_threshold
+        if threshold is not None:
+            bounded = self.object_list[:threshold + 1].count()
+            if bounded <= threshold:
+                return bounded, False
+            if not self.needs_exact_count(threshold):
+                return threshold, True
+        return super().count, False
+
+
+class CachedCountPagination(PageNumberPagination):
+    """Пагинация номерами страниц с кешированием COUNT(*).
+
+    Количество кешируется по пути и параметрам запроса без параметров
+    страницы. В ключ входит версия модели, поэтому любая запись в модель
+    делает кеш недействительным. Настройки берутся из
+    ``COUNT_CACHE_SETTINGS``.
+    """
+
+    page_params = ('page', 'page_size', 'cursor', 'format')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        options = settings.COUNT_CACHE_SETTINGS
+        self.estimate_threshold = options['ESTIMATE_THRESHOLD']
+        page_number = request.query_params.get(self.page_query_param, 1)
+        self.django_paginator_class = partial(
+            CachedCountPaginator,
+            cache_key=':'.join((
+                'count',
+                queryset.model._meta.label_lower,
+                str(get_model_version(queryset.model)),
+                get_request_key(request, self.page_params),
+            )),
+            timeout=options['TIMEOUT'],
+            estimate_threshold=self.estimate_threshold,
+            page_number=(
+                int(page_number) if str(page_number).isdigit() else None
+            )
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.estimate_threshold is not None:
+            response.data['is_estimate'] = self.page.paginator.is_estimate
+        return response
+
+
+class OptionalCursorPagination(CachedCountPagination):
+    """Пагинация номерами страниц с режимом курсора по запросу.
+
+    Запрос с параметром ``cursor`` (пустым для первой страницы) получает
+    keyset-пагинацию по (pub_date, id): страница выбирается условием по
+    индексу, без OFFSET и COUNT(*), поэтому глубокие страницы стоят
+    столько же, сколько первая.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        reverse, position = self.decode_cursor(
+            request.query_params[self.cursor_query_param]
+        )
+        if position is not None:
+            pub_date, pk = position
+            if reverse:
+                queryset = queryset.filter(pub_date__gte=pub_date).filter(
+                    Q(pub_date__gt=pub_date) | Q(id__gt=pk)
+                )
+            else:
+                queryset = queryset.filter(pub_date__lte=pub_date).filter(
+                    Q(pub_date__lt=pub_date) | Q(id__lt=pk)
+                )
+        ordering = ('pub_date', 'id') if reverse else ('-pub_date', '-id')
+        items = list(queryset.order_by(*ordering)[:page_size + 1])
+        has_more = len(items) > page_size
+        items = items[:page_size]
+        if reverse:
+            items.reverse()
+
+        has_next = has_more if not reverse else position is not None
+        has_previous = has_more if reverse else position is not None
+        self.next_position = (
+            self.get_position(items[-1]) if has_next and items else None
+        )
+        self.previous_position = (
+            self.get_position(items[0]) if has_previous and items else None
+        )
+        return items
+
+    def get_position(self, item):
+        """Позиция (pub_date, id) объекта или строки values()"""
+        if isinstance(item, dict):
+            return item['pub_date'], item['id']
+        return item.pub_date, item.id
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_cursor_link(self.next_position, reverse=False),
+            'previous': self.get_cursor_link(
+                self.previous_position, reverse=True
+            ),
+            'results': data,
+        })
+
+    def get_cursor_link(self, position, reverse):
+        if position is None:
+            return None
+        pub_date, pk = position
+        cursor = urlsafe_b64encode(
+            f'{int(reverse)}|{pub_date.isoformat()}|{pk}'.encode()
+        ).decode()
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.page_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, cursor):
+        """Возвращает направление и позицию (pub_date, id) курсора"""
+        if not cursor:
+            return False, None
+        try:
+            reverse, pub_date, pk = urlsafe_b64decode(
+                cursor.encode()
+            ).decode().split('|')
+            return reverse == '1', (datetime.fromisoformat(pub_date), int(pk))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
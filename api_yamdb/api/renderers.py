@@ -0,0 +1,20 @@
+from rest_framework.renderers import JSONRenderer
+
+
+class CSVRenderer(JSONRenderer):
+    """Выбирает выгрузку в CSV по ``?format=csv`` или заголовку Accept.
+
+    Сами данные отдаются потоковым ответом в обход рендерера; через него
+    проходят только сообщения об ошибках.
+    """
+
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class NDJSONRenderer(JSONRenderer):
+    """Выбирает выгрузку в NDJSON по ``?format=ndjson`` или заголовку
+    Accept."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
@@ -1,12 +1,191 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import prefetch_related_objects
+from django.utils.encoding import smart_str
 from rest_framework import serializers
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator
+
+from reviews.models import Category, Genre, GenreTitle, Title, Review, Comment
+from reviews.signals import bulk_changed
 
-from reviews.models import Category, Genre, Title, Review, Comment
+from .slugs import slug_maps
 
 
 MIN_SCORE = 1
 MAX_SCORE = 10
 
 
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, который находит объект без запроса к БД.
+
+    id берётся из slug_maps, а объект создаётся с отложенными полями:
+    для записи связи и ответа с slug остальные поля не нужны.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        model = self.queryset.model
+        pk = slug_maps[model].get(data)
+        if pk is None:
+            self.fail(
+                'does_not_exist', slug_name=self.slug_field,
+                value=smart_str(data)
+            )
+        return model.from_db(
+            self.queryset.db, ['id', self.slug_field], [pk, data]
+        )
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """Списочный сериализатор массовой записи.
+
+    Уникальность полей при создании проверяется одним запросом на всё
+    поле, а не отдельным запросом на элемент. Создание идёт через
+    bulk_create. Для обновления каждый элемент содержит id объекта из
+    списка instance.
+    """
+
+    unique_message = 'Значение должно быть уникальным.'
+    missing_message = 'Объект с таким id не найден.'
+
+    def pop_unique_fields(self):
+        """Снимает с полей UniqueValidator, чтобы не проверять каждый
+        элемент отдельным запросом"""
+        unique_fields = []
+        for name, field in self.child.fields.items():
+            validators = [
+                validator for validator in field.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+            if len(validators) != len(field.validators):
+                field.validators = validators
+                unique_fields.append(name)
+        return unique_fields
+
+    def check_unique(self, data, unique_fields, errors):
+        model = self.child.Meta.model
+        for name in unique_fields:
+            values = [
+                item.get(name) for item in data if isinstance(item, dict)
+            ]
+            taken = set(model.objects.filter(**{
+                f'{name}__in': [value for value in values
+                                if isinstance(value, str)]
+            }).values_list(name, flat=True))
+            for index, item in enumerate(data):
+                value = item.get(name) if isinstance(item, dict) else None
+                if value is None:
+                    continue
+                if value in taken:
+                    errors[index].setdefault(name, []).append(
+                        ErrorDetail(self.unique_message, code='unique')
+                    )
+                taken.add(value)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+        unique_fields = [] if self.instance is not None else (
+            self.pop_unique_fields()
+        )
+        try:
+            validated = super().to_internal_value(data)
+        except serializers.ValidationError as exc:
+            errors = [dict(item_errors) for item_errors in exc.detail]
+        else:
+            errors = [{} for _ in data]
+        self.check_unique(data, unique_fields, errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated
+
+    def get_instances(self):
+        return {instance.pk: instance for instance in self.instance}
+
+    def run_child_validation(self, data):
+        if self.instance is None:
+            return super().run_child_validation(data)
+        if not hasattr(self, 'instances'):
+            self.instances = self.get_instances()
+        pk = data.get('id') if isinstance(data, dict) else None
+        instance = self.instances.get(pk) if isinstance(pk, int) else None
+        if instance is None:
+            raise serializers.ValidationError({'id': [
+                ErrorDetail(self.missing_message, code='does_not_exist')
+            ]})
+        self.child.instance = instance
+        self.child.initial_data = data
+        return {**super().run_child_validation(data), 'id': instance.pk}
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        objects = model.objects.bulk_create(
+            model(**attrs) for attrs in validated_data
+        )
+        # Новые категории и жанры ещё не входят ни в одно произведение.
+        bulk_changed.send(
+            sender=self.__class__, models=[model], title_ids=[]
+        )
+        return objects
+
+
+class TitleBulkSerializer(BulkListSerializer):
+    """Массовое создание и обновление произведений вместе с жанрами"""
+
+    def set_genres(self, genres):
+        """Записывает жанры произведений {произведение: жанры}"""
+        GenreTitle.objects.filter(title__in=genres).delete()
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for title, title_genres in genres.items()
+            for genre in title_genres
+        )
+
+    def create(self, validated_data):
+        genres = [attrs.pop('genre', []) for attrs in validated_data]
+        titles = Title.objects.bulk_create(
+            Title(**attrs) for attrs in validated_data
+        )
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for title, title_genres in zip(titles, genres)
+            for genre in title_genres
+        )
+        prefetch_related_objects(titles, 'genre')
+        bulk_changed.send(
+            sender=self.__class__, models=[Title, GenreTitle],
+            title_ids=[title.pk for title in titles]
+        )
+        return titles
+
+    def update(self, instance, validated_data):
+        instances = self.get_instances()
+        titles, fields, genres = {}, set(), {}
+        for attrs in validated_data:
+            title = instances[attrs.pop('id')]
+            if 'genre' in attrs:
+                genres[title] = attrs.pop('genre')
+            for name, value in attrs.items():
+                setattr(title, name, value)
+            fields.update(attrs)
+            titles[title.pk] = title
+        titles = list(titles.values())
+        if fields:
+            Title.objects.bulk_update(titles, fields)
+        if genres:
+            self.set_genres(genres)
+        prefetch_related_objects(titles, 'genre')
+        bulk_changed.send(
+            sender=self.__class__, models=[Title, GenreTitle],
+            title_ids=[title.pk for title in titles]
+        )
+        return titles
+
+
 class CategorySerializer(serializers.ModelSerializer):
     """Сериализатор для категорий"""
 
@@ -14,6 +193,7 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
         fields = ('name', 'slug')
         lookup_field = 'slug'
+        list_serializer_class = BulkListSerializer
 
 
 class GenreSerializer(serializers.ModelSerializer):
@@ -23,6 +203,7 @@ class GenreSerializer(serializers.ModelSerializer):
         model = Genre
         fields = ('name', 'slug')
         lookup_field = 'slug'
+        list_serializer_class = BulkListSerializer
 
 
 class TitleReadSerializer(serializers.ModelSerializer):
@@ -38,7 +219,9 @@ class TitleReadSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = (
+            'id', 'category', 'genre', 'rating', 'name', 'year', 'description'
+        )
         labels = {
             'name': 'Название',
             'year': 'Год выпуска',
@@ -51,12 +234,12 @@ class TitleReadSerializer(serializers.ModelSerializer):
 class TitleWriteSerializer(serializers.ModelSerializer):
     """Сериализатор для создания произведений"""
 
-    category = serializers.SlugRelatedField(
+    category = CachedSlugRelatedField(
         slug_field='slug',
         queryset=Category.objects.all(),
         label='Категория'
     )
-    genre = serializers.SlugRelatedField(
+    genre = CachedSlugRelatedField(
         slug_field='slug',
         queryset=Genre.objects.all(),
         many=True,
@@ -65,13 +248,63 @@ class TitleWriteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = ('id', 'category', 'genre', 'name', 'year', 'description')
+        list_serializer_class = TitleBulkSerializer
         labels = {
             'name': 'Название',
             'year': 'Год выпуска',
             'description': 'Описание',
         }
 
+    def create(self, validated_data):
+        return self.save_references(super().create, validated_data)
+
+    def update(self, instance, validated_data):
+        return self.save_references(super().update, instance, validated_data)
+
+    def save_references(self, save, *args):
+        """Сохраняет произведение и жанры в своей транзакции.
+
+        Категория или жанр, удалённые после загрузки slug_maps, не
+        проходят проверку внешнего ключа при фиксации; тогда словари
+        сбрасываются, и ответ — такая же ошибка 400, как для
+        несуществующего slug.
+        """
+        try:
+            with transaction.atomic():
+                return save(*args)
+        except IntegrityError:
+            errors = self.get_missing_references()
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors)
+
+    def get_missing_references(self):
+        errors = {}
+        for name in ('category', 'genre'):
+            field = self.fields[name]
+            field = getattr(field, 'child_relation', field)
+            model = field.queryset.model
+            slug_maps[model].clear()
+            value = self.validated_data.get(name)
+            slugs = [
+                obj.slug for obj in (
+                    value if isinstance(value, list) else [value]
+                ) if obj is not None
+            ]
+            existing = set(model.objects.filter(slug__in=slugs).values_list(
+                'slug', flat=True
+            ))
+            missing = [slug for slug in slugs if slug not in existing]
+            if missing:
+                errors[name] = [ErrorDetail(
+                    field.error_messages['does_not_exist'].format(
+                        slug_name=field.slug_field, value=missing[0]
+                    ),
+                    code='does_not_exist'
+                )]
+        return errors
+
 
 class ReviewSerializer(serializers.ModelSerializer):
     """Сериализатор для отзывов"""
@@ -98,17 +331,27 @@ class ReviewSerializer(serializers.ModelSerializer):
             )
         return value
 
-    def validate(self, data):
-        if self.context['request'].method == 'POST':
-            title_id = self.context['view'].kwargs.get('title_id')
-            user = self.context['request'].user
-
-            if Review.objects.filter(title_id=title_id, author=user).exists():
-                raise serializers.ValidationError(
-                    "Вы уже оставили отзыв на это произведение"
-                )
+    def create(self, validated_data):
+        """Отзыв вставляется без предварительной проверки.
 
-        return data
+        Повторный отзыв отклоняет ограничение unique_review_per_author;
+        вставка идет в точке сохранения, чтобы ошибка не прерывала
+        внешнюю транзакцию.
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=validated_data['title'],
+                author=validated_data['author']
+            ).exists():
+                raise
+        raise serializers.ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [
+                'Вы уже оставили отзыв на это произведение'
+            ]
+        })
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -127,3 +370,101 @@ class CommentSerializer(serializers.ModelSerializer):
             'text': 'Текст комментария',
             'pub_date': 'Дата публикации',
         }
+
+
+class RowSerializer:
+    """Сериализатор только для чтения, собирающий ответ из строк values().
+
+    Повторяет вывод обычного сериализатора ресурса без полей DRF: строки
+    читаются запросом get_rows, связанные данные догружаются в prepare
+    одним запросом на страницу, а словарь строит to_representation,
+    который задает подкласс.
+    Поддерживает ту часть интерфейса сериализатора, которой пользуются
+    list и retrieve: instance, many и data.
+    """
+
+    values = ()
+
+    def __init__(self, instance=None, many=False, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.context = kwargs.get('context', {})
+
+    @classmethod
+    def get_rows(cls, queryset):
+        return queryset.prefetch_related(None).values(*cls.values)
+
+    def prepare(self, rows):
+        """Загружает данные, общие для строк страницы"""
+
+    @property
+    def data(self):
+        rows = list(self.instance) if self.many else [self.instance]
+        self.prepare(rows)
+        data = [self.to_representation(row) for row in rows]
+        return data if self.many else data[0]
+
+
+format_datetime = serializers.DateTimeField().to_representation
+
+
+class TitleRowSerializer(RowSerializer):
+    """Вывод TitleReadSerializer из строк values()"""
+
+    values = (
+        'id', 'category__name', 'category__slug', 'rating', 'name', 'year',
+        'description'
+    )
+
+    def prepare(self, rows):
+        self.genres = defaultdict(list)
+        if not rows:
+            return
+        # Тот же запрос, что у prefetch_related('genre'), и тот же порядок.
+        for title_id, name, slug in Genre.objects.filter(
+            title__in=[row['id'] for row in rows]
+        ).values_list('title', 'name', 'slug'):
+            self.genres[title_id].append({'name': name, 'slug': slug})
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'category': {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            } if row['category__slug'] is not None else None,
+            'genre': self.genres[row['id']],
+            'rating': row['rating'],
+            'name': row['name'],
+            'year': row['year'],
+            'description': row['description'],
+        }
+
+
+class ReviewRowSerializer(RowSerializer):
+    """Вывод ReviewSerializer из строк values()"""
+
+    values = ('id', 'text', 'author__username', 'score', 'pub_date')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'score': row['score'],
+            'pub_date': format_datetime(row['pub_date']),
+        }
+
+
+class CommentRowSerializer(RowSerializer):
+    """Вывод CommentSerializer из строк values()"""
+
+    values = ('id', 'text', 'author__username', 'pub_date')
+
+    def to_representation(self, row):
+        return {
+            'id': row['id'],
+            'text': row['text'],
+            'author': row['author__username'],
+            'pub_date': format_datetime(row['pub_date']),
+        }
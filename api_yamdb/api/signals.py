@@ -0,0 +1,148 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete
+)
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.signals import bulk_changed
+
+from .cache import bump_model_version, bump_object_version, title_cache
+from .suggest import suggest_index
+
+User = get_user_model()
+
+# Модели, чьё представление в API зависит от записей модели-ключа.
+DEPENDENT_MODELS = {
+    Category: (Category, Title),
+    Genre: (Genre, Title),
+    GenreTitle: (GenreTitle, Title),
+    Title: (Title,),
+    Review: (Review,),
+    Comment: (Comment,),
+    User: (User,),
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_version_on_write(sender, **kwargs):
+    """Меняет версии модели и зависящих от неё моделей при записи"""
+    if sender in DEPENDENT_MODELS and sender is not User:
+        bump_model_version(*DEPENDENT_MODELS[sender])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_user_version(sender, instance, created=False, **kwargs):
+    """Версия пользователей входит в ETag отзывов и комментариев, где
+    виден только username автора. Остальные записи пользователя, например
+    код подтверждения при регистрации, версию не меняют."""
+    if kwargs['signal'] is post_save and (
+        created or 'username' not in getattr(
+            instance, 'changed_claims', {'username'}
+        )
+    ):
+        return
+    bump_model_version(*DEPENDENT_MODELS[User])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_version_on_genre_change(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_model_version(*DEPENDENT_MODELS[GenreTitle])
+
+
+@receiver(bulk_changed)
+def bump_version_on_bulk_change(sender, models, **kwargs):
+    """Меняет версии после массовых операций в обход сигналов моделей"""
+    bump_model_version(*{
+        dependent for model in models
+        for dependent in DEPENDENT_MODELS.get(model, (model,))
+    })
+
+
+def get_title_ids(**lookups):
+    return list(Title.objects.filter(**lookups).values_list('pk', flat=True))
+
+
+def invalidate_titles(pks):
+    """Сбрасывает кеш ответов и версии произведений"""
+    title_cache.delete_many(pks)
+    bump_object_version(Title, *pks)
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    """Сбрасывает кеш произведения, в том числе после пересчёта рейтинга
+    при записи отзыва"""
+    invalidate_titles([instance.pk])
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def invalidate_genre_title(sender, instance, **kwargs):
+    invalidate_titles([instance.title_id])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if not reverse:
+        if action.startswith('post_'):
+            invalidate_titles([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        invalidate_titles(pk_set)
+    elif action == 'pre_clear':
+        invalidate_titles(get_title_ids(genre=instance))
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def invalidate_category_titles(sender, instance, created=False, **kwargs):
+    if not created:
+        invalidate_titles(get_title_ids(category=instance))
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def invalidate_genre_titles(sender, instance, created=False, **kwargs):
+    if not created:
+        invalidate_titles(get_title_ids(genre=instance))
+
+
+@receiver(bulk_changed)
+def invalidate_titles_on_bulk_change(sender, models, title_ids=None,
+                                     **kwargs):
+    if title_ids is not None:
+        invalidate_titles(title_ids)
+    elif {Title, GenreTitle, Category, Genre} & set(models):
+        invalidate_titles(get_title_ids())
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Category)
+def update_suggest_index(sender, instance, **kwargs):
+    transaction.on_commit(lambda: suggest_index.update(sender, instance))
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Category)
+def remove_from_suggest_index(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: suggest_index.remove(sender, pk))
+
+
+@receiver(bulk_changed)
+def reset_suggest_index(sender, models, title_ids=None, **kwargs):
+    """Перечитывает изменённые произведения, если известны их id, иначе
+    сбрасывает индекс"""
+    if title_ids is not None and set(models) <= {Title, GenreTitle}:
+        pks = list(title_ids)
+        transaction.on_commit(lambda: suggest_index.refresh(Title, pks))
+    elif {Title, Genre, Category} & set(models):
+        suggest_index.reset()
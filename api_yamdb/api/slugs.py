@@ -0,0 +1,55 @@
+"""Соответствие slug → id категорий и жанров в памяти процесса.
+
+Таблицы маленькие и меняются редко, поэтому словарь загружается
+целиком одним запросом и перечитывается, только когда меняется версия
+модели в кеше. Версию меняют сигналы записи модели и bulk_changed, так
+что изменения из других процессов видны при общем кеше. Промах
+проверяется запросом к базе, а ссылку на объект, удалённый после
+загрузки словаря, отклоняет внешний ключ при записи.
+"""
+import threading
+
+from reviews.models import Category, Genre
+
+from .cache import get_model_version
+
+
+class SlugMap:
+
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+        self.version = None
+        self.ids = {}
+
+    def get(self, slug):
+        """id объекта со slug или None.
+
+        slug, которого нет в словаре, ищется одним запросом по индексу:
+        объект мог появиться в обход сигналов, не меняя версию.
+        """
+        version = get_model_version(self.model)
+        with self.lock:
+            if version != self.version:
+                self.ids = dict(
+                    self.model.objects.values_list('slug', 'pk').iterator()
+                )
+                self.version = version
+            pk = self.ids.get(slug)
+        if pk is not None:
+            return pk
+        pk = self.model.objects.filter(slug=slug).values_list(
+            'pk', flat=True
+        ).first()
+        if pk is not None:
+            with self.lock:
+                self.ids[slug] = pk
+        return pk
+
+    def clear(self):
+        with self.lock:
+            self.version = None
+            self.ids = {}
+
+
+slug_maps = {model: SlugMap(model) for model in (Category, Genre)}
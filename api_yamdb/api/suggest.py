@@ -0,0 +1,320 @@
+"""Индекс автодополнения по названиям произведений, жанров и категорий.
+
+Индекс хранится в памяти процесса: отсортированный список пар
+(нормализованный хвост названия, id) по каждому слову названия, поэтому
+префикс ищется двоичным поиском. Индекс строится при первом запросе и
+обновляется сигналами моделей после фиксации транзакции; записи других
+процессов попадают в него при фоновом перестроении раз в
+REBUILD_SECONDS.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection
+
+from reviews.models import Category, Genre, Title
+from reviews.search import MAX_CHAR, normalize_search
+
+
+def get_keys(name, pk):
+    words = normalize_search(name).split()
+    return [(' '.join(words[start:]), pk) for start in range(len(words))]
+
+
+def rank_by_name(item):
+    return (item['name'],)
+
+
+def rank_by_rating(item):
+    return (-(item['rating'] or 0), item['name'])
+
+
+class PrefixIndex:
+    """Ключи названий одной модели, порядок выдачи и данные для ответа.
+
+    keys — отсортированные пары (хвост названия, id) для поиска префикса,
+    order — пары (rank(item), id) в порядке выдачи. Короткий диапазон
+    совпадений просматривается целиком; длинный, где совпадений много,
+    — по порядку выдачи до первых limit совпадений. В обоих случаях
+    ответ точный.
+    """
+
+    def __init__(self, rank=rank_by_name):
+        self.rank = rank
+        self.keys = []
+        self.order = []
+        # id -> (название, данные ответа, ' ' + нормализованное название,
+        # позиция в order)
+        self.items = {}
+
+    def get_entry(self, pk, name, item):
+        return (
+            name, item, ' ' + normalize_search(name), (self.rank(item), pk)
+        )
+
+    def add(self, pk, name, item):
+        self.remove(pk)
+        self.items[pk] = self.get_entry(pk, name, item)
+        for key in get_keys(name, pk):
+            insort(self.keys, key)
+        insort(self.order, self.items[pk][3])
+
+    def set_item(self, pk, item):
+        """Заменяет данные ответа объекта без изменения названия"""
+        if pk not in self.items:
+            return
+        name, _, text, position = self.items[pk]
+        self.discard(self.order, position)
+        self.items[pk] = (name, item, text, (self.rank(item), pk))
+        insort(self.order, self.items[pk][3])
+
+    @staticmethod
+    def discard(values, value):
+        index = bisect_left(values, value)
+        if index < len(values) and values[index] == value:
+            del values[index]
+
+    def remove(self, pk):
+        if pk not in self.items:
+            return
+        name, _, _, position = self.items.pop(pk)
+        for key in get_keys(name, pk):
+            self.discard(self.keys, key)
+        self.discard(self.order, position)
+
+    def load(self, rows):
+        """Заполняет индекс строками (pk, name, item) одной сортировкой"""
+        self.items = {
+            pk: self.get_entry(pk, name, item) for pk, name, item in rows
+        }
+        self.keys = sorted(
+            key for pk, (name, *_) in self.items.items()
+            for key in get_keys(name, pk)
+        )
+        self.order = sorted(entry[3] for entry in self.items.values())
+
+    def find(self, prefix, limit, max_scan):
+        """Первые limit объектов в порядке rank, у которых слово названия
+        начинается с prefix"""
+        start = bisect_left(self.keys, (prefix,))
+        end = bisect_left(self.keys, (prefix + MAX_CHAR,), start)
+        if end - start > max_scan:
+            # Совпадений много, и первые limit встречаются в начале
+            # порядка выдачи. Обход ограничен размером диапазона, так что
+            # он не дороже полного просмотра.
+            needle = ' ' + prefix
+            found = []
+            for _, pk in islice(self.order, end - start):
+                if needle in self.items[pk][2]:
+                    found.append(self.items[pk][1])
+                    if len(found) == limit:
+                        return found
+            if end - start >= len(self.order):
+                return found
+        pks = {pk for _, pk in self.keys[start:end]}
+        return [
+            self.items[pk][1] for pk in heapq.nsmallest(
+                limit, pks, key=lambda pk: self.items[pk][3]
+            )
+        ]
+
+
+class SuggestIndex:
+    """Индексы всех моделей и их перестроение.
+
+    Новые индексы строятся без общей блокировки и подменяют текущие
+    целиком, так что подсказки не ждут чтения таблиц. Устаревший по
+    REBUILD_SECONDS индекс перестраивается в фоновом потоке и до
+    подмены продолжает отвечать; без индекса (первый запрос или после
+    reset) запрос ждёт построения. Изменения, пришедшие во время
+    построения, повторяются на новых индексах перед подменой.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.build_lock = threading.Lock()
+        self.built_at = None
+        self.generation = 0
+        self.pending = None
+        self.rebuild_thread = None
+        self.indexes = self.create_indexes()
+
+    @staticmethod
+    def create_indexes():
+        return {
+            Title: PrefixIndex(rank_by_rating),
+            Genre: PrefixIndex(),
+            Category: PrefixIndex(),
+        }
+
+    @staticmethod
+    def get_fields(model):
+        if model is Title:
+            return ('id', 'name', 'rating')
+        return ('id', 'name', 'slug')
+
+    @staticmethod
+    def get_item(model, values):
+        if model is Title:
+            return {
+                'id': values['id'],
+                'name': values['name'],
+                'rating': values.get('rating'),
+            }
+        return {'name': values['name'], 'slug': values['slug']}
+
+    def is_expired(self):
+        rebuild_seconds = settings.SUGGEST_SETTINGS['REBUILD_SECONDS']
+        return self.built_at is None or (
+            rebuild_seconds is not None
+            and time.monotonic() - self.built_at > rebuild_seconds
+        )
+
+    def is_tracked(self):
+        """Нужно ли применять изменения: индекс построен или строится"""
+        return self.built_at is not None or self.pending is not None
+
+    def apply(self, change):
+        """Применяет change(indexes) к текущим индексам и запоминает
+        для строящихся; вызывается под self.lock"""
+        change(self.indexes)
+        if self.pending is not None:
+            self.pending.append(change)
+
+    def build(self):
+        """Строит индексы, если текущие устарели, и подменяет их"""
+        with self.build_lock:
+            with self.lock:
+                if not self.is_expired():
+                    return
+                generation = self.generation
+                self.pending = []
+            indexes = self.create_indexes()
+            try:
+                for model, index in indexes.items():
+                    index.load(
+                        (row['id'], row['name'], self.get_item(model, row))
+                        for row in model.objects.values(
+                            *self.get_fields(model)
+                        ).iterator()
+                    )
+            except BaseException:
+                with self.lock:
+                    self.pending = None
+                raise
+            with self.lock:
+                for change in self.pending:
+                    change(indexes)
+                self.pending = None
+                self.indexes = indexes
+                # После reset во время построения данные могли устареть.
+                if generation == self.generation:
+                    self.built_at = time.monotonic()
+
+    def rebuild_in_background(self):
+        try:
+            self.build()
+        finally:
+            connection.close()
+
+    def ensure_built(self):
+        """Строит индекс, если его нет, или запускает фоновое
+        перестроение устаревшего"""
+        with self.lock:
+            if not self.is_expired():
+                return
+            if self.built_at is not None:
+                if not self.build_lock.locked():
+                    self.rebuild_thread = threading.Thread(
+                        target=self.rebuild_in_background, daemon=True
+                    )
+                    self.rebuild_thread.start()
+                return
+        self.build()
+
+    def update(self, model, instance):
+        """Применяет запись объекта, если индекс уже построен"""
+        values = {**instance.__dict__, 'id': instance.pk}
+        pk = instance.pk
+        if 'name' in values:
+            name, item = values['name'], self.get_item(model, values)
+
+            def change(indexes):
+                indexes[model].add(pk, name, item)
+        elif 'rating' in values:
+            # Пересчёт рейтинга сохраняет только счётчики.
+            rating = values['rating']
+
+            def change(indexes):
+                index = indexes[model]
+                if pk in index.items:
+                    index.set_item(
+                        pk, {**index.items[pk][1], 'rating': rating}
+                    )
+        else:
+            return
+        with self.lock:
+            if self.is_tracked():
+                self.apply(change)
+
+    def refresh(self, model, pks):
+        """Перечитывает объекты из базы, если индекс уже построен"""
+        if not self.is_tracked() or not pks:
+            return
+        rows = {
+            row['id']: row
+            for row in model.objects.filter(pk__in=pks).values(
+                *self.get_fields(model)
+            )
+        }
+        items = {
+            pk: (rows[pk]['name'], self.get_item(model, rows[pk]))
+            for pk in rows
+        }
+
+        def change(indexes):
+            index = indexes[model]
+            for pk in pks:
+                if pk in items:
+                    index.add(pk, *items[pk])
+                else:
+                    index.remove(pk)
+
+        with self.lock:
+            if self.is_tracked():
+                self.apply(change)
+
+    def remove(self, model, pk):
+        with self.lock:
+            if self.is_tracked():
+                self.apply(lambda indexes: indexes[model].remove(pk))
+
+    def reset(self):
+        with self.lock:
+            self.built_at = None
+            self.generation += 1
+
+    def suggest(self, query, limit):
+        prefix = normalize_search(query)
+        options = settings.SUGGEST_SETTINGS
+        self.ensure_built()
+        if not prefix:
+            return {'titles': [], 'genres': [], 'categories': []}
+        with self.lock:
+            return {
+                name: self.indexes[model].find(
+                    prefix, limit, options['MAX_SCAN']
+                )
+                for name, model in (
+                    ('titles', Title),
+                    ('genres', Genre),
+                    ('categories', Category),
+                )
+            }
+
+
+suggest_index = SuggestIndex()
@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (
     CategoryViewSet, GenreViewSet, TitleViewSet,
-    ReviewViewSet, CommentViewSet
+    ReviewViewSet, CommentViewSet, ExportView, CacheStatsView, SuggestView
 )
 
 
@@ -23,5 +23,12 @@ router.register(
 )
 
 urlpatterns = [
+    path(
+        'v1/export/<str:resource>/', ExportView.as_view(), name='export'
+    ),
+    path(
+        'v1/cache-stats/', CacheStatsView.as_view(), name='cache-stats'
+    ),
+    path('v1/suggest/', SuggestView.as_view(), name='suggest'),
     path('v1/', include(router.urls)),
 ]
@@ -1,19 +1,46 @@
 import django_filters
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, viewsets
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.search import normalize_search
+from users.permissions import IsAdmin
 
+from .cache import ResponseCache, get_object_version, title_cache
+from .export import EXPORTS, stream_csv, stream_ndjson
+from .filters import FullTextSearchFilter, NormalizedSearchFilter
+from .mixins import (
+    BatchListMixin, BulkWriteMixin, CachedListMixin, CachedRetrieveMixin,
+    ConditionalListMixin, ConditionalRetrieveMixin, ParentObjectMixin,
+    RowReadMixin, version_to_datetime
+)
+from .pagination import OptionalCursorPagination
 from .permissions import IsAdminOrReadOnly, IsAuthorOrReadOnly
+from .renderers import CSVRenderer, NDJSONRenderer
 from .serializers import (
-    CategorySerializer, CommentSerializer, GenreSerializer, ReviewSerializer,
-    TitleReadSerializer, TitleWriteSerializer
+    CategorySerializer, CommentRowSerializer, CommentSerializer,
+    GenreSerializer, ReviewRowSerializer, ReviewSerializer,
+    TitleReadSerializer, TitleRowSerializer, TitleWriteSerializer
 )
+from .slugs import slug_maps
+from .suggest import suggest_index
+
+User = get_user_model()
 
 
-class CategoryViewSet(mixins.CreateModelMixin,
+class CategoryViewSet(ConditionalListMixin,
+                      CachedListMixin,
+                      BulkWriteMixin,
+                      mixins.CreateModelMixin,
                       mixins.ListModelMixin,
                       mixins.DestroyModelMixin,
                       viewsets.GenericViewSet):
@@ -22,12 +49,16 @@ class CategoryViewSet(mixins.CreateModelMixin,
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminOrReadOnly,)
+    version_models = (Category,)
     lookup_field = 'slug'
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('name',)
+    filter_backends = (NormalizedSearchFilter,)
+    search_fields = ('name_search',)
 
 
-class GenreViewSet(mixins.CreateModelMixin,
+class GenreViewSet(ConditionalListMixin,
+                   CachedListMixin,
+                   BulkWriteMixin,
+                   mixins.CreateModelMixin,
                    mixins.ListModelMixin,
                    mixins.DestroyModelMixin,
                    viewsets.GenericViewSet):
@@ -36,13 +67,15 @@ class GenreViewSet(mixins.CreateModelMixin,
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminOrReadOnly,)
+    version_models = (Genre,)
     lookup_field = 'slug'
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('name',)
+    filter_backends = (NormalizedSearchFilter,)
+    search_fields = ('name_search',)
 
 
 class TitleFilter(django_filters.FilterSet):
-    """Фильтр для произведений по жанру, категории, году и названию."""
+    """Фильтр для произведений по жанру, категории, году, названию
+    и рейтингу."""
 
     genre = django_filters.CharFilter(
         field_name='genre__slug',
@@ -57,72 +90,227 @@ class TitleFilter(django_filters.FilterSet):
         lookup_expr='exact'
     )
 
-    name = django_filters.CharFilter(
-        field_name='name',
-        lookup_expr='icontains'
+    name = django_filters.CharFilter(method='filter_name')
+    rating_min = django_filters.NumberFilter(
+        field_name='rating',
+        lookup_expr='gte'
+    )
+    rating_max = django_filters.NumberFilter(
+        field_name='rating',
+        lookup_expr='lte'
     )
 
     class Meta:
         model = Title
-        fields = ['genre', 'category', 'year', 'name']
+        fields = [
+            'genre', 'category', 'year', 'name', 'rating_min', 'rating_max'
+        ]
 
+    def filter_name(self, queryset, name, value):
+        """Ищет подстроку в нормализованном названии по индексу trigram"""
+        value = normalize_search(value)
+        if not value:
+            return queryset
+        return queryset.filter(name_search__contains=value)
 
-class TitleViewSet(viewsets.ModelViewSet):
+
+class TitleViewSet(ConditionalListMixin,
+                   ConditionalRetrieveMixin,
+                   CachedRetrieveMixin,
+                   CachedListMixin,
+                   RowReadMixin,
+                   BatchListMixin,
+                   BulkWriteMixin,
+                   viewsets.ModelViewSet):
     """Вьюсет для операций с произведениями."""
 
     queryset = Title.objects.all()
+    serializer_class = TitleReadSerializer
+    row_serializer_class = TitleRowSerializer
     permission_classes = (IsAdminOrReadOnly,)
+    retrieve_cache = title_cache
+    version_models = (Title,)
+    bulk_methods = ('POST', 'PATCH', 'DELETE')
 
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
 
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+    filter_backends = (
+        DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter
+    )
     filterset_class = TitleFilter
     search_fields = ('name', 'description')
+    ordering_fields = ('rating', 'name', 'year')
 
     def get_serializer_class(self):
         """Возвращает нужный сериализатор в зависимости от действия."""
         if self.action in ('list', 'retrieve'):
-            return TitleReadSerializer
+            return super().get_serializer_class()
         return TitleWriteSerializer
 
     def get_queryset(self):
         queryset = Title.objects.all()
         if self.action in ('list', 'retrieve'):
-            queryset = queryset.select_related('category').prefetch_related('genre')
+            queryset = queryset.select_related(
+                'category'
+            ).prefetch_related('genre')
         return queryset
 
+    def get_resource_version(self):
+        if self.action != 'retrieve':
+            return super().get_resource_version()
+        version = get_object_version(Title, self.kwargs[self.lookup_field])
+        return (version,), version_to_datetime(version)
+
+    def handle_bulk_integrity_error(self, error):
+        """Категория или жанр удалены после загрузки slug_maps."""
+        for slug_map in slug_maps.values():
+            slug_map.clear()
+        raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+            'Категория или жанр удалены во время записи, повторите запрос.'
+        ]})
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class ReviewViewSet(ConditionalListMixin,
+                    ConditionalRetrieveMixin,
+                    ParentObjectMixin,
+                    RowReadMixin,
+                    viewsets.ModelViewSet):
     """Вьюсет для отзывов."""
 
     serializer_class = ReviewSerializer
+    row_serializer_class = ReviewRowSerializer
+    row_actions = ('list',)
     permission_classes = (IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly)
+    pagination_class = OptionalCursorPagination
+    version_models = (Review, User)
+    parent_model = Title
+    parent_lookups = {'pk': 'title_id'}
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
 
+    def get_resource_version(self):
+        parts, modified = super().get_resource_version()
+        if self.action == 'list':
+            return self.add_collection_version('reviews', parts, modified)
+        return parts, modified
+
     def get_queryset(self):
-        """Возвращает все отзывы для конкретного произведения."""
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.select_related('author')
+        """Возвращает все отзывы для конкретного произведения.
+
+        Отзыв по id ищется сразу с фильтром по произведению, а для списка
+        сначала проверяется, что произведение существует.
+        """
+        if not self.detail:
+            self.get_parent()
+        return Review.objects.filter(
+            title_id=self.kwargs['title_id']
+        ).select_related('author')
 
+    @transaction.atomic
     def perform_create(self, serializer):
         """Создает отзыв для конкретного произведения с указанием автора."""
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_parent())
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        """Обновляет отзыв вместе со счётчиками рейтинга произведения."""
+        serializer.save()
 
-class CommentViewSet(viewsets.ModelViewSet):
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        """Удаляет отзыв вместе с его оценкой из рейтинга произведения."""
+        instance.delete()
+
+
+class CommentViewSet(ConditionalListMixin,
+                     ConditionalRetrieveMixin,
+                     ParentObjectMixin,
+                     RowReadMixin,
+                     viewsets.ModelViewSet):
     """Вьюсет для комментариев к отзывам."""
 
     serializer_class = CommentSerializer
+    row_serializer_class = CommentRowSerializer
+    row_actions = ('list',)
     permission_classes = (IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly)
+    pagination_class = OptionalCursorPagination
+    version_models = (Comment, User)
+    parent_model = Review
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
 
+    def get_resource_version(self):
+        parts, modified = super().get_resource_version()
+        if self.action == 'list':
+            return self.add_collection_version('comments', parts, modified)
+        return parts, modified
+
     def get_queryset(self):
-        """Возвращает все комментарии для конкретного отзыва."""
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'))
-        return review.comments.select_related('author')
+        """Возвращает все комментарии для конкретного отзыва.
+
+        Отзыв должен относиться к произведению из URL: комментарий по id
+        ищется одним запросом с соединением по всей цепочке, а для списка
+        сначала проверяется отзыв.
+        """
+        if not self.detail:
+            self.get_parent()
+        return Comment.objects.filter(
+            review_id=self.kwargs['review_id'],
+            review__title_id=self.kwargs['title_id']
+        ).select_related('author')
 
     def perform_create(self, serializer):
         """Создает комментарий для конкретного отзыва с указанием автора."""
-        review = get_object_or_404(Review, id=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_parent())
+
+
+class ExportView(APIView):
+    """Потоковая выгрузка произведений, отзывов и комментариев
+    в CSV или NDJSON (только для администраторов)."""
+
+    permission_classes = (IsAdmin,)
+    renderer_classes = (CSVRenderer, NDJSONRenderer)
+
+    def get(self, request, resource):
+        if resource not in EXPORTS:
+            raise Http404
+        if request.accepted_renderer.format == 'ndjson':
+            stream = stream_ndjson(EXPORTS[resource])
+            extension = 'ndjson'
+        else:
+            stream = stream_csv(EXPORTS[resource])
+            extension = 'csv'
+        response = StreamingHttpResponse(
+            stream, content_type=request.accepted_renderer.media_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{resource}.{extension}"'
+        )
+        return response
+
+
+class CacheStatsView(APIView):
+    """Доля попаданий в кеши ответов (только для администраторов)."""
+
+    permission_classes = (IsAdmin,)
+
+    def get(self, request):
+        return Response({
+            name: response_cache.get_stats()
+            for name, response_cache in ResponseCache.registry.items()
+        })
+
+
+class SuggestView(APIView):
+    """Подсказки по началу слова в названиях произведений, жанров
+    и категорий из индекса в памяти."""
+
+    def get(self, request):
+        options = settings.SUGGEST_SETTINGS
+        try:
+            limit = int(request.query_params.get('limit', options['LIMIT']))
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число.'})
+        limit = max(1, min(limit, options['MAX_LIMIT']))
+        return Response(
+            suggest_index.suggest(request.query_params.get('q', ''), limit)
+        )
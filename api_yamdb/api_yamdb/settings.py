@@ -111,14 +111,45 @@ STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
 AUTH_USER_MODEL = 'users.User'
 
+# Версии моделей, по которым строятся ETag и ключи кешей, должны быть
+# общими для всех воркеров, поэтому кеш хранится в файлах рядом с базой
+# SQLite. Если воркеры работают на нескольких хостах, нужен Redis или
+# Memcached; LocMemCache подходит только для одного процесса.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+COUNT_CACHE_SETTINGS = {
+    'TIMEOUT': 30,
+    'ESTIMATE_THRESHOLD': None,
+}
+
+RESPONSE_CACHE_SETTINGS = {
+    'TIMEOUT': 60 * 10,
+    # Срок жизни версий: ограничивает время, в течение которого процесс
+    # с необщим кешем может отвечать 304 на устаревшие данные.
+    'VERSION_TIMEOUT': 60 * 60,
+}
+
+BATCH_SETTINGS = {
+    'MAX_SIZE': 100,
+    'MAX_WRITE_SIZE': 10000,
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CachedCountPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
@@ -136,7 +167,33 @@ EMAIL_SETTINGS = {
     'SUBJECT': 'Код подтверждения для YaMDb'
 }
 
+SUGGEST_SETTINGS = {
+    'LIMIT': 10,
+    'MAX_LIMIT': 50,
+    # Диапазон совпадений префикса, который просматривается целиком;
+    # для более длинного подсказки ищутся по порядку выдачи.
+    'MAX_SCAN': 5000,
+    'REBUILD_SECONDS': 600,
+}
+
+OUTBOX_SETTINGS = {
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 30,
+    'LEASE_SECONDS': 300,
+    'POLL_INTERVAL': 5,
+    # Бэкенды без сетевого ввода-вывода: очередь разбирается сразу после
+    # фиксации транзакции, без отдельного обработчика.
+    'INLINE_BACKENDS': (
+        'django.core.mail.backends.locmem.EmailBackend',
+        'django.core.mail.backends.console.EmailBackend',
+    ),
+}
+
 JWT_SETTINGS = {
     'EXPIRATION_DAYS': 1,
-    'ALGORITHM': 'HS256'
+    'ALGORITHM': 'HS256',
+    'VERSION_CACHE_SECONDS': 30,
+    'VERSION_CACHE_SIZE': 10000,
+    'DECODED_CACHE_SIZE': 1024,
 }
@@ -0,0 +1,624 @@
+"""Импорт CSV-файлов static/data.
+
+Файлы загружаются по стадиям в порядке зависимостей. Строки разбираются
+в пуле процессов, а готовые кортежи значений записывает в базу один
+писатель, чтобы у SQLite оставалось единственное пишущее соединение.
+"""
+import csv
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from hashlib import blake2b
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.db import (
+    DEFAULT_DB_ALIAS, IntegrityError, connection, connections, transaction
+)
+from django.db.models.constants import OnConflict
+from django.utils.dateparse import parse_datetime
+
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, ImportFingerprint, Review, Title
+)
+from reviews.search import normalize_search
+from users.models import User
+
+
+def optional_int(value):
+    return int(value) if value else None
+
+
+def datetime_value(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f'Некорректная дата: {value}')
+    return parsed
+
+
+class ImportConflict(ValueError):
+    """Строки файла нарушают ограничения уникальности в базе"""
+
+    def __init__(self, filename, reason):
+        super().__init__(f'{filename}: {reason}')
+
+
+class CsvTable:
+    """Описание CSV-файла и его соответствия модели.
+
+    columns сопоставляет поля модели колонкам CSV и функциям
+    преобразования. derived так же описывает поля, вычисляемые из колонок
+    CSV, но не выгружаемые обратно. Остальные поля модели заполняются
+    значениями по умолчанию. unique — поля ограничения уникальности:
+    строки, повторяющие их значения, пропускаются.
+    """
+
+    def __init__(self, filename, model, columns, defaults=None,
+                 derived=None, unique=()):
+        self.filename = filename
+        self.model = model
+        self.columns = columns
+        self.defaults = defaults or {}
+        self.derived = derived or {}
+        self.unique = unique
+
+    @property
+    def sources(self):
+        return {**self.columns, **self.derived}
+
+    @property
+    def fields(self):
+        return list(self.model._meta.concrete_fields)
+
+    @property
+    def references(self):
+        """Позиции внешних ключей в кортеже и модели, на которые они
+        ссылаются."""
+        return [
+            (index, field.related_model)
+            for index, field in enumerate(self.fields)
+            if field.is_relation
+        ]
+
+    def get_insert_sql(self):
+        quote = connection.ops.quote_name
+        return 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(self.model._meta.db_table),
+            ', '.join(quote(field.column) for field in self.fields),
+            ', '.join(['%s'] * len(self.fields))
+        )
+
+    @property
+    def unique_positions(self):
+        """Позиции полей unique в кортеже значений"""
+        attnames = [field.attname for field in self.fields]
+        return [attnames.index(name) for name in self.unique]
+
+    def get_unique_sql(self, count):
+        """SELECT id и полей unique для count наборов значений"""
+        quote = connection.ops.quote_name
+        opts = self.model._meta
+        columns = ', '.join(
+            quote(opts.get_field(name).column) for name in self.unique
+        )
+        values = '({})'.format(', '.join(['%s'] * len(self.unique)))
+        return 'SELECT {}, {} FROM {} WHERE ({}) IN (VALUES {})'.format(
+            quote(opts.pk.column), columns, quote(opts.db_table), columns,
+            ', '.join([values] * count)
+        )
+
+    def get_default(self, field):
+        if field.name in self.defaults:
+            return self.defaults[field.name]()
+        return field.get_default()
+
+    def get_upsert_sql(self):
+        """INSERT, обновляющий при совпадении id только колонки из CSV"""
+        fields = self.fields
+        suffix = connection.ops.on_conflict_suffix_sql(
+            fields,
+            OnConflict.UPDATE,
+            [field.column for field in fields
+             if field.attname in self.sources and not field.primary_key],
+            [self.model._meta.pk.column]
+        )
+        return f'{self.get_insert_sql()} {suffix}'
+
+    def parse(self, header, rows, stored=None):
+        """Преобразует строки CSV в кортежи значений для INSERT.
+
+        В инкрементальном режиме stored содержит сохранённые хеши строк
+        пачки: строки с неизменившимся хешем не разбираются, а только
+        учитываются по id.
+        """
+        positions = {column: index for index, column in enumerate(header)}
+        db = connections[DEFAULT_DB_ALIAS]
+        sources = self.sources
+        steps = []
+        for field in self.fields:
+            if field.attname in sources:
+                column, convert = sources[field.attname]
+                if column not in positions:
+                    raise ValueError(
+                        f'В файле {self.filename} нет колонки {column}'
+                    )
+                steps.append(
+                    (positions[column], convert, field.get_db_prep_save)
+                )
+            else:
+                default = field.get_db_prep_save(self.get_default(field), db)
+                steps.append((None, default, None))
+        pk_position = positions[self.columns['id'][0]]
+        batch = ParsedBatch()
+        for index, row in enumerate(rows):
+            if stored is not None:
+                digest = row_digest(row)
+                if digest == stored[index]:
+                    batch.unchanged.append(int(row[pk_position]))
+                    continue
+            try:
+                batch.rows.append(tuple(
+                    prepare(convert(row[position]), db)
+                    if prepare else convert
+                    for position, convert, prepare in steps
+                ))
+            except (IndexError, TypeError, ValueError):
+                batch.skipped += 1
+                continue
+            if stored is not None:
+                batch.digests.append(digest)
+        return batch
+
+
+def row_digest(row):
+    """64-битный хеш строки CSV для поиска изменений"""
+    return int.from_bytes(
+        blake2b('\x1f'.join(row).encode(), digest_size=8).digest(),
+        'big',
+        signed=True
+    )
+
+
+class ParsedBatch:
+    """Результат разбора пачки строк"""
+
+    def __init__(self):
+        self.rows = []
+        self.digests = []
+        self.unchanged = []
+        self.skipped = 0
+
+
+TABLES = {
+    table.filename: table for table in (
+        CsvTable('users.csv', User, {
+            'id': ('id', int),
+            'username': ('username', str),
+            'email': ('email', str),
+            'role': ('role', str),
+            'bio': ('bio', str),
+            'first_name': ('first_name', str),
+            'last_name': ('last_name', str),
+        }, defaults={'password': lambda: make_password(None)}, derived={
+            'username_search': ('username', normalize_search),
+        }),
+        CsvTable('category.csv', Category, {
+            'id': ('id', int),
+            'name': ('name', str),
+            'slug': ('slug', str),
+        }, derived={'name_search': ('name', normalize_search)}),
+        CsvTable('genre.csv', Genre, {
+            'id': ('id', int),
+            'name': ('name', str),
+            'slug': ('slug', str),
+        }, derived={'name_search': ('name', normalize_search)}),
+        CsvTable('titles.csv', Title, {
+            'id': ('id', int),
+            'name': ('name', str),
+            'year': ('year', int),
+            'category_id': ('category', optional_int),
+        }, derived={'name_search': ('name', normalize_search)}),
+        CsvTable('genre_title.csv', GenreTitle, {
+            'id': ('id', int),
+            'title_id': ('title_id', int),
+            'genre_id': ('genre_id', int),
+        }),
+        CsvTable('review.csv', Review, {
+            'id': ('id', int),
+            'title_id': ('title_id', int),
+            'text': ('text', str),
+            'author_id': ('author', int),
+            'score': ('score', int),
+            'pub_date': ('pub_date', datetime_value),
+        }, unique=('title_id', 'author_id')),
+        CsvTable('comments.csv', Comment, {
+            'id': ('id', int),
+            'review_id': ('review_id', int),
+            'text': ('text', str),
+            'author_id': ('author', int),
+            'pub_date': ('pub_date', datetime_value),
+        }),
+    )
+}
+
+# Сколько наборов значений unique проверяется одним запросом.
+UNIQUE_CHUNK_SIZE = 500
+
+# Файлы одной стадии не зависят друг от друга и загружаются вместе.
+STAGES = (
+    ('users.csv', 'category.csv', 'genre.csv'),
+    ('titles.csv',),
+    ('genre_title.csv', 'review.csv'),
+    ('comments.csv',),
+)
+
+
+class IdSet:
+    """Множество положительных id в виде битовой карты.
+
+    Позволяет проверять внешние ключи миллионов строк без запросов к базе
+    и без хранения миллионов объектов int.
+    """
+
+    def __init__(self, ids=()):
+        self.bits = bytearray()
+        for pk in ids:
+            self.add(pk)
+
+    def add(self, pk):
+        index, bit = divmod(pk, 8)
+        if index >= len(self.bits):
+            self.bits.extend(bytes(index - len(self.bits) + 1))
+        self.bits[index] |= 1 << bit
+
+    def discard(self, pk):
+        index, bit = divmod(pk, 8)
+        if index < len(self.bits):
+            self.bits[index] &= ~(1 << bit)
+
+    def __contains__(self, pk):
+        index, bit = divmod(pk, 8)
+        return index < len(self.bits) and bool(self.bits[index] & 1 << bit)
+
+
+@contextmanager
+def fast_sqlite():
+    """Отключает журнал и синхронизацию SQLite на время загрузки"""
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode')
+        journal_mode = cursor.fetchone()[0]
+        cursor.execute('PRAGMA synchronous')
+        synchronous = cursor.fetchone()[0]
+        cursor.execute('PRAGMA journal_mode = OFF')
+        cursor.execute('PRAGMA synchronous = OFF')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA journal_mode = {journal_mode}')
+            cursor.execute(f'PRAGMA synchronous = {synchronous}')
+
+
+def parse_batch(filename, header, rows, stored=None):
+    """Разбирает пачку строк в процессе пула"""
+    return TABLES[filename].parse(header, rows, stored)
+
+
+def init_worker():
+    """Настраивает Django в процессе пула, запущенном через spawn"""
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+class InlineExecutor:
+    """Выполняет разбор в текущем процессе, когда пул не нужен"""
+
+    class Result:
+        def __init__(self, value):
+            self.value = value
+
+        def result(self):
+            return self.value
+
+    def submit(self, func, *args):
+        return self.Result(func(*args))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class StageStats:
+    def __init__(self, filenames):
+        self.filenames = filenames
+        self.loaded = dict.fromkeys(filenames, 0)
+        self.skipped = dict.fromkeys(filenames, 0)
+        self.updated = dict.fromkeys(filenames, 0)
+        self.unchanged = dict.fromkeys(filenames, 0)
+        self.deleted = dict.fromkeys(filenames, 0)
+        self.changed_ids = {filename: [] for filename in filenames}
+        self.seconds = 0
+
+    @property
+    def rows(self):
+        return sum(
+            sum(counter.values())
+            for counter in (self.loaded, self.updated, self.unchanged)
+        )
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0
+
+    @property
+    def changed_filenames(self):
+        """Файлы, строки которых добавлены, обновлены или удалены"""
+        return [
+            filename for filename in self.filenames
+            if self.changed_ids[filename]
+        ]
+
+
+class CsvImporter:
+    """Загружает каталог CSV-файлов по стадиям зависимостей.
+
+    В инкрементальном режиме строки сравниваются с хешами прошлого
+    импорта: записываются только новые и изменённые строки, а строки,
+    пропавшие из CSV, удаляются.
+    """
+
+    def __init__(self, data_dir, batch_size, workers, incremental=False):
+        self.data_dir = data_dir
+        self.batch_size = batch_size
+        self.workers = workers
+        self.incremental = incremental
+        self.known_ids = {}
+
+    def get_known_ids(self, model):
+        """Возвращает id строк модели, уже находящихся в базе"""
+        if model not in self.known_ids:
+            self.known_ids[model] = IdSet(
+                model.objects.values_list('pk', flat=True).iterator()
+            )
+        return self.known_ids[model]
+
+    def run(self):
+        """Загружает все стадии и возвращает их статистику"""
+        if self.workers > 1:
+            executor = ProcessPoolExecutor(
+                self.workers, initializer=init_worker
+            )
+        else:
+            executor = InlineExecutor()
+        stats = []
+        with fast_sqlite(), executor:
+            for filenames in STAGES:
+                started = time.perf_counter()
+                stage = StageStats(filenames)
+                try:
+                    with transaction.atomic():
+                        self.load_stage(executor, stage)
+                except IntegrityError as error:
+                    # Внешние ключи SQLite проверяются при фиксации.
+                    raise ImportConflict(', '.join(filenames), error)
+                stage.seconds = time.perf_counter() - started
+                stats.append(stage)
+        return stats
+
+    @staticmethod
+    def get_changes(stats):
+        """id изменённых строк по моделям, у которых что-то изменилось"""
+        return {
+            TABLES[filename].model: stage.changed_ids[filename]
+            for stage in stats for filename in stage.changed_filenames
+        }
+
+    def read_batches(self, executor, filename, fingerprints):
+        """Отправляет пачки строк файла в пул, ограничивая их число в
+        работе, и отдаёт результаты в исходном порядке."""
+        with open(
+            self.data_dir / filename, encoding='utf-8', newline=''
+        ) as file:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            if fingerprints is not None:
+                pk_position = header.index(TABLES[filename].columns['id'][0])
+                known_ids = self.get_known_ids(TABLES[filename].model)
+            pending = deque()
+            while True:
+                while len(pending) < max(self.workers, 1) * 2:
+                    rows = list(islice(reader, self.batch_size))
+                    if not rows:
+                        break
+                    stored = None if fingerprints is None else [
+                        self.get_stored_digest(
+                            fingerprints, known_ids, row_id(row, pk_position)
+                        )
+                        for row in rows
+                    ]
+                    pending.append(executor.submit(
+                        parse_batch, filename, header, rows, stored
+                    ))
+                if not pending:
+                    return
+                yield pending.popleft().result()
+
+    @staticmethod
+    def get_stored_digest(fingerprints, known_ids, pk):
+        """Хеш прошлого импорта для строки, которая всё ещё есть в базе"""
+        if pk is None or pk not in known_ids:
+            return None
+        return fingerprints.get(pk)
+
+    def load_stage(self, executor, stage):
+        """Записывает файлы стадии, чередуя готовые пачки разных файлов"""
+        fingerprints = {
+            filename: dict(
+                ImportFingerprint.objects.filter(table=filename).values_list(
+                    'row_id', 'digest'
+                ).iterator()
+            ) if self.incremental else None
+            for filename in stage.filenames
+        }
+        seen = {filename: IdSet() for filename in stage.filenames}
+        sources = {
+            filename: self.read_batches(
+                executor, filename, fingerprints[filename]
+            )
+            for filename in stage.filenames
+        }
+        while sources:
+            for filename, batches in list(sources.items()):
+                batch = next(batches, None)
+                if batch is None:
+                    del sources[filename]
+                    if self.incremental:
+                        self.delete_missing(
+                            filename, fingerprints[filename],
+                            seen[filename], stage
+                        )
+                    continue
+                self.write_batch(
+                    filename, batch, fingerprints[filename],
+                    seen[filename], stage
+                )
+
+    def write_batch(self, filename, batch, fingerprints, seen, stage):
+        table = TABLES[filename]
+        pk_index = table.fields.index(table.model._meta.pk)
+        known_ids = self.get_known_ids(table.model)
+        existing = [row[pk_index] in known_ids for row in batch.rows]
+        if fingerprints is None and any(existing):
+            pk = batch.rows[existing.index(True)][pk_index]
+            raise ImportConflict(filename, f'строка с id {pk} уже есть в базе')
+        duplicates = self.find_duplicates(table, batch.rows)
+        linked = self.check_references(filename, batch.rows, [
+            position for position in range(len(batch.rows))
+            if position not in duplicates
+        ])
+        rows = [batch.rows[index] for index in linked]
+        stage.skipped[filename] += batch.skipped + len(batch.rows) - len(rows)
+        stage.unchanged[filename] += len(batch.unchanged)
+        if not rows:
+            for pk in batch.unchanged:
+                seen.add(pk)
+            return
+        stage.changed_ids[filename].extend(row[pk_index] for row in rows)
+        if fingerprints is None:
+            self.execute(filename, table.get_insert_sql(), rows)
+            stage.loaded[filename] += len(rows)
+            return
+        updated = sum(existing[index] for index in linked)
+        stage.updated[filename] += updated
+        stage.loaded[filename] += len(rows) - updated
+        self.execute(filename, table.get_upsert_sql(), rows)
+        ImportFingerprint.objects.bulk_create(
+            [
+                ImportFingerprint(
+                    table=filename,
+                    row_id=rows[position][pk_index],
+                    digest=batch.digests[index]
+                )
+                for position, index in enumerate(linked)
+            ],
+            update_conflicts=True,
+            unique_fields=('table', 'row_id'),
+            update_fields=('digest',)
+        )
+        for pk in batch.unchanged:
+            seen.add(pk)
+        for row in rows:
+            seen.add(row[pk_index])
+
+    @staticmethod
+    def execute(filename, sql, rows):
+        try:
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, rows)
+        except IntegrityError as error:
+            raise ImportConflict(filename, error)
+
+    def find_duplicates(self, table, rows):
+        """Позиции строк, чьи значения table.unique уже заняты другой
+        строкой в базе или раньше в пачке.
+
+        Как и проверка ссылок по IdSet, это пропускает строку вместо
+        ошибки ограничения; база читается по индексу ограничения.
+        """
+        if not table.unique:
+            return set()
+        pk_index = table.fields.index(table.model._meta.pk)
+        positions = table.unique_positions
+        keys = [tuple(row[index] for index in positions) for row in rows]
+        owners = {}
+        wanted = list({key for key in keys if None not in key})
+        with connection.cursor() as cursor:
+            for start in range(0, len(wanted), UNIQUE_CHUNK_SIZE):
+                chunk = wanted[start:start + UNIQUE_CHUNK_SIZE]
+                cursor.execute(
+                    table.get_unique_sql(len(chunk)),
+                    [value for key in chunk for value in key]
+                )
+                for pk, *key in cursor.fetchall():
+                    owners[tuple(key)] = pk
+        duplicates = set()
+        for position, (row, key) in enumerate(zip(rows, keys)):
+            if None in key:
+                continue
+            owner = owners.setdefault(key, row[pk_index])
+            if owner != row[pk_index]:
+                duplicates.add(position)
+        return duplicates
+
+    def delete_missing(self, filename, fingerprints, seen, stage):
+        """Удаляет строки прошлого импорта, которых больше нет в CSV"""
+        table = TABLES[filename]
+        missing = [pk for pk in fingerprints if pk not in seen]
+        known_ids = self.get_known_ids(table.model)
+        for start in range(0, len(missing), self.batch_size):
+            chunk = missing[start:start + self.batch_size]
+            table.model.objects.filter(pk__in=chunk).delete()
+            ImportFingerprint.objects.filter(
+                table=filename, row_id__in=chunk
+            ).delete()
+            for pk in chunk:
+                known_ids.discard(pk)
+        stage.deleted[filename] += len(missing)
+        stage.changed_ids[filename].extend(missing)
+
+    def check_references(self, filename, rows, positions):
+        """Возвращает те из positions, чьи ссылки указывают на
+        существующие записи"""
+        table = TABLES[filename]
+        references = [
+            (index, self.get_known_ids(model))
+            for index, model in table.references
+        ]
+        known_ids = self.get_known_ids(table.model)
+        pk_index = table.fields.index(table.model._meta.pk)
+        linked = []
+        for position in positions:
+            row = rows[position]
+            if all(
+                row[index] is None or row[index] in ids
+                for index, ids in references
+            ):
+                linked.append(position)
+                known_ids.add(row[pk_index])
+        return linked
+
+
+def row_id(row, position):
+    try:
+        return int(row[position])
+    except (IndexError, ValueError):
+        return None
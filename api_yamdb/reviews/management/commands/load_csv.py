@@ -0,0 +1,106 @@
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection
+
+from reviews.csv_import import TABLES, CsvImporter, ImportConflict
+from reviews.models import Review, Title
+from reviews.signals import bulk_changed
+
+
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = 'Загружает данные из CSV-файлов static/data в базу'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            type=Path,
+            default=DATA_DIR,
+            help='Каталог с CSV-файлами'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество строк в одной пачке'
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Записать только изменения с прошлого импорта'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Количество процессов для разбора строк'
+        )
+
+    def handle(self, *args, **options):
+        for filename in TABLES:
+            if not (options['path'] / filename).exists():
+                raise CommandError(
+                    f'Не найден файл {options["path"] / filename}'
+                )
+        importer = CsvImporter(
+            options['path'], options['batch_size'], options['workers'],
+            options['incremental']
+        )
+        try:
+            stages = importer.run()
+        except ImportConflict as error:
+            raise CommandError(
+                f'{error}. Если эти данные уже загружены, запустите команду '
+                'с --incremental.'
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.write_stats(stages, options['incremental'])
+        changes = CsvImporter.get_changes(stages)
+        if not changes:
+            return
+        self.reset_sequences(changes)
+        if Title in changes or Review in changes:
+            call_command('rebuild_rating', verbosity=0, stdout=self.stdout)
+        bulk_changed.send(
+            sender=self.__class__,
+            models=list(changes),
+            title_ids=changes[Title] if set(changes) == {Title} else None
+        )
+
+    def write_stats(self, stages, incremental):
+        """Выводит число строк по файлам и скорость каждой стадии"""
+        for number, stage in enumerate(stages, start=1):
+            for filename in stage.filenames:
+                if incremental:
+                    self.stdout.write(
+                        f'{filename}: добавлено {stage.loaded[filename]}, '
+                        f'обновлено {stage.updated[filename]}, '
+                        f'удалено {stage.deleted[filename]}, '
+                        f'без изменений {stage.unchanged[filename]}, '
+                        f'пропущено {stage.skipped[filename]}'
+                    )
+                else:
+                    self.stdout.write(
+                        f'{filename}: загружено {stage.loaded[filename]}, '
+                        f'пропущено {stage.skipped[filename]}'
+                    )
+            self.stdout.write(
+                f'Стадия {number}: {stage.rows} строк за '
+                f'{stage.seconds:.1f} с, {stage.rows_per_second:.0f} строк/с'
+            )
+
+    def reset_sequences(self, models):
+        """Сдвигает счётчики id за загруженные значения"""
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+
+from reviews.models import Review, Title
+from reviews.signals import bulk_changed
+
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики рейтинга произведений по отзывам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, не исправляя их'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drift = self.find_drift()
+            for title in drift if options['verbosity'] else ():
+                self.stdout.write(
+                    f'Произведение {title.pk}: '
+                    f'{title.old_counters} -> '
+                    f'{(title.rating_sum, title.rating_count, title.rating)}'
+                )
+            if not options['dry_run'] and drift:
+                self.save_counters(drift)
+                title_ids = [title.pk for title in drift]
+                transaction.on_commit(lambda: bulk_changed.send(
+                    sender=self.__class__, models=[Title], title_ids=title_ids
+                ))
+        self.stdout.write(self.style.SUCCESS(
+            f'Расхождений найдено: {len(drift)}'
+            + (' (не исправлены)' if options['dry_run'] else '')
+        ))
+
+    def find_drift(self):
+        """Возвращает произведения, чьи счётчики не совпадают с отзывами"""
+        counters = {
+            row['title']: (row['total'], row['count'])
+            for row in Review.objects.order_by().values('title').annotate(
+                total=Sum('score'), count=Count('pk')
+            )
+        }
+        drift = []
+        for title in Title.objects.only(
+            'pk', 'rating_sum', 'rating_count', 'rating'
+        ).iterator(chunk_size=BATCH_SIZE):
+            stored = (title.rating_sum, title.rating_count, title.rating)
+            title.rating_sum, title.rating_count = counters.get(
+                title.pk, (0, 0)
+            )
+            title.count_rating()
+            if stored != (title.rating_sum, title.rating_count, title.rating):
+                title.old_counters = stored
+                drift.append(title)
+        return drift
+
+    def save_counters(self, titles):
+        """Записывает счётчики одним подготовленным UPDATE на все строки"""
+        meta = Title._meta
+        columns = [
+            meta.get_field(name).column
+            for name in ('rating_sum', 'rating_count', 'rating')
+        ]
+        sql = (
+            f'UPDATE {meta.db_table} SET '
+            + ', '.join(f'{column} = %s' for column in columns)
+            + f' WHERE {meta.pk.column} = %s'
+        )
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [
+                (title.rating_sum, title.rating_count, title.rating, title.pk)
+                for title in titles
+            ])
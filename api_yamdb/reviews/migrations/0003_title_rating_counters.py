@@ -0,0 +1,40 @@
+# Generated by Django 5.1.1 on 2026-10-17 12:27
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_rating_counters(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    titles = []
+    for row in Review.objects.order_by().values('title').annotate(
+        total=Sum('score'), count=Count('pk')
+    ):
+        titles.append(Title(
+            pk=row['title'], rating_sum=row['total'], rating_count=row['count']
+        ))
+    Title.objects.bulk_update(
+        titles, ['rating_sum', 'rating_count'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_rating_counters, migrations.RunPython.noop),
+    ]
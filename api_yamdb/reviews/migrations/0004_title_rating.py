@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-17 12:29
+
+from django.db import migrations, models
+
+
+def fill_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    titles = list(Title.objects.filter(rating_count__gt=0).only(
+        'rating_sum', 'rating_count'
+    ))
+    for title in titles:
+        title.rating = round(title.rating_sum / title.rating_count)
+    Title.objects.bulk_update(titles, ['rating'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_rating_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.RunPython(fill_rating, migrations.RunPython.noop),
+    ]
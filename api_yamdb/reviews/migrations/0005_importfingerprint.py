@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-17 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=64, verbose_name='Файл')),
+                ('row_id', models.BigIntegerField(verbose_name='Id строки')),
+                ('digest', models.BigIntegerField(verbose_name='Хеш строки')),
+            ],
+            options={
+                'verbose_name': 'Отпечаток импорта',
+                'verbose_name_plural': 'Отпечатки импорта',
+                'constraints': [models.UniqueConstraint(fields=('table', 'row_id'), name='unique_fingerprint_row')],
+            },
+        ),
+    ]
@@ -0,0 +1,97 @@
+from django.db import DatabaseError, migrations, transaction
+
+
+def normalize(column):
+    """unicode61 не сводит ё к е, поэтому индекс хранит текст с заменой"""
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def indexed_values(row):
+    return f"{row}.id, {normalize(f'{row}.name')}, " + normalize(
+        f'{row}.description'
+    )
+
+
+# Полнотекстовый индекс названий и описаний произведений (SQLite FTS5).
+# Таблица без содержимого хранит только индекс; триггеры обновляют его
+# при любой записи, в том числе при массовой загрузке.
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE reviews_title_fts USING fts5(
+        name, description, content='',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER reviews_title_fts_insert AFTER INSERT ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES ({indexed_values('new')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER reviews_title_fts_delete AFTER DELETE ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(
+            reviews_title_fts, rowid, name, description
+        ) VALUES ('delete', {indexed_values('old')});
+    END
+    """,
+    f"""
+    CREATE TRIGGER reviews_title_fts_update
+    AFTER UPDATE OF name, description ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(
+            reviews_title_fts, rowid, name, description
+        ) VALUES ('delete', {indexed_values('old')});
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES ({indexed_values('new')});
+    END
+    """,
+    f"""
+    INSERT INTO reviews_title_fts(rowid, name, description)
+    SELECT {indexed_values('reviews_title')} FROM reviews_title
+    """,
+]
+
+DROP_FTS = [
+    'DROP TRIGGER IF EXISTS reviews_title_fts_insert',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_delete',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_update',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+]
+
+
+def create_fts(apps, schema_editor):
+    """Создаёт индекс, если SQLite собран с FTS5; иначе поиск остаётся
+    на SearchFilter"""
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    try:
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                for sql in CREATE_FTS:
+                    cursor.execute(sql)
+    except DatabaseError:
+        pass
+
+
+def drop_fts(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for sql in DROP_FTS:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:31
+
+from importlib import import_module
+
+import reviews.search
+from django.db import migrations
+
+title_fts = import_module('reviews.migrations.0008_title_fts')
+
+# Триггеры полнотекстового индекса из 0008_title_fts. Добавление колонки
+# пересоздаёт таблицу reviews_title в SQLite, а вместе с ней пропадают
+# и её триггеры.
+CREATE_TRIGGERS = [
+    sql for sql in title_fts.CREATE_FTS if 'CREATE TRIGGER' in sql
+]
+DROP_TRIGGERS = [
+    sql for sql in title_fts.DROP_FTS if 'DROP TRIGGER' in sql
+]
+
+
+def fill_name_search(apps, schema_editor):
+    for model_name in ('Category', 'Genre', 'Title'):
+        model = apps.get_model('reviews', model_name)
+        objects = list(model.objects.only('id', 'name').iterator())
+        for obj in objects:
+            obj.name_search = reviews.search.normalize_search(obj.name)
+        model.objects.bulk_update(objects, ['name_search'], batch_size=1000)
+
+
+def restore_fts_triggers(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or (
+        'reviews_title_fts' not in connection.introspection.table_names()
+    ):
+        return
+    with connection.cursor() as cursor:
+        for sql in DROP_TRIGGERS + CREATE_TRIGGERS:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_fts'),
+    ]
+
+    operations = [
+        # При откате триггеры пропадают после удаления колонок.
+        migrations.RunPython(migrations.RunPython.noop, restore_fts_triggers),
+        migrations.AddField(
+            model_name='category',
+            name='name_search',
+            field=reviews.search.SearchField(blank=True, db_index=True, default='', editable=False, max_length=256, verbose_name='Название категории для поиска'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='name_search',
+            field=reviews.search.SearchField(blank=True, db_index=True, default='', editable=False, max_length=256, verbose_name='Название жанра для поиска'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='name_search',
+            field=reviews.search.SearchField(blank=True, db_index=True, default='', editable=False, max_length=256, verbose_name='Название произведения для поиска'),
+        ),
+        migrations.RunPython(fill_name_search, migrations.RunPython.noop),
+        migrations.RunPython(restore_fts_triggers, migrations.RunPython.noop),
+    ]
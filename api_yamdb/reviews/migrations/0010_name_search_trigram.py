@@ -0,0 +1,45 @@
+from django.db import DatabaseError, migrations, transaction
+
+from reviews.search import get_trigram_sql
+
+# Индексы подстрок нормализованных названий для поиска без обхода таблиц.
+TABLES = ('reviews_title', 'reviews_category', 'reviews_genre')
+
+
+def create_trigram(apps, schema_editor):
+    """Создаёт индексы, если SQLite поддерживает токенизатор trigram;
+    иначе поиск подстроки остаётся на LIKE"""
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    for table in TABLES:
+        create, _ = get_trigram_sql(table, 'name_search')
+        try:
+            with transaction.atomic(using=connection.alias):
+                with connection.cursor() as cursor:
+                    for sql in create:
+                        cursor.execute(sql)
+        except DatabaseError:
+            pass
+
+
+def drop_trigram(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for table in TABLES:
+            _, drop = get_trigram_sql(table, 'name_search')
+            for sql in drop:
+                cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_name_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram, drop_trigram),
+    ]
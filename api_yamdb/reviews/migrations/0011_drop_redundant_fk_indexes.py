@@ -0,0 +1,84 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Внешние ключи, чьи колонки уже ведут составные индексы из 0006 и 0007
+# (а review.title_id — ещё и unique_review_per_author). Одиночные индексы
+# Django на этих колонках только замедляют запись.
+FIELDS = (
+    ('title', 'category'),
+    ('genretitle', 'title'),
+    ('genretitle', 'genre'),
+    ('review', 'title'),
+    ('comment', 'review'),
+)
+
+
+def get_columns(apps):
+    for model_name, field_name in FIELDS:
+        model = apps.get_model('reviews', model_name)
+        yield model, model._meta.get_field(field_name)
+
+
+def drop_fk_indexes(apps, schema_editor):
+    """Удаляет одиночные индексы по колонкам внешних ключей.
+
+    Изменение db_index через AlterField пересоздаёт таблицу в SQLite,
+    а вместе с ней пропадают триггеры поиска reviews_title, поэтому
+    индексы удаляются напрямую.
+    """
+    for model, field in get_columns(apps):
+        names = schema_editor._constraint_names(
+            model, [field.column], index=True, unique=False,
+            primary_key=False
+        )
+        for name in names:
+            schema_editor.execute(schema_editor._delete_index_sql(model, name))
+
+
+def create_fk_indexes(apps, schema_editor):
+    for model, field in get_columns(apps):
+        schema_editor.execute(
+            schema_editor._create_index_sql(model, fields=[field])
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_name_search_trigram'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(drop_fk_indexes, create_fk_indexes),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='comment',
+                    name='review',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='reviews.review', verbose_name='Отзыв'),
+                ),
+                migrations.AlterField(
+                    model_name='genretitle',
+                    name='genre',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='reviews.genre', verbose_name='Жанр'),
+                ),
+                migrations.AlterField(
+                    model_name='genretitle',
+                    name='title',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='reviews.title', verbose_name='Произведение'),
+                ),
+                migrations.AlterField(
+                    model_name='review',
+                    name='title',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='reviews.title', verbose_name='Произведение'),
+                ),
+                migrations.AlterField(
+                    model_name='title',
+                    name='category',
+                    field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, to='reviews.category', verbose_name='Категория'),
+                ),
+            ],
+        ),
+    ]
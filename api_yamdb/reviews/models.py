@@ -1,8 +1,12 @@
 from django.db import models
 from django.conf import settings
 
+from .search import (
+    NormalizedSearchMixin, NormalizedSearchQuerySet, SearchField
+)
 
-class Category(models.Model):
+
+class Category(NormalizedSearchMixin, models.Model):
     """Категории произведений (Фильмы, Книги, Музыка)"""
     name = models.CharField(
         'Название категории',
@@ -13,6 +17,14 @@ class Category(models.Model):
         max_length=50,
         unique=True
     )
+    name_search = SearchField(
+        'Название категории для поиска',
+        max_length=256
+    )
+
+    search_sources = {'name_search': 'name'}
+
+    objects = NormalizedSearchQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Категория'
@@ -22,7 +34,7 @@ class Category(models.Model):
         return self.name
 
 
-class Genre(models.Model):
+class Genre(NormalizedSearchMixin, models.Model):
     """Жанры произведений"""
     name = models.CharField(
         'Название жанра',
@@ -33,6 +45,14 @@ class Genre(models.Model):
         max_length=50,
         unique=True
     )
+    name_search = SearchField(
+        'Название жанра для поиска',
+        max_length=256
+    )
+
+    search_sources = {'name_search': 'name'}
+
+    objects = NormalizedSearchQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Жанр'
@@ -42,7 +62,7 @@ class Genre(models.Model):
         return self.name
 
 
-class Title(models.Model):
+class Title(NormalizedSearchMixin, models.Model):
     """Произведения (фильмы, книги, песни)"""
     name = models.CharField(
         'Название произведения',
@@ -61,45 +81,88 @@ class Title(models.Model):
         through='GenreTitle',
         verbose_name='Жанр'
     )
+    # Отдельный индекс не нужен: category_id ведёт title_category_year_idx.
     category = models.ForeignKey(
         Category,
         on_delete=models.SET_NULL,
         null=True,
+        db_index=False,
         verbose_name='Категория'
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0
+    )
+    rating = models.PositiveSmallIntegerField(
+        'Рейтинг',
+        null=True,
+        blank=True,
+        db_index=True
+    )
+    name_search = SearchField(
+        'Название произведения для поиска',
+        max_length=256
+    )
+
+    search_sources = {'name_search': 'name'}
 
-    @property
-    def rating(self):
-        """Вычисляет средний рейтинг отзывов"""
-        reviews = self.reviews.all()
-        if not reviews:
-            return None
-        return round(sum(review.score for review in reviews) / len(reviews))
+    objects = NormalizedSearchQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(
+                fields=['category', 'year'],
+                name='title_category_year_idx'
+            ),
+            models.Index(fields=['year'], name='title_year_idx')
+        ]
 
     def __str__(self):
         return self.name
 
+    def count_rating(self):
+        """Вычисляет средний рейтинг по счётчикам оценок"""
+        if not self.rating_count:
+            self.rating = None
+        else:
+            self.rating = round(self.rating_sum / self.rating_count)
+
 
 class GenreTitle(models.Model):
     """Связь между произведением и жанром"""
+    # Оба внешних ключа ведут составные индексы из Meta.indexes.
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Произведение'
     )
     genre = models.ForeignKey(
         Genre,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Жанр'
     )
 
     class Meta:
         verbose_name = 'Произведение и жанр'
         verbose_name_plural = 'Произведения и жанры'
+        # Покрывающие индексы для соединения с обеих сторон: жанры
+        # произведения и произведения жанра читаются без обращения к таблице.
+        indexes = [
+            models.Index(
+                fields=['title', 'genre'], name='genretitle_title_genre_idx'
+            ),
+            models.Index(
+                fields=['genre', 'title'], name='genretitle_genre_title_idx'
+            )
+        ]
 
     def __str__(self):
         return f'{self.title} - {self.genre}'
@@ -107,10 +170,12 @@ class GenreTitle(models.Model):
 
 class Review(models.Model):
     """Отзывы на произведения"""
+    # title_id ведут unique_review_per_author и review_title_pub_date_idx.
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
         related_name='reviews',
+        db_index=False,
         verbose_name='Произведение'
     )
     text = models.TextField('Текст отзыва')
@@ -135,18 +200,38 @@ class Review(models.Model):
                 name='unique_review_per_author'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx'
+            )
+        ]
         ordering = ['-pub_date']
 
     def __str__(self):
         return f'Отзыв {self.author} на {self.title}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_rating()
+        return instance
+
+    def remember_rating(self):
+        """Запоминает оценку, уже учтённую в счётчиках произведения"""
+        self._rated = (
+            self.__dict__.get('title_id'), self.__dict__.get('score')
+        )
+
 
 class Comment(models.Model):
     """Комментарии к отзывам"""
+    # review_id ведёт comment_review_pub_date_idx.
     review = models.ForeignKey(
         Review,
         on_delete=models.CASCADE,
         related_name='comments',
+        db_index=False,
         verbose_name='Отзыв'
     )
     text = models.TextField('Текст комментария')
@@ -164,6 +249,35 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx'
+            )
+        ]
 
     def __str__(self):
         return f'Комментарий {self.author} к отзыву {self.review}'
+
+
+class ImportFingerprint(models.Model):
+    """Хеш строки CSV, загруженной инкрементальным импортом"""
+    table = models.CharField(
+        'Файл',
+        max_length=64
+    )
+    row_id = models.BigIntegerField('Id строки')
+    digest = models.BigIntegerField('Хеш строки')
+
+    class Meta:
+        verbose_name = 'Отпечаток импорта'
+        verbose_name_plural = 'Отпечатки импорта'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['table', 'row_id'],
+                name='unique_fingerprint_row'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.table}: {self.row_id}'
@@ -0,0 +1,198 @@
+import re
+
+from django.db import models
+from django.db.models.expressions import Col
+from django.db.models.lookups import Contains
+
+PUNCTUATION = re.compile(r'[\W_]+')
+
+# Символ больше любого символа названия: верхняя граница диапазона префикса.
+MAX_CHAR = '\U0010ffff'
+
+# Индекс trigram находит только подстроки не короче трёх символов.
+TRIGRAM_MIN_LENGTH = 3
+
+_tables = {}
+
+
+def normalize_search(text):
+    """Приводит текст к виду для поиска: без регистра, ё как е, слова
+    через один пробел без знаков препинания"""
+    if not text:
+        return ''
+    folded = text.casefold().replace('ё', 'е')
+    return PUNCTUATION.sub(' ', folded).strip()
+
+
+class SearchField(models.CharField):
+    """Нормализованная копия текстового поля с индексом для поиска"""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('default', '')
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+
+@SearchField.register_lookup
+class Prefix(models.Lookup):
+    """Начало строки как диапазон значений: в отличие от LIKE, такое
+    условие читает индекс в любой базе"""
+
+    lookup_name = 'prefix'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return (
+            f'{lhs} >= {rhs} AND {lhs} < {rhs}',
+            [*lhs_params, *rhs_params, *lhs_params, rhs_params[0] + MAX_CHAR]
+        )
+
+
+def get_trigram_table(table, column):
+    return f'{table}_{column}_trigram'
+
+
+def get_trigram_sql(table, column):
+    """SQL создания и удаления индекса подстрок поля (SQLite FTS5).
+
+    Таблица без содержимого хранит только индекс, триггеры обновляют его
+    при любой записи, в том числе при массовой загрузке.
+    """
+    index = get_trigram_table(table, column)
+    create = [
+        f"""
+        CREATE VIRTUAL TABLE {index} USING fts5(
+            {column}, content='', tokenize='trigram'
+        )
+        """,
+        f"""
+        CREATE TRIGGER {index}_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO {index}(rowid, {column})
+            VALUES (new.id, new.{column});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {index}_delete AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO {index}({index}, rowid, {column})
+            VALUES ('delete', old.id, old.{column});
+        END
+        """,
+        f"""
+        CREATE TRIGGER {index}_update AFTER UPDATE OF {column} ON {table}
+        BEGIN
+            INSERT INTO {index}({index}, rowid, {column})
+            VALUES ('delete', old.id, old.{column});
+            INSERT INTO {index}(rowid, {column})
+            VALUES (new.id, new.{column});
+        END
+        """,
+        f"""
+        INSERT INTO {index}(rowid, {column})
+        SELECT id, {column} FROM {table}
+        """,
+    ]
+    drop = [
+        f'DROP TRIGGER IF EXISTS {index}_insert',
+        f'DROP TRIGGER IF EXISTS {index}_delete',
+        f'DROP TRIGGER IF EXISTS {index}_update',
+        f'DROP TABLE IF EXISTS {index}',
+    ]
+    return create, drop
+
+
+def has_table(connection, table):
+    """Есть ли таблица в базе; проверяется один раз"""
+    key = (connection.alias, table)
+    if key not in _tables:
+        _tables[key] = table in connection.introspection.table_names()
+    return _tables[key]
+
+
+@SearchField.register_lookup
+class TrigramContains(Contains):
+    """Подстрока по индексу trigram вместо LIKE '%...%'.
+
+    Нормализованный запрос ищется как фраза в индексе подстрок поля, что
+    совпадает с LIKE по смыслу, но не обходит таблицу. Запрос короче
+    TRIGRAM_MIN_LENGTH или база без индекса проверяются обычным LIKE.
+    """
+
+    def as_sql(self, compiler, connection):
+        if not isinstance(self.lhs, Col) or not isinstance(self.rhs, str):
+            return super().as_sql(compiler, connection)
+        model = self.lhs.target.model
+        table = get_trigram_table(model._meta.db_table, self.lhs.target.column)
+        if (
+            connection.vendor != 'sqlite'
+            or len(self.rhs) < TRIGRAM_MIN_LENGTH
+            or not has_table(connection, table)
+        ):
+            return super().as_sql(compiler, connection)
+        pk, pk_params = compiler.compile(
+            model._meta.pk.get_col(self.lhs.alias)
+        )
+        phrase = '"{}"'.format(self.rhs.replace('"', '""'))
+        return (
+            f'{pk} IN (SELECT rowid FROM {table} WHERE {table} MATCH %s)',
+            [*pk_params, phrase]
+        )
+
+
+class NormalizedSearchMixin:
+    """Заполняет поля поиска при сохранении модели.
+
+    search_sources сопоставляет поле SearchField полю, копию которого
+    оно хранит. Массовые операции заполняют эти поля через
+    NormalizedSearchQuerySet, загрузка CSV — сама.
+    """
+
+    search_sources = {}
+
+    def fill_search_fields(self, update_fields=None):
+        """Обновляет поля поиска и возвращает их имена"""
+        filled = []
+        for field, source in self.search_sources.items():
+            if update_fields is None or source in update_fields:
+                setattr(self, field, normalize_search(getattr(self, source)))
+                filled.append(field)
+        return filled
+
+    def save(self, *args, **kwargs):
+        filled = self.fill_search_fields(kwargs.get('update_fields'))
+        if filled and kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *filled}
+        super().save(*args, **kwargs)
+
+
+class NormalizedSearchQuerySet(models.QuerySet):
+    """bulk_create и bulk_update, заполняющие поля поиска"""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        filled = set()
+        for obj in objs:
+            filled.update(obj.fill_search_fields())
+        update_fields = kwargs.get('update_fields')
+        if update_fields:
+            # При update_conflicts поле поиска обновляется вместе
+            # с исходным.
+            kwargs['update_fields'] = [*update_fields, *(
+                field for field in filled
+                if self.model.search_sources[field] in update_fields
+                and field not in update_fields
+            )]
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        filled = set()
+        for obj in objs:
+            filled.update(obj.fill_search_fields(fields))
+        return super().bulk_update(
+            objs, [*fields, *filled - set(fields)], *args, **kwargs
+        )
@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.db.models import (
+    Case, Count, F, IntegerField, QuerySet, Sum, Value, When
+)
+from django.db.models.functions import Greatest, Mod, NullIf
+from django.db.models.lookups import Exact, GreaterThan
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from .models import Review, Title
+
+# Отправляется после массовых изменений в обход сигналов моделей;
+# аргумент models — изменённые модели, необязательный title_ids — id
+# затронутых произведений, если изменились только они.
+bulk_changed = Signal()
+
+
+def rounded_average(total, count):
+    """SQL-выражение round(total / count) с тем же округлением половин к
+    чётному, что у Title.count_rating; при count = 0 — NULL"""
+    quotient = total / NullIf(count, Value(0))
+    twice_remainder = (total - quotient * count) * 2
+    return Case(
+        When(GreaterThan(twice_remainder, count), then=quotient + 1),
+        When(Exact(twice_remainder, count), then=quotient + Mod(quotient, 2)),
+        default=quotient,
+        output_field=IntegerField()
+    )
+
+
+def change_rating(title_id, score, count):
+    """Сдвигает счётчики рейтинга произведения одним UPDATE.
+
+    Счётчики и рейтинг считаются в базе от текущих значений строки,
+    поэтому параллельные изменения не теряются. Счётчики не опускаются
+    ниже нуля, даже если разошлись с отзывами.
+    """
+    total = Greatest(
+        F('rating_sum') + score, Value(0), output_field=IntegerField()
+    )
+    new_count = Greatest(
+        F('rating_count') + count, Value(0), output_field=IntegerField()
+    )
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=total,
+        rating_count=new_count,
+        rating=rounded_average(total, new_count)
+    )
+    rating_changed(title_id)
+
+
+def recount_rating(title_id):
+    """Пересчитывает счётчики рейтинга произведения по отзывам"""
+    totals = Review.objects.filter(title_id=title_id).aggregate(
+        total=Sum('score'), count=Count('pk')
+    )
+    title = Title(
+        pk=title_id, rating_sum=totals['total'] or 0,
+        rating_count=totals['count']
+    )
+    title.count_rating()
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=title.rating_sum,
+        rating_count=title.rating_count,
+        rating=title.rating
+    )
+    rating_changed(title_id)
+
+
+def rating_changed(title_id):
+    """Счётчики пишутся через update(), поэтому об изменении произведения
+    сообщает bulk_changed"""
+    bulk_changed.send(sender=Title, models=[Title], title_ids=[title_id])
+
+
+def is_deleted_with(origin, models):
+    """Начато ли удаление с объекта или queryset одной из моделей"""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, models)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    """Учитывает новую или изменённую оценку в рейтинге произведения"""
+    if created:
+        change_rating(instance.title_id, instance.score, 1)
+    else:
+        old_title_id, old_score = getattr(instance, '_rated', (None, None))
+        if old_title_id is None or old_score is None:
+            for title_id in {old_title_id, instance.title_id} - {None}:
+                recount_rating(title_id)
+        elif old_title_id != instance.title_id:
+            change_rating(old_title_id, -old_score, -1)
+            change_rating(instance.title_id, instance.score, 1)
+        elif old_score != instance.score:
+            change_rating(instance.title_id, instance.score - old_score, 0)
+    instance.remember_rating()
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, origin=None, **kwargs):
+    """Убирает оценку удалённого отзыва из рейтинга произведения.
+
+    При удалении произведения его счётчики не нужны, а при удалении
+    автора они уже сдвинуты разом в remove_author_ratings.
+    """
+    if is_deleted_with(origin, (Title, Review.author.field.related_model)):
+        return
+    change_rating(instance.title_id, -instance.score, -1)
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def remove_author_ratings(sender, instance, **kwargs):
+    """Убирает оценки удаляемого пользователя: по UPDATE на произведение"""
+    for row in Review.objects.filter(author=instance).order_by().values(
+        'title'
+    ).annotate(total=Sum('score'), count=Count('pk')):
+        change_rating(row['title'], -row['total'], -row['count'])
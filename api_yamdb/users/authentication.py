@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from .models import User
+
+
+# Утверждения токена, из которых собирается пользователь без запроса к БД.
+USER_CLAIMS = {
+    'user_id': 'id',
+    'username': 'username',
+    'role': 'role',
+    'is_superuser': 'is_superuser',
+    'is_active': 'is_active',
+    'ver': 'token_version',
+}
+
+
+class TokenVersionCache:
+    """Версии токенов пользователей, закешированные в процессе.
+
+    Версия читается из БД не чаще раза в timeout секунд на пользователя.
+    Запись пользователя в этом же процессе обновляет версию сразу, в
+    остальных процессах отзыв вступает в силу не позже чем через timeout.
+    """
+
+    def __init__(self, timeout, max_size):
+        self.timeout = timeout
+        self.max_size = max_size
+        self.versions = {}
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        """Текущая версия токенов или None, если пользователя нет"""
+        with self.lock:
+            version, expires = self.versions.get(user_id, (None, 0))
+        if expires > time.monotonic():
+            return version
+        version = User.objects.filter(pk=user_id).values_list(
+            'token_version', flat=True
+        ).first()
+        self.set(user_id, version)
+        return version
+
+    def set(self, user_id, version):
+        with self.lock:
+            if len(self.versions) >= self.max_size:
+                self.versions.clear()
+            self.versions[user_id] = (
+                version, time.monotonic() + self.timeout
+            )
+
+
+token_versions = TokenVersionCache(
+    settings.JWT_SETTINGS['VERSION_CACHE_SECONDS'],
+    settings.JWT_SETTINGS['VERSION_CACHE_SIZE']
+)
+
+
+class DecodedTokenCache:
+    """Ограниченный LRU-кеш проверенных токенов.
+
+    Ключ — хеш строки токена, значение — токен с уже проверенной подписью
+    и разобранными утверждениями. Запись живёт до exp токена. Отзыв
+    проверяется по версии при каждом запросе, поэтому кешировать
+    проверенную подпись безопасно.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.tokens = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(raw_token):
+        return blake2b(raw_token, digest_size=16).digest()
+
+    def get(self, raw_token):
+        key = self.get_key(raw_token)
+        with self.lock:
+            token, expires = self.tokens.get(key, (None, 0))
+            if expires > time.time():
+                self.tokens.move_to_end(key)
+                self.hits += 1
+                return token
+            if token is not None:
+                del self.tokens[key]
+            self.misses += 1
+        return None
+
+    def set(self, raw_token, token):
+        key = self.get_key(raw_token)
+        with self.lock:
+            self.tokens[key] = (token, token['exp'])
+            self.tokens.move_to_end(key)
+            while len(self.tokens) > self.max_size:
+                self.tokens.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.tokens.clear()
+            self.hits = self.misses = 0
+
+
+decoded_tokens = DecodedTokenCache(
+    settings.JWT_SETTINGS['DECODED_CACHE_SIZE']
+)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без чтения пользователя из БД.
+
+    Токены, выданные AuthViewSet, содержат роль, признаки суперпользователя
+    и активности и версию токенов. Пользователь собирается из этих
+    утверждений как объект с отложенными остальными полями: они загрузятся
+    из БД только при обращении. Неактивный пользователь не проходит
+    аутентификацию, как и в simplejwt. Токены без этих утверждений
+    проверяются как обычно.
+    Проверенные токены запоминаются в decoded_tokens до истечения срока.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = decoded_tokens.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            decoded_tokens.set(raw_token, token)
+        return token
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+        user_id = validated_token['user_id']
+        if token_versions.get(user_id) != validated_token['ver']:
+            raise AuthenticationFailed(
+                'Токен отозван', code='token_revoked'
+            )
+        if not validated_token['is_active']:
+            raise AuthenticationFailed(
+                'Пользователь неактивен', code='user_inactive'
+            )
+        values = {
+            field: validated_token[claim]
+            for claim, field in USER_CLAIMS.items()
+        }
+        # from_db ожидает значения в порядке полей модели.
+        fields = [
+            field.attname for field in User._meta.concrete_fields
+            if field.attname in values
+        ]
+        return User.from_db(
+            DEFAULT_DB_ALIAS, fields, [values[name] for name in fields]
+        )
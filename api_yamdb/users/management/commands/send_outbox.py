@@ -0,0 +1,50 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError
+
+from users.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих писем'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Разобрать очередь один раз и завершиться'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.OUTBOX_SETTINGS['BATCH_SIZE'],
+            help='Количество писем на одно SMTP-соединение'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.OUTBOX_SETTINGS['POLL_INTERVAL'],
+            help='Пауза между проверками очереди, с'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                sent, failed = drain_outbox(options['batch_size'])
+            except OperationalError as error:
+                # База занята другим процессом; очередь разбирается на
+                # следующей итерации, аренда писем истечёт сама.
+                self.stderr.write(f'Ошибка базы данных: {error}')
+                if options['once']:
+                    raise CommandError(error)
+            else:
+                if sent or failed or options['once']:
+                    self.stdout.write(
+                        f'Отправлено: {sent}, '
+                        f'отложено после ошибки: {failed}'
+                    )
+                if options['once']:
+                    return
+            time.sleep(options['interval'])
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:31
+
+import reviews.search
+import users.models
+from django.db import migrations
+
+
+def fill_username_search(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    users = list(User.objects.only('id', 'username').iterator())
+    for user in users:
+        user.username_search = reviews.search.normalize_search(user.username)
+    User.objects.bulk_update(users, ['username_search'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', users.models.UserManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='username_search',
+            field=reviews.search.SearchField(blank=True, db_index=True, default='', editable=False, max_length=150, verbose_name='Имя пользователя для поиска'),
+        ),
+        migrations.RunPython(fill_username_search, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-17 14:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_username_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='claim_token',
+            field=models.CharField(blank=True, db_index=True, max_length=32, verbose_name='Токен обработчика'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import DatabaseError, migrations, transaction
+
+from reviews.search import get_trigram_sql
+
+
+def create_trigram(apps, schema_editor):
+    """Индекс подстрок нормализованных имён пользователей, если SQLite
+    поддерживает токенизатор trigram"""
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    create, _ = get_trigram_sql('users_user', 'username_search')
+    try:
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                for sql in create:
+                    cursor.execute(sql)
+    except DatabaseError:
+        pass
+
+
+def drop_trigram(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    _, drop = get_trigram_sql('users_user', 'username_search')
+    with connection.cursor() as cursor:
+        for sql in drop:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_outgoingemail_claim_token'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram, drop_trigram),
+    ]
@@ -1,8 +1,17 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import UserManager as BaseUserManager
 from django.db import models
 
+from reviews.search import (
+    NormalizedSearchMixin, NormalizedSearchQuerySet, SearchField
+)
 
-class User(AbstractUser):
+
+class UserManager(BaseUserManager.from_queryset(NormalizedSearchQuerySet)):
+    pass
+
+
+class User(NormalizedSearchMixin, AbstractUser):
     USER_ROLE = 'user'
     MODERATOR_ROLE = 'moderator'
     ADMIN_ROLE = 'admin'
@@ -37,6 +46,24 @@ class User(AbstractUser):
         blank=True
     )
 
+    token_version = models.PositiveIntegerField(
+        'Версия токенов',
+        default=0
+    )
+
+    username_search = SearchField(
+        'Имя пользователя для поиска',
+        max_length=150
+    )
+
+    search_sources = {'username_search': 'username'}
+
+    objects = UserManager()
+
+    # Поля, которые токен несёт в утверждениях. Их изменение отзывает
+    # выданные токены.
+    CLAIM_FIELDS = ('username', 'role', 'is_superuser', 'is_active')
+
     class Meta:
         ordering = ['username']
         verbose_name = 'Пользователь'
@@ -45,8 +72,89 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_claims()
+        return instance
+
+    def remember_claims(self):
+        """Запоминает значения полей, попавшие в токены пользователя"""
+        self._claims = tuple(
+            self.__dict__.get(name) for name in self.CLAIM_FIELDS
+        )
+
+    def save(self, *args, **kwargs):
+        claims = getattr(self, '_claims', None)
+        # Изменённые поля утверждений видны обработчикам post_save.
+        self.changed_claims = set(self.CLAIM_FIELDS) if not claims else {
+            name for name, value in zip(self.CLAIM_FIELDS, claims)
+            if value != self.__dict__.get(name)
+        }
+        if claims and self.changed_claims:
+            self.token_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {
+                    *kwargs['update_fields'], 'token_version'
+                }
+        super().save(*args, **kwargs)
+        self.remember_claims()
+
+    def revoke_tokens(self):
+        """Делает недействительными все выданные пользователю токены"""
+        self.token_version += 1
+        self.save(update_fields=['token_version'])
+
     def is_admin(self):
         return self.role == self.ADMIN_ROLE or self.is_superuser
 
     def is_moderator(self):
         return self.role == self.MODERATOR_ROLE
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку"""
+    subject = models.CharField(
+        'Тема',
+        max_length=255
+    )
+    body = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель')
+    recipient = models.EmailField('Получатель')
+    created_at = models.DateTimeField(
+        'Дата создания',
+        auto_now_add=True
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'Попыток отправки',
+        default=0
+    )
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        null=True,
+        blank=True,
+        db_index=True
+    )
+    sent_at = models.DateTimeField(
+        'Дата отправки',
+        null=True,
+        blank=True
+    )
+    last_error = models.TextField(
+        'Последняя ошибка',
+        blank=True
+    )
+    claim_token = models.CharField(
+        'Токен обработчика',
+        max_length=32,
+        blank=True,
+        db_index=True
+    )
+
+    class Meta:
+        ordering = ['next_attempt_at', 'id']
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipient}'
@@ -0,0 +1,113 @@
+"""Очередь исходящих писем.
+
+Письмо сначала записывается в таблицу OutgoingEmail, а отправляет его
+обработчик (команда send_outbox) пачками через одно SMTP-соединение.
+Неудачные письма повторяются с экспоненциальной задержкой.
+"""
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def queue_mail(subject, body, recipient):
+    """Ставит письмо в очередь; отправка не блокирует запрос"""
+    email = OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=settings.EMAIL_SETTINGS['FROM_EMAIL'],
+        recipient=recipient,
+        next_attempt_at=timezone.now()
+    )
+    if settings.EMAIL_BACKEND in settings.OUTBOX_SETTINGS['INLINE_BACKENDS']:
+        transaction.on_commit(drain_outbox)
+    return email
+
+
+def claim_batch(batch_size):
+    """Забирает готовые к отправке письма на время аренды, чтобы
+    параллельный обработчик не отправил их повторно.
+
+    Письма захватываются одним условным UPDATE, который продлевает
+    аренду и записывает токен обработчика; затем они читаются по
+    токену. Повторная проверка next_attempt_at в том же UPDATE не даёт
+    двум обработчикам захватить одно письмо и не требует блокировок
+    строк, которых нет в SQLite.
+    """
+    now = timezone.now()
+    token = uuid4().hex
+    ready = OutgoingEmail.objects.filter(next_attempt_at__lte=now)
+    ready.filter(
+        pk__in=ready.values('pk')[:batch_size]
+    ).update(claim_token=token, next_attempt_at=now + timedelta(
+        seconds=settings.OUTBOX_SETTINGS['LEASE_SECONDS']
+    ))
+    return list(OutgoingEmail.objects.filter(claim_token=token))
+
+
+def mark_failed(email, error):
+    """Откладывает письмо с экспоненциальной задержкой; после
+    MAX_ATTEMPTS попыток письмо больше не отправляется"""
+    options = settings.OUTBOX_SETTINGS
+    email.attempts += 1
+    email.last_error = repr(error)
+    email.next_attempt_at = None
+    if email.attempts < options['MAX_ATTEMPTS']:
+        email.next_attempt_at = timezone.now() + timedelta(
+            seconds=options['RETRY_DELAY'] * 2 ** (email.attempts - 1)
+        )
+
+
+def send_batch(emails):
+    """Отправляет письма через одно соединение и записывает результат"""
+    sent, failed = [], []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            mark_failed(email, error)
+        failed = emails
+    else:
+        with connection:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email,
+                    [email.recipient], connection=connection
+                )
+                try:
+                    connection.send_messages([message])
+                except Exception as error:
+                    mark_failed(email, error)
+                    failed.append(email)
+                else:
+                    email.attempts += 1
+                    email.sent_at = timezone.now()
+                    email.next_attempt_at = None
+                    sent.append(email)
+    for email in emails:
+        email.claim_token = ''
+    OutgoingEmail.objects.bulk_update(emails, [
+        'attempts', 'sent_at', 'next_attempt_at', 'last_error',
+        'claim_token'
+    ])
+    return sent, failed
+
+
+def drain_outbox(batch_size=None):
+    """Отправляет все готовые письма; возвращает число отправленных
+    и неудавшихся"""
+    batch_size = batch_size or settings.OUTBOX_SETTINGS['BATCH_SIZE']
+    sent_count = failed_count = 0
+    while True:
+        emails = claim_batch(batch_size)
+        if not emails:
+            return sent_count, failed_count
+        sent, failed = send_batch(emails)
+        sent_count += len(sent)
+        failed_count += len(failed)
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import token_versions
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def update_token_version(sender, instance, **kwargs):
+    """Сразу применяет отзыв токенов в текущем процессе"""
+    if 'token_version' in instance.__dict__:
+        pk, version = instance.pk, instance.token_version
+        transaction.on_commit(lambda: token_versions.set(pk, version))
+
+
+@receiver(post_delete, sender=User)
+def forget_token_version(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: token_versions.set(pk, None))
@@ -1,24 +1,25 @@
 import random
 from datetime import datetime, timedelta
+from uuid import uuid4
+
 import jwt
 
 from django.conf import settings
-from django.core.mail import send_mail
-from rest_framework import filters, status, viewsets
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
+from api.filters import NormalizedSearchFilter
+
 from .models import User
+from .outbox import queue_mail
 from .permissions import IsAdmin
 from .serializers import (
     UserSerializer, UserSignUpSerializer, UserTokenSerializer
 )
 
 
-TOKEN_EXPIRATION_DAYS = 1
-
-
 class UserViewSet(viewsets.ModelViewSet):
     """Вьюсет для пользователей (только для администраторов)"""
     queryset = User.objects.all()
@@ -28,8 +29,8 @@ class UserViewSet(viewsets.ModelViewSet):
 
     http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
 
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('username',)
+    filter_backends = (NormalizedSearchFilter,)
+    search_fields = ('username_search',)
 
     @action(
         methods=['get', 'patch'],
@@ -39,16 +40,19 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def get_me(self, request):
         """Получение и изменение своего профиля"""
+        # Пользователь из токена содержит только утверждения токена,
+        # профилю нужна полная строка.
+        user = User.objects.get(pk=request.user.pk)
         if request.method == 'GET':
-            serializer = self.get_serializer(request.user)
+            serializer = self.get_serializer(user)
             return Response(serializer.data)
 
         data = request.data.copy()
-        if not request.user.is_admin() and 'role' in data:
+        if not user.is_admin() and 'role' in data:
             del data['role']
 
         serializer = self.get_serializer(
-            request.user,
+            user,
             data=data,
             partial=True
         )
@@ -66,14 +70,29 @@ class AuthViewSet(viewsets.ViewSet):
         return str(random.randint(100000, 999999))
 
     def generate_jwt_token(self, user):
-        """Генерация JWT токена самостоятельно"""
+        """Генерация JWT токена самостоятельно.
+
+        Роль, признаки суперпользователя и активности и версия токенов
+        позволяют аутентифицировать запрос без чтения пользователя из БД.
+        """
         payload = {
+            'token_type': 'access',
+            'jti': uuid4().hex,
             'user_id': user.id,
             'username': user.username,
-            'exp': datetime.utcnow() + timedelta(days=TOKEN_EXPIRATION_DAYS),
+            'role': user.role,
+            'is_superuser': user.is_superuser,
+            'is_active': user.is_active,
+            'ver': user.token_version,
+            'exp': datetime.utcnow() + timedelta(
+                days=settings.JWT_SETTINGS['EXPIRATION_DAYS']
+            ),
             'iat': datetime.utcnow(),
         }
-        token = jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
+        token = jwt.encode(
+            payload, settings.SECRET_KEY,
+            algorithm=settings.JWT_SETTINGS['ALGORITHM']
+        )
         return token
 
     @action(methods=['post'], detail=False, url_path='signup')
@@ -95,12 +114,10 @@ class AuthViewSet(viewsets.ViewSet):
             user.confirmation_code = confirmation_code
             user.save()
 
-            send_mail(
+            queue_mail(
                 'Новый код подтверждения для YaMDb',
                 f'Ваш новый код подтверждения: {confirmation_code}',
-                'yamdb@example.com',
-                [email],
-                fail_silently=False,
+                email
             )
 
             return Response(
@@ -130,12 +147,10 @@ class AuthViewSet(viewsets.ViewSet):
         user.confirmation_code = confirmation_code
         user.save()
 
-        send_mail(
+        queue_mail(
             'Код подтверждения для YaMDb',
             f'Ваш код подтверждения: {confirmation_code}',
-            'yamdb@example.com',
-            [email],
-            fail_silently=False,
+            email
         )
 
         return Response(
@@ -166,6 +181,12 @@ class AuthViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if not user.is_active:
+            return Response(
+                {'error': 'Учётная запись отключена'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         token = self.generate_jwt_token(user)
         return Response({'token': token}, status=status.HTTP_200_OK)
 
@@ -192,5 +213,11 @@ class AuthViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        if not user.is_active:
+            return Response(
+                {'error': 'Учётная запись отключена'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         token = self.generate_jwt_token(user)
         return Response({'token': token}, status=status.HTTP_200_OK)
@@ -0,0 +1,60 @@
+"""Стоимость аутентификации одного запроса по JWT.
+
+Сравнивает ClaimsJWTAuthentication с кешем проверенных токенов и без него
+и исходную JWTAuthentication из simplejwt с чтением пользователя из БД.
+"""
+import argparse
+
+from utils import measure, setup_django
+
+
+def run(requests_count):
+    from rest_framework.test import APIRequestFactory
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    from users.authentication import ClaimsJWTAuthentication, decoded_tokens
+    from users.models import User
+    from users.views import AuthViewSet
+
+    user = User.objects.create_user(
+        username='bench', email='bench@yamdb.fake', role='admin'
+    )
+    token = AuthViewSet().generate_jwt_token(user)
+    request = APIRequestFactory().get(
+        '/', HTTP_AUTHORIZATION=f'Bearer {token}'
+    )
+
+    def authenticate(backend, before=None):
+        def run_requests():
+            for _ in range(requests_count):
+                if before:
+                    before()
+                backend.authenticate(request)
+        return run_requests
+
+    claims = ClaimsJWTAuthentication()
+    measure(
+        f'{requests_count} запросов, simplejwt с чтением пользователя',
+        authenticate(JWTAuthentication())
+    )
+    measure(
+        f'{requests_count} запросов, утверждения без кеша токенов',
+        authenticate(claims, before=decoded_tokens.clear)
+    )
+    decoded_tokens.clear()
+    measure(
+        f'{requests_count} запросов, утверждения с кешем токенов',
+        authenticate(claims)
+    )
+    print(
+        f'Попаданий в кеш: {decoded_tokens.hits}, '
+        f'промахов: {decoded_tokens.misses}'
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=10000)
+    args = parser.parse_args()
+    setup_django()
+    run(args.requests)
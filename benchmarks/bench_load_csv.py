@@ -0,0 +1,99 @@
+"""Загрузка синтетического набора CSV командой load_csv.
+
+По умолчанию генерирует 10M отзывов; объём задаётся параметрами.
+С --incremental загружает набор инкрементально и повторяет синхронизацию
+без изменений.
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from utils import setup_django
+
+PUB_DATE = '2019-09-24T21:08:21.567Z'
+
+
+def write_csv(path, header, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def generate(data_dir, users, titles, reviews):
+    """Создаёт CSV-файлы в формате static/data."""
+    random.seed(0)
+    per_title = max(reviews // titles, 1)
+    write_csv(
+        data_dir / 'users.csv',
+        ('id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'),
+        ((pk, f'user{pk}', f'user{pk}@yamdb.fake', 'user', '', '', '')
+         for pk in range(1, users + 1))
+    )
+    write_csv(data_dir / 'category.csv', ('id', 'name', 'slug'),
+              ((pk, f'Категория {pk}', f'category-{pk}') for pk in (1, 2, 3)))
+    write_csv(data_dir / 'genre.csv', ('id', 'name', 'slug'),
+              ((pk, f'Жанр {pk}', f'genre-{pk}') for pk in range(1, 16)))
+    write_csv(
+        data_dir / 'titles.csv', ('id', 'name', 'year', 'category'),
+        ((pk, f'Произведение {pk}', 1900 + pk % 120, pk % 3 + 1)
+         for pk in range(1, titles + 1))
+    )
+    write_csv(
+        data_dir / 'genre_title.csv', ('id', 'title_id', 'genre_id'),
+        ((pk, pk, pk % 15 + 1) for pk in range(1, titles + 1))
+    )
+    write_csv(
+        data_dir / 'review.csv',
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        ((title_id * per_title + offset + 1, title_id + 1, 'Текст отзыва',
+          (title_id + offset) % users + 1, random.randint(1, 10), PUB_DATE)
+         for title_id in range(titles) for offset in range(per_title))
+    )
+    write_csv(
+        data_dir / 'comments.csv',
+        ('id', 'review_id', 'text', 'author', 'pub_date'),
+        ((pk, pk, 'Текст комментария', pk % users + 1, PUB_DATE)
+         for pk in range(1, titles + 1))
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--titles', type=int, default=100000)
+    parser.add_argument('--reviews', type=int, default=10000000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--incremental', action='store_true')
+    args = parser.parse_args()
+
+    data_dir = Path(tempfile.mkdtemp())
+    started = time.perf_counter()
+    generate(data_dir, args.users, args.titles, args.reviews)
+    print(f'CSV сгенерированы за {time.perf_counter() - started:.1f} с')
+
+    setup_django()
+    from django.core.management import call_command
+
+    started = time.perf_counter()
+    call_command(
+        'load_csv', path=data_dir, batch_size=args.batch_size,
+        workers=args.workers, incremental=args.incremental
+    )
+    print(f'Загрузка заняла {time.perf_counter() - started:.1f} с')
+
+    if args.incremental:
+        started = time.perf_counter()
+        call_command(
+            'load_csv', path=data_dir, batch_size=args.batch_size,
+            workers=args.workers, incremental=True
+        )
+        print(
+            'Повторная синхронизация без изменений заняла '
+            f'{time.perf_counter() - started:.1f} с'
+        )
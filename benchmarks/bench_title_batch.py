@@ -0,0 +1,81 @@
+"""Загрузка ленты из произведений: по одному запросу на id против
+одного запроса ``GET /api/v1/titles/?ids=...``.
+
+Кеши ответов очищаются перед каждым прогоном, чтобы сравнивать
+обращения к базе, а не попадания в кеш.
+"""
+import argparse
+import random
+
+from utils import measure, setup_django
+
+
+def fill(titles_count):
+    from django.db import transaction
+
+    from reviews.models import Category, Genre, GenreTitle, Title
+
+    random.seed(0)
+    with transaction.atomic():
+        categories = Category.objects.bulk_create(
+            Category(name=f'Категория {number}', slug=f'category-{number}')
+            for number in range(10)
+        )
+        genres = Genre.objects.bulk_create(
+            Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(30)
+        )
+        titles = Title.objects.bulk_create(
+            (Title(name=f'Произведение {number}', year=2000,
+                   category=random.choice(categories))
+             for number in range(titles_count)),
+            batch_size=10000
+        )
+        GenreTitle.objects.bulk_create(
+            (GenreTitle(title=title, genre=genre)
+             for title in titles for genre in random.sample(genres, 3)),
+            batch_size=10000
+        )
+    return [title.pk for title in titles]
+
+
+def run(ids, batch_size, requests_count):
+    from django.core.cache import cache
+    from django.test import Client
+
+    client = Client()
+    feeds = [random.sample(ids, batch_size) for _ in range(requests_count)]
+
+    def one_by_one():
+        cache.clear()
+        for feed in feeds:
+            for pk in feed:
+                assert client.get(f'/api/v1/titles/{pk}/').status_code == 200
+
+    def batch():
+        cache.clear()
+        for feed in feeds:
+            response = client.get(
+                '/api/v1/titles/', {'ids': ','.join(map(str, feed))}
+            )
+            assert response.status_code == 200
+
+    measure(
+        f'{requests_count} лент по {batch_size}, запрос на каждый id',
+        one_by_one, repeat=3
+    )
+    measure(
+        f'{requests_count} лент по {batch_size}, один запрос ?ids=',
+        batch, repeat=3
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=100000)
+    parser.add_argument('--batch', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+    setup_django()
+    ids = fill(args.titles)
+    run(ids, args.batch, args.requests)
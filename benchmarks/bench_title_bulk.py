@@ -0,0 +1,58 @@
+"""Загрузка произведений каталога: POST на каждое произведение против
+одного ``POST /api/v1/titles/bulk/`` со списком."""
+import argparse
+
+from utils import measure, setup_django
+
+
+def run(titles_count):
+    from django.test import Client
+
+    from reviews.models import Category, Genre, Title
+    from users.models import User
+    from users.views import AuthViewSet
+
+    Category.objects.create(name='Книги', slug='books')
+    for number in range(5):
+        Genre.objects.create(name=f'Жанр {number}', slug=f'genre-{number}')
+    admin = User.objects.create_user(
+        username='bench', email='bench@yamdb.fake', role='admin'
+    )
+    client = Client(
+        HTTP_AUTHORIZATION=f'Bearer {AuthViewSet().generate_jwt_token(admin)}'
+    )
+    data = [
+        {
+            'name': f'Произведение {number}', 'year': 2000,
+            'category': 'books',
+            'genre': [f'genre-{number % 5}', f'genre-{(number + 1) % 5}'],
+        }
+        for number in range(titles_count)
+    ]
+
+    def one_by_one():
+        for item in data:
+            response = client.post(
+                '/api/v1/titles/', item, content_type='application/json'
+            )
+            assert response.status_code == 201
+
+    def bulk():
+        response = client.post(
+            '/api/v1/titles/bulk/', data, content_type='application/json'
+        )
+        assert response.status_code == 201
+
+    measure(
+        f'{titles_count} произведений, POST на каждое', one_by_one, repeat=1
+    )
+    Title.objects.all().delete()
+    measure(f'{titles_count} произведений, один POST bulk/', bulk, repeat=1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=10000)
+    args = parser.parse_args()
+    setup_django()
+    run(args.titles)
@@ -0,0 +1,88 @@
+"""Фильтрация и сортировка произведений по рейтингу на 1M отзывов.
+
+Сравнивает хранимый индексированный рейтинг с агрегатом Avg по отзывам.
+"""
+import argparse
+import random
+
+from utils import measure, setup_django
+
+
+def fill(titles_count, users_count, reviews_count):
+    from django.core.management import call_command
+    from django.db import connection, transaction
+
+    from reviews.models import Category, Genre, GenreTitle, Review, Title
+    from users.models import User
+
+    random.seed(0)
+    with transaction.atomic():
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genres = Genre.objects.bulk_create(
+            Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(10)
+        )
+        User.objects.bulk_create(
+            (User(username=f'user{number}', email=f'user{number}@yamdb.fake')
+             for number in range(users_count)),
+            batch_size=5000
+        )
+        Title.objects.bulk_create(
+            (Title(name=f'Произведение {number}', year=2000,
+                   category=category)
+             for number in range(titles_count)),
+            batch_size=5000
+        )
+        title_ids = list(Title.objects.values_list('pk', flat=True))
+        user_ids = list(User.objects.values_list('pk', flat=True))
+        GenreTitle.objects.bulk_create(
+            (GenreTitle(title_id=title_id, genre=random.choice(genres))
+             for title_id in title_ids),
+            batch_size=5000
+        )
+        per_title = reviews_count // titles_count
+        Review.objects.bulk_create(
+            (Review(title_id=title_id, author_id=author_id, text='Текст',
+                    score=random.randint(1, 10))
+             for title_id in title_ids
+             for author_id in random.sample(user_ids, per_title)),
+            batch_size=10000
+        )
+    call_command('rebuild_rating', verbosity=0, stdout=open('/dev/null', 'w'))
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def run():
+    from django.db.models import Avg
+    from rest_framework.test import APIClient
+
+    from reviews.models import Title
+
+    client = APIClient()
+    url = '/api/v1/titles/?genre=genre-3&rating_min=8&ordering=-rating'
+    measure(f'GET {url}', lambda: client.get(url))
+
+    stored = Title.objects.filter(
+        genre__slug='genre-3', rating__gte=8
+    ).order_by('-rating')[:10]
+    aggregated = Title.objects.filter(genre__slug='genre-3').annotate(
+        avg_rating=Avg('reviews__score')
+    ).filter(avg_rating__gte=7.5).order_by('-avg_rating')[:10]
+    measure('Хранимый рейтинг, первая страница',
+            lambda: list(stored.all()))
+    measure('Агрегат Avg по отзывам, первая страница',
+            lambda: list(aggregated.all()))
+    print('\nПлан запроса по хранимому рейтингу:')
+    print(stored.explain())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=10000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--reviews', type=int, default=1000000)
+    args = parser.parse_args()
+    setup_django()
+    fill(args.titles, args.users, args.reviews)
+    run()
@@ -0,0 +1,57 @@
+"""Чтение произведений через сериализатор строк values() против
+TitleReadSerializer: страницы списка и выборки ``?ids=``.
+
+Кеши ответов очищаются перед каждым запросом, чтобы сравнивать
+сериализацию, а не попадания в кеш.
+"""
+import argparse
+import random
+
+from bench_title_batch import fill
+from utils import measure, setup_django
+
+
+def run(ids, pages, batch_size):
+    from django.core.cache import cache
+    from django.test import Client
+
+    from api.mixins import RowReadMixin
+
+    client = Client()
+    feeds = [
+        ','.join(map(str, random.sample(ids, batch_size)))
+        for _ in range(pages)
+    ]
+
+    def read():
+        for page in range(1, pages + 1):
+            cache.clear()
+            response = client.get('/api/v1/titles/', {'page': page})
+            assert response.status_code == 200
+        for feed in feeds:
+            cache.clear()
+            response = client.get('/api/v1/titles/', {'ids': feed})
+            assert response.status_code == 200
+
+    use_rows = RowReadMixin.use_rows
+    RowReadMixin.use_rows = lambda self: False
+    measure(
+        f'{pages} страниц и {pages} выборок по {batch_size}, сериализаторы',
+        read, repeat=3
+    )
+    RowReadMixin.use_rows = use_rows
+    measure(
+        f'{pages} страниц и {pages} выборок по {batch_size}, строки values()',
+        read, repeat=3
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=10000)
+    parser.add_argument('--pages', type=int, default=100)
+    parser.add_argument('--batch', type=int, default=100)
+    args = parser.parse_args()
+    setup_django()
+    ids = fill(args.titles)
+    run(ids, args.pages, args.batch)
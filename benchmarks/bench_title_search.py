@@ -0,0 +1,82 @@
+"""Поиск произведений по названию и описанию на 1M произведений.
+
+Сравнивает индекс FTS5 (режимы слова и префикса) с LIKE '%q%', в который
+компилируется SearchFilter.
+"""
+import argparse
+import random
+
+from utils import measure, setup_django
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщыэюя'
+
+
+def make_words(count):
+    random.seed(0)
+    return list({
+        ''.join(random.choices(ALPHABET, k=random.randint(4, 10)))
+        for _ in range(count)
+    })
+
+
+def fill(titles_count, words):
+    from django.db import connection, transaction
+
+    from reviews.models import Title
+
+    with transaction.atomic():
+        Title.objects.bulk_create(
+            (Title(name=' '.join(random.sample(words, 3)).capitalize(),
+                   year=2000,
+                   description=' '.join(random.sample(words, 12)))
+             for _ in range(titles_count)),
+            batch_size=10000
+        )
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def run(words):
+    from rest_framework.test import APIRequestFactory
+
+    from api.filters import FullTextSearchFilter
+    from reviews.models import Title
+
+    word = words[len(words) // 2]
+    backend = FullTextSearchFilter()
+    factory = APIRequestFactory()
+
+    def search(params):
+        request = factory.get('/', params)
+        request.query_params = request.GET
+        queryset = backend.filter_queryset(
+            request, Title.objects.all(), view=None
+        )
+        return lambda: list(queryset.all()[:10])
+
+    print(f'Слово: {word}')
+    measure('FTS5, слово, первые 10', search({'search': word}), repeat=20)
+    measure(
+        'FTS5, префикс, первые 10',
+        search({'search': word[:3], 'search_mode': 'prefix'}), repeat=20
+    )
+    measure(
+        "LIKE '%q%' по name и description, первые 10",
+        lambda: list(
+            Title.objects.filter(name__icontains=word).union(
+                Title.objects.filter(description__icontains=word)
+            )[:10]
+        ),
+        repeat=3
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=1000000)
+    parser.add_argument('--words', type=int, default=50000)
+    args = parser.parse_args()
+    setup_django()
+    words = make_words(args.words)
+    fill(args.titles, words)
+    run(words)
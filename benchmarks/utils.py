@@ -0,0 +1,43 @@
+"""Общие помощники для нагрузочных замеров.
+
+Замеры запускаются из корня репозитория, например:
+    python benchmarks/bench_title_rating.py
+и работают с отдельной временной базой SQLite.
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PROJECT_DIR = BASE_DIR / 'api_yamdb'
+
+
+def setup_django(db_name='benchmark.sqlite3'):
+    """Настраивает Django на временную базу и применяет миграции."""
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    db_path = Path(tempfile.mkdtemp()) / db_name
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    django.setup()
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+def measure(label, func, repeat=5):
+    """Выполняет func несколько раз и печатает лучшее время."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    print(f'{label:<60} {min(timings) * 1000:10.2f} ms')
+    return result
@@ -0,0 +1,32 @@
+import shutil
+import tempfile
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+
+from api.slugs import slug_maps
+from api.suggest import suggest_index
+
+
+def pytest_configure(config):
+    """Кеш тестов во временном каталоге: очистка между тестами не
+    трогает кеш в каталоге проекта"""
+    location = tempfile.mkdtemp(prefix='api_yamdb_cache_')
+    settings.CACHES = {'default': {
+        **settings.CACHES['default'], 'LOCATION': location
+    }}
+    config.add_cleanup(lambda: shutil.rmtree(location, ignore_errors=True))
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    suggest_index.reset()
+    for slug_map in slug_maps.values():
+        slug_map.clear()
+    yield
+    cache.clear()
+    suggest_index.reset()
+    for slug_map in slug_maps.values():
+        slug_map.clear()
@@ -0,0 +1,212 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_titles_with_reviews(self, authors, count):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        titles = []
+        for number in range(count):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category
+            )
+            for score, author in enumerate(authors, start=number % 3 + 1):
+                Review.objects.create(
+                    title=title, author=author, text='Текст', score=score
+                )
+            titles.append(title)
+        return titles
+
+    def get_list_queries(self, client):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        return len(context.captured_queries), response.json()
+
+    def test_01_rating_matches_property(self, client, admin, moderator,
+                                        user):
+        titles = self.create_titles_with_reviews([admin, moderator, user], 3)
+        _, data = self.get_list_queries(client)
+        ratings = {item['id']: item['rating'] for item in data['results']}
+        for title in titles:
+            bare_title = Title.objects.get(pk=title.pk)
+            assert ratings[title.pk] == bare_title.rating, (
+                'Проверьте, что рейтинг в списке произведений совпадает со '
+                'значением свойства `Title.rating`.'
+            )
+
+    def test_02_list_queries_do_not_grow(self, client, admin, moderator,
+                                         user):
+        self.create_titles_with_reviews([admin, moderator, user], 2)
+        queries_for_two, _ = self.get_list_queries(client)
+        for number in range(8):
+            title = Title.objects.create(name=f'Ещё {number}', year=2001)
+            Review.objects.create(
+                title=title, author=user, text='Текст', score=5
+            )
+        queries_for_ten, _ = self.get_list_queries(client)
+        assert queries_for_two == queries_for_ten, (
+            'Проверьте, что число SQL-запросов к `/api/v1/titles/` не '
+            'зависит от количества произведений на странице.'
+        )
+
+    def test_03_counters_follow_review_writes(self, user_client, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        url = f'{self.TITLES_URL}{title.pk}/reviews/'
+        response = user_client.post(url, data={'text': 'Текст', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED
+        review_id = response.json()['id']
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (7, 1), (
+            'Проверьте, что создание отзыва обновляет счётчики рейтинга.'
+        )
+
+        user_client.patch(f'{url}{review_id}/', data={'score': 3})
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (3, 1), (
+            'Проверьте, что изменение оценки обновляет счётчики рейтинга.'
+        )
+
+        user_client.delete(f'{url}{review_id}/')
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (0, 0), (
+            'Проверьте, что удаление отзыва обновляет счётчики рейтинга.'
+        )
+        assert title.rating is None
+
+    def test_04_counters_follow_cascade_delete(self, admin, user):
+        title, = self.create_titles_with_reviews([admin, user], 1)
+        user.delete()
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (1, 1), (
+            'Проверьте, что каскадное удаление отзывов вместе с '
+            'пользователем обновляет счётчики рейтинга.'
+        )
+
+    def test_05_rebuild_rating_command(self, admin, user):
+        title, = self.create_titles_with_reviews([admin, user], 1)
+        Title.objects.filter(pk=title.pk).update(rating_sum=0, rating_count=5)
+        out = StringIO()
+        call_command('rebuild_rating', stdout=out)
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (3, 2), (
+            'Проверьте, что команда `rebuild_rating` восстанавливает '
+            'счётчики рейтинга по отзывам.'
+        )
+        assert 'Расхождений найдено: 1' in out.getvalue()
+
+    def test_06_filter_and_order_by_rating(self, client, admin, moderator,
+                                           user):
+        titles = self.create_titles_with_reviews([admin, moderator, user], 3)
+        ratings = {title.pk: Title.objects.get(pk=title.pk).rating
+                   for title in titles}
+
+        response = client.get(f'{self.TITLES_URL}?ordering=-rating')
+        assert response.status_code == HTTPStatus.OK
+        received = [item['rating'] for item in response.json()['results']]
+        assert received == sorted(ratings.values(), reverse=True), (
+            'Проверьте, что параметр `ordering=-rating` сортирует '
+            'произведения по убыванию рейтинга.'
+        )
+
+        response = client.get(
+            f'{self.TITLES_URL}?rating_min=3&rating_max=3'
+        )
+        expected = {pk for pk, rating in ratings.items() if rating == 3}
+        received = {item['id'] for item in response.json()['results']}
+        assert received == expected, (
+            'Проверьте, что параметры `rating_min` и `rating_max` '
+            'фильтруют произведения по рейтингу.'
+        )
+
+    def get_delete_queries(self, obj):
+        with CaptureQueriesContext(connection) as context:
+            obj.delete()
+        return [query['sql'] for query in context.captured_queries]
+
+    def test_07_title_delete_skips_rating(self, django_user_model):
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author{number}', email=f'a{number}@yamdb.fake'
+            )
+            for number in range(12)
+        ]
+        small, = self.create_titles_with_reviews(authors[:2], 1)
+        Category.objects.all().delete()
+        large, = self.create_titles_with_reviews(authors, 1)
+        small_queries = self.get_delete_queries(small)
+        large_queries = self.get_delete_queries(large)
+        assert len(small_queries) == len(large_queries), (
+            'Проверьте, что при удалении произведения число запросов не '
+            'зависит от числа его отзывов.'
+        )
+        assert not [
+            sql for sql in large_queries
+            if sql.startswith('UPDATE') and 'reviews_title' in sql
+        ], (
+            'Проверьте, что при удалении произведения не пересчитываются '
+            'счётчики его рейтинга.'
+        )
+
+    def test_08_delete_with_drifted_counters(self, admin, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        other = Title.objects.create(name='Другое', year=2000)
+        Review.objects.bulk_create([
+            Review(title=title, author=admin, text='Текст', score=5),
+            Review(title=other, author=admin, text='Текст', score=5),
+        ])
+        title.delete()
+        assert not Review.objects.filter(title_id=title.pk).exists()
+        admin.delete()
+        other.refresh_from_db()
+        assert (other.rating_sum, other.rating_count) == (0, 0), (
+            'Проверьте, что разошедшиеся счётчики не уходят ниже нуля и '
+            'не мешают удалению.'
+        )
+
+    def test_09_author_delete_one_update_per_title(self, admin, user):
+        titles = self.create_titles_with_reviews([admin, user], 3)
+        queries = self.get_delete_queries(user)
+        updates = [
+            sql for sql in queries
+            if sql.startswith('UPDATE') and 'reviews_title' in sql
+        ]
+        assert len(updates) == len(titles)
+        for title in titles:
+            title.refresh_from_db()
+            assert title.rating_count == 1
+            assert title.rating == title.rating_sum
+
+    def test_10_rating_rounding_matches_model(self, django_user_model):
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author{number}', email=f'a{number}@yamdb.fake'
+            )
+            for number in range(4)
+        ]
+        for scores in ((2, 3), (3, 4), (1, 2, 2, 2), (1, 1, 2), (7, 8, 10)):
+            title = Title.objects.create(name='Произведение', year=2000)
+            for author, score in zip(authors, scores):
+                Review.objects.create(
+                    title=title, author=author, text='Текст', score=score
+                )
+            title.refresh_from_db()
+            expected = Title(
+                rating_sum=sum(scores), rating_count=len(scores)
+            )
+            expected.count_rating()
+            assert title.rating == expected.rating, (
+                'Проверьте, что рейтинг в базе округляется так же, как '
+                f'`Title.count_rating`: оценки {scores}.'
+            )
@@ -0,0 +1,210 @@
+import csv
+import shutil
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import get_model_version, title_cache
+from reviews.models import Comment, Genre, Review, Title
+
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
+
+def read_csv(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        return list(csv.reader(file))
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        csv.writer(file).writerows(rows)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09LoadCsv:
+
+    def test_01_load_static_data(self, django_user_model):
+        out = StringIO()
+        call_command('load_csv', stdout=out)
+
+        assert django_user_model.objects.count() == 5
+        assert Genre.objects.count() == 15
+        assert Title.objects.count() == 32
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        assert 'review.csv: загружено 72, пропущено 0' in out.getvalue(), (
+            'Проверьте, что команда `load_csv` сообщает количество '
+            'загруженных строк для каждого файла.'
+        )
+
+    def test_02_loaded_data_is_consistent(self):
+        call_command('load_csv', stdout=StringIO())
+
+        title = Title.objects.get(pk=1)
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            20, 2, 10
+        ), (
+            'Проверьте, что после загрузки отзывов команда `load_csv` '
+            'пересчитывает рейтинг произведений.'
+        )
+        assert title.genre.filter(slug='drama').exists()
+        assert Review.objects.get(pk=1).pub_date.year == 2019, (
+            'Проверьте, что команда `load_csv` сохраняет даты публикации '
+            'из CSV.'
+        )
+        assert Review.objects.get(pk=1).author.username == 'bingobongo'
+
+    def test_03_parallel_load_matches_serial(self):
+        out = StringIO()
+        call_command('load_csv', workers=2, batch_size=10, stdout=out)
+
+        assert Review.objects.count() == 72
+        assert Title.objects.get(pk=1).rating == 10
+        assert 'строк/с' in out.getvalue(), (
+            'Проверьте, что команда `load_csv` сообщает скорость загрузки '
+            'каждой стадии.'
+        )
+
+    def test_04_incremental_sync_without_changes(self):
+        call_command('load_csv', incremental=True, stdout=StringIO())
+
+        out = StringIO()
+        with CaptureQueriesContext(connection) as context:
+            call_command('load_csv', incremental=True, stdout=out)
+        writes = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].split()[0] in ('INSERT', 'UPDATE', 'DELETE')
+        ]
+        assert not writes, (
+            'Проверьте, что повторный инкрементальный импорт без изменений '
+            'в CSV не изменяет ни одной строки.'
+        )
+        assert (
+            'review.csv: добавлено 0, обновлено 0, удалено 0, '
+            'без изменений 72'
+        ) in out.getvalue()
+
+    def test_05_incremental_sync_applies_changes(self, tmp_path):
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        call_command(
+            'load_csv', path=data_dir, incremental=True, stdout=StringIO()
+        )
+        titles = (data_dir / 'titles.csv').read_text(encoding='utf-8')
+        (data_dir / 'titles.csv').write_text(
+            titles.replace('Крестный отец', 'Крёстный отец'),
+            encoding='utf-8'
+        )
+        genres = read_csv(data_dir / 'genre.csv')
+        write_csv(
+            data_dir / 'genre.csv',
+            genres + [['16', 'Документальный', 'documentary']]
+        )
+        reviews = read_csv(data_dir / 'review.csv')
+        write_csv(
+            data_dir / 'review.csv', [row for row in reviews if row[0] != '1']
+        )
+
+        out = StringIO()
+        call_command(
+            'load_csv', path=data_dir, incremental=True, stdout=out
+        )
+        output = out.getvalue()
+        assert 'titles.csv: добавлено 0, обновлено 1, удалено 0' in output
+        assert 'genre.csv: добавлено 1, обновлено 0, удалено 0' in output
+        assert 'review.csv: добавлено 0, обновлено 0, удалено 1' in output
+        assert Title.objects.get(pk=2).name == 'Крёстный отец'
+        assert Genre.objects.filter(slug='documentary').exists()
+        assert not Review.objects.filter(pk=1).exists()
+        title = Title.objects.get(pk=1)
+        assert (title.rating_sum, title.rating_count) == (10, 1), (
+            'Проверьте, что инкрементальный импорт поддерживает рейтинг '
+            'произведений в актуальном состоянии.'
+        )
+
+    def test_06_incremental_sync_keeps_caches(self, client, tmp_path):
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        call_command(
+            'load_csv', path=data_dir, incremental=True, stdout=StringIO()
+        )
+        for pk in (1, 2):
+            assert client.get(f'/api/v1/titles/{pk}/').status_code == 200
+        version = get_model_version(Title)
+        cached = title_cache.get(1)
+        assert cached is not None
+
+        with CaptureQueriesContext(connection) as context:
+            call_command(
+                'load_csv', path=data_dir, incremental=True, stdout=StringIO()
+            )
+        assert get_model_version(Title) == version, (
+            'Проверьте, что инкрементальный импорт без изменений не меняет '
+            'версии моделей.'
+        )
+        assert title_cache.get(1) == cached, (
+            'Проверьте, что инкрементальный импорт без изменений не '
+            'сбрасывает кеш произведений.'
+        )
+        assert not [
+            query for query in context.captured_queries
+            if 'GROUP BY' in query['sql']
+        ], 'Проверьте, что без изменений рейтинг не пересчитывается.'
+
+        titles = (data_dir / 'titles.csv').read_text(encoding='utf-8')
+        (data_dir / 'titles.csv').write_text(
+            titles.replace('Крестный отец', 'Крёстный отец'),
+            encoding='utf-8'
+        )
+        call_command(
+            'load_csv', path=data_dir, incremental=True, stdout=StringIO()
+        )
+        assert title_cache.get(1) == cached, (
+            'Проверьте, что изменение одного произведения сбрасывает кеш '
+            'только этого произведения.'
+        )
+        assert title_cache.get(2) is None
+        assert client.get('/api/v1/titles/2/').json()['name'] == (
+            'Крёстный отец'
+        )
+
+    def test_07_second_full_load(self):
+        call_command('load_csv', stdout=StringIO())
+        with pytest.raises(CommandError) as error:
+            call_command('load_csv', stdout=StringIO())
+        assert 'users.csv' in str(error.value), (
+            'Проверьте, что повторная загрузка сообщает, в каком файле '
+            'строки уже есть в базе.'
+        )
+        assert '--incremental' in str(error.value)
+        assert Review.objects.count() == 72
+
+    def test_08_duplicate_review_skipped(self, tmp_path):
+        data_dir = tmp_path / 'data'
+        shutil.copytree(DATA_DIR, data_dir)
+        reviews = read_csv(data_dir / 'review.csv')
+        header, first = reviews[0], reviews[1]
+        # Второй отзыв того же автора на то же произведение вытесняет
+        # первый, а комментарий к первому теряет ссылку.
+        duplicate = ['1000', *first[1:]]
+        write_csv(
+            data_dir / 'review.csv', [header, duplicate, *reviews[1:]]
+        )
+        comments = read_csv(data_dir / 'comments.csv')
+        write_csv(data_dir / 'comments.csv', [
+            *comments, ['1000', '1', 'Текст', first[3], first[5]]
+        ])
+        out = StringIO()
+        call_command('load_csv', path=data_dir, batch_size=10, stdout=out)
+        output = out.getvalue()
+        assert 'review.csv: загружено 72, пропущено 1' in output, (
+            'Проверьте, что повторный отзыв автора на произведение '
+            'пропускается и учитывается в пропущенных строках.'
+        )
+        assert 'comments.csv: загружено 3, пропущено 1' in output
+        assert Review.objects.filter(pk=1000).exists()
+        assert not Review.objects.filter(pk=1).exists()
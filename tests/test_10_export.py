@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10Export:
+
+    EXPORT_URL_TEMPLATE = '/api/v1/export/{resource}/'
+
+    @pytest.fixture
+    def loaded_data(self):
+        call_command('load_csv', workers=1, stdout=StringIO())
+
+    def get_export(self, client, resource, **params):
+        response = client.get(
+            self.EXPORT_URL_TEMPLATE.format(resource=resource), params
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что администратор получает выгрузку `{resource}`.'
+        )
+        assert response.streaming, (
+            'Проверьте, что выгрузка отдаётся потоковым ответом.'
+        )
+        return b''.join(response.streaming_content).decode()
+
+    @pytest.mark.parametrize('resource,filename', (
+        ('titles', 'titles.csv'),
+        ('reviews', 'review.csv'),
+        ('comments', 'comments.csv'),
+    ))
+    def test_01_csv_matches_static_data(self, admin_client, loaded_data,
+                                        resource, filename):
+        content = self.get_export(admin_client, resource, format='csv')
+        with open(DATA_DIR / filename, encoding='utf-8', newline='') as file:
+            header, *rows = csv.reader(file)
+        expected = [header] + sorted(rows, key=lambda row: int(row[0]))
+        assert list(csv.reader(io.StringIO(content))) == expected, (
+            f'Проверьте, что CSV-выгрузка `{resource}` повторяет колонки и '
+            f'данные файла `{filename}`.'
+        )
+
+    def test_02_ndjson(self, admin_client, loaded_data):
+        content = self.get_export(admin_client, 'reviews', format='ndjson')
+        lines = [json.loads(line) for line in content.splitlines()]
+        assert len(lines) == 72
+        assert lines[0] == {
+            'id': 1, 'title_id': 1, 'text': lines[0]['text'], 'author': 100,
+            'score': 10, 'pub_date': '2019-09-24T21:08:21.567Z'
+        }
+
+    def test_03_export_only_for_admin(self, client, user_client,
+                                      moderator_client):
+        url = self.EXPORT_URL_TEMPLATE.format(resource='reviews')
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        for non_admin_client in (user_client, moderator_client):
+            assert non_admin_client.get(url).status_code == (
+                HTTPStatus.FORBIDDEN
+            ), 'Проверьте, что выгрузка доступна только администратору.'
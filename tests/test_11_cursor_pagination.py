@@ -0,0 +1,103 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11CursorPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @pytest.fixture
+    def title_with_reviews(self, django_user_model):
+        title = Title.objects.create(name='Произведение', year=2000)
+        for number in range(25):
+            author = django_user_model.objects.create_user(
+                username=f'author{number}', email=f'author{number}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=5
+            )
+        # Несколько отзывов с одинаковой датой проверяют разбор ничьих по id.
+        Review.objects.filter(pk__in=Review.objects.order_by('pk').values(
+            'pk'
+        )[5:12]).update(pub_date=timezone.now())
+        return title
+
+    def walk(self, client, url):
+        ids = []
+        response = client.get(url, {'cursor': ''})
+        while True:
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert set(data) == {'next', 'previous', 'results'}, (
+                'Проверьте, что в режиме курсора ответ содержит ключи '
+                '`next`, `previous` и `results`.'
+            )
+            ids.extend(item['id'] for item in data['results'])
+            if not data['next']:
+                return ids, data
+            response = client.get(data['next'])
+
+    def test_01_cursor_walk_matches_ordering(self, client,
+                                             title_with_reviews):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_with_reviews.pk)
+        ids, last_page = self.walk(client, url)
+        expected = list(title_with_reviews.reviews.order_by(
+            '-pub_date', '-id'
+        ).values_list('id', flat=True))
+        assert ids == expected, (
+            'Проверьте, что обход отзывов курсором возвращает каждый отзыв '
+            'ровно один раз в порядке убывания `pub_date`.'
+        )
+
+        response = client.get(last_page['previous'])
+        assert [item['id'] for item in response.json()['results']] == (
+            expected[10:20]
+        ), 'Проверьте, что ссылка `previous` ведёт на предыдущую страницу.'
+
+    def test_02_cursor_page_runs_no_count_or_offset(self, client,
+                                                    title_with_reviews):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_with_reviews.pk)
+        next_url = client.get(url, {'cursor': ''}).json()['next']
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(next_url)
+        assert response.status_code == HTTPStatus.OK
+        for query in context.captured_queries:
+            assert 'COUNT(' not in query['sql'], (
+                'Проверьте, что в режиме курсора не выполняется COUNT(*).'
+            )
+            assert 'OFFSET' not in query['sql'], (
+                'Проверьте, что в режиме курсора не используется OFFSET.'
+            )
+
+    def test_03_default_shape_unchanged(self, client, title_with_reviews):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_with_reviews.pk)
+        data = client.get(url).json()
+        assert set(data) == {'count', 'next', 'previous', 'results'}
+        assert data['count'] == 25
+
+    def test_04_comments_cursor(self, client, admin, title_with_reviews):
+        review = title_with_reviews.reviews.first()
+        for _ in range(12):
+            Comment.objects.create(review=review, author=admin, text='Текст')
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_with_reviews.pk, review_id=review.pk
+        )
+        ids, _ = self.walk(client, url)
+        assert sorted(ids) == list(
+            review.comments.order_by('id').values_list('id', flat=True)
+        )
+
+    def test_05_invalid_cursor(self, client, title_with_reviews):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title_with_reviews.pk)
+        response = client.get(url, {'cursor': 'не-курсор'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre
+from reviews.signals import bulk_changed
+
+
+def count_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'COUNT(' in query['sql'].upper()
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12CountCache:
+
+    GENRES_URL = '/api/v1/genres/'
+    CATEGORIES_URL = '/api/v1/categories/'
+
+    @pytest.fixture
+    def genres(self):
+        return Genre.objects.bulk_create(
+            Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(12)
+        )
+
+    def test_01_count_is_cached(self, client, genres):
+        response = client.get(self.GENRES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == len(genres)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.GENRES_URL, {'page': 2})
+        assert response.json()['count'] == len(genres)
+        assert not count_queries(context), (
+            'Проверьте, что количество объектов берётся из кеша и '
+            'повторный запрос списка не выполняет `COUNT(*)`.'
+        )
+
+    def test_02_count_depends_on_params(self, client, genres):
+        client.get(self.GENRES_URL)
+        response = client.get(self.GENRES_URL, {'search': 'Жанр 1'})
+        assert response.json()['count'] == 3, (
+            'Проверьте, что кеш количества учитывает параметры поиска.'
+        )
+
+    def test_03_write_invalidates_count(self, admin_client, genres):
+        assert admin_client.get(self.GENRES_URL).json()['count'] == 12
+        response = admin_client.post(
+            self.GENRES_URL, data={'name': 'Новый', 'slug': 'new'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert admin_client.get(self.GENRES_URL).json()['count'] == 13, (
+            'Проверьте, что создание объекта сбрасывает кеш количества.'
+        )
+        Genre.objects.get(slug='new').delete()
+        assert admin_client.get(self.GENRES_URL).json()['count'] == 12, (
+            'Проверьте, что удаление объекта сбрасывает кеш количества.'
+        )
+
+    def test_04_bulk_change_invalidates_count(self, client, genres):
+        assert client.get(self.CATEGORIES_URL).json()['count'] == 0
+        Category.objects.bulk_create([Category(name='Книги', slug='books')])
+        bulk_changed.send(sender=None, models=[Category])
+        assert client.get(self.CATEGORIES_URL).json()['count'] == 1, (
+            'Проверьте, что сигнал `bulk_changed` сбрасывает кеш количества.'
+        )
+
+    def test_05_estimate_above_threshold(self, client, settings, genres):
+        settings.COUNT_CACHE_SETTINGS = {
+            'TIMEOUT': 30, 'ESTIMATE_THRESHOLD': 10
+        }
+        data = client.get(self.GENRES_URL).json()
+        assert data['count'] == 10 and data['is_estimate'] is True, (
+            'Проверьте, что при превышении порога возвращается оценка '
+            'количества с флагом `is_estimate`.'
+        )
+        assert data['next']
+
+        data = client.get(self.GENRES_URL, {'search': 'Жанр 1'}).json()
+        assert data['count'] == 3 and data['is_estimate'] is False
+
+        data = client.get(self.GENRES_URL, {'page': 2}).json()
+        assert data['count'] == 12 and data['is_estimate'] is False, (
+            'Проверьте, что для страниц за пределами оценки количество '
+            'считается точно.'
+        )
+        assert len(data['results']) == 2
@@ -0,0 +1,140 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import (
+    Category, Comment, Genre, GenreTitle, Review, Title
+)
+
+# Полный обход таблицы в выводе EXPLAIN QUERY PLAN SQLite: `SCAN <таблица>`
+# без поиска по индексу. `SCAN CONSTANT ROW` таблицу не читает, а обход
+# таблицы FTS5 с условием MATCH (`VIRTUAL TABLE INDEX n:M...`, с условием
+# на rowid — `n:=M...`) читает только найденные строки.
+FULL_SCAN = re.compile(
+    r'^SCAN (?!CONSTANT ROW)(\w+)\b(?! VIRTUAL TABLE INDEX \d+:[=<>]*M)'
+)
+# Обход всей таблицы в порядке индекса: допустим только там, где
+# запрошен список всей таблицы, и страница читается с LIMIT.
+INDEX_SCAN = re.compile(r'^SCAN \w+ USING (COVERING )?INDEX ')
+
+ENDPOINTS = (
+    ('get', '/api/v1/titles/?genre=drama'),
+    ('get', '/api/v1/titles/?category=books'),
+    ('get', '/api/v1/titles/?year=2000'),
+    ('get', '/api/v1/titles/?category=books&year=2000'),
+    ('get', '/api/v1/titles/{title_id}/'),
+    ('get', '/api/v1/titles/{title_id}/reviews/'),
+    ('get', '/api/v1/titles/{title_id}/reviews/?cursor='),
+    ('get', '/api/v1/titles/{title_id}/reviews/{review_id}/'),
+    ('get', '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'),
+    ('get', '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+            '{comment_id}/'),
+    ('post', '/api/v1/titles/{title_id}/reviews/'),
+    ('get', '/api/v1/users/me/'),
+    ('get', '/api/v1/titles/?name=произв'),
+    ('get', '/api/v1/titles/?search=произведение'),
+    ('get', '/api/v1/genres/?search=дра'),
+    ('get', '/api/v1/categories/?search=кни'),
+)
+
+# Списки всей таблицы: разрешён обход по индексу, но не по таблице.
+LISTING_ENDPOINTS = (
+    ('get', '/api/v1/titles/?ordering=-rating'),
+)
+
+
+def get_full_scans(sql, allow_index_scan=False):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        details = [row[-1] for row in cursor.fetchall()]
+    return [
+        detail for detail in details
+        if FULL_SCAN.match(detail)
+        and not (allow_index_scan and INDEX_SCAN.match(detail))
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13QueryPlans:
+
+    @pytest.fixture
+    def data(self, admin):
+        category = Category.objects.create(name='Книги', slug='books')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        titles = [
+            Title.objects.create(
+                name=f'Произведение {number}', year=2000 + number % 3,
+                category=category
+            )
+            for number in range(5)
+        ]
+        for title in titles:
+            title.genre.add(genre)
+        review = Review.objects.create(
+            title=titles[0], author=admin, text='Отзыв', score=7
+        )
+        comment = Comment.objects.create(
+            review=review, author=admin, text='Комментарий'
+        )
+        return {
+            'title_id': titles[0].pk,
+            'review_id': review.pk,
+            'comment_id': comment.pk,
+        }
+
+    def check_plans(self, user_client, data, method, url,
+                    allow_index_scan=False):
+        url = url.format(**data)
+        request = getattr(user_client, method)
+        payload = {'text': 'Отзыв', 'score': 8} if method == 'post' else None
+        with CaptureQueriesContext(connection) as context:
+            response = request(url, data=payload)
+        assert response.status_code < 400, response.content
+        selects = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+        ]
+        assert selects
+        for sql in selects:
+            scans = get_full_scans(sql, allow_index_scan)
+            assert not scans, (
+                f'Запрос к `{url}` обходит таблицу целиком ({scans}): '
+                f'проверьте индексы для запроса\n{sql}'
+            )
+
+    @pytest.mark.parametrize('method,url', ENDPOINTS)
+    def test_01_no_full_table_scans(self, user_client, data, method, url):
+        self.check_plans(user_client, data, method, url)
+
+    @pytest.mark.parametrize('method,url', LISTING_ENDPOINTS)
+    def test_02_listings_scan_by_index(self, user_client, data, method,
+                                       url):
+        self.check_plans(
+            user_client, data, method, url, allow_index_scan=True
+        )
+
+    @pytest.mark.parametrize('model', (Title, GenreTitle, Review, Comment))
+    def test_03_no_redundant_indexes(self, model):
+        table = model._meta.db_table
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, table
+            )
+        indexes = {
+            name: info['columns'] for name, info in constraints.items()
+            if (info['index'] or info['unique']) and not info['primary_key']
+        }
+        for name, columns in indexes.items():
+            covering = [
+                other for other, other_columns in indexes.items()
+                if other != name
+                and other_columns[:len(columns)] == columns
+                and not constraints[name]['unique']
+            ]
+            assert not covering, (
+                f'Индекс `{name}` таблицы `{table}` повторяет начало '
+                f'индексов {covering}: удалите лишний индекс.'
+            )
@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import title_cache
+from reviews.models import Category, Genre, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleCache:
+
+    TITLE_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    @pytest.fixture
+    def title(self):
+        category = Category.objects.create(name='Книги', slug='books')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(
+            name='Произведение', year=2000, category=category
+        )
+        title.genre.add(genre)
+        return title
+
+    def get_title(self, client, title):
+        response = client.get(self.TITLE_URL_TEMPLATE.format(
+            title_id=title.pk
+        ))
+        assert response.status_code == HTTPStatus.OK
+        return response
+
+    def test_01_detail_is_cached(self, client, title):
+        hits = title_cache.hits
+        first = self.get_title(client, title)
+        with CaptureQueriesContext(connection) as context:
+            second = self.get_title(client, title)
+        assert not context.captured_queries, (
+            'Проверьте, что повторный запрос произведения отдаётся из кеша '
+            'без запросов к базе.'
+        )
+        assert second.content == first.content
+        assert second['Content-Type'] == 'application/json'
+        assert title_cache.hits == hits + 1
+
+    def test_02_title_write_invalidates(self, admin_client, title):
+        self.get_title(admin_client, title)
+        response = admin_client.patch(
+            self.TITLE_URL_TEMPLATE.format(title_id=title.pk),
+            data={'name': 'Новое название', 'genre': []},
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = self.get_title(admin_client, title).json()
+        assert data['name'] == 'Новое название' and data['genre'] == [], (
+            'Проверьте, что изменение произведения сбрасывает его кеш.'
+        )
+
+    def test_03_review_invalidates_rating(self, user_client, title):
+        assert self.get_title(user_client, title).json()['rating'] is None
+        response = user_client.post(
+            f'/api/v1/titles/{title.pk}/reviews/',
+            data={'text': 'Отзыв', 'score': 7}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert self.get_title(user_client, title).json()['rating'] == 7, (
+            'Проверьте, что отзыв, изменивший рейтинг, сбрасывает кеш '
+            'произведения.'
+        )
+        Review.objects.get(pk=response.json()['id']).delete()
+        assert self.get_title(user_client, title).json()['rating'] is None
+
+    def test_04_category_and_genre_changes_invalidate(self, client, title):
+        self.get_title(client, title)
+        category = Category.objects.get(slug='books')
+        category.name = 'Романы'
+        category.save()
+        assert self.get_title(client, title).json()['category'] == {
+            'name': 'Романы', 'slug': 'books'
+        }, 'Проверьте, что переименование категории сбрасывает кеш.'
+
+        Genre.objects.get(slug='drama').delete()
+        assert self.get_title(client, title).json()['genre'] == [], (
+            'Проверьте, что удаление жанра сбрасывает кеш произведения.'
+        )
+        category.delete()
+        assert self.get_title(client, title).json()['category'] is None, (
+            'Проверьте, что удаление категории сбрасывает кеш произведения.'
+        )
+
+    def test_05_genre_relation_invalidates(self, client, title):
+        self.get_title(client, title)
+        genre = Genre.objects.create(name='Комедия', slug='comedy')
+        genre.title_set.add(title)
+        slugs = {
+            item['slug'] for item in self.get_title(client, title).json()[
+                'genre'
+            ]
+        }
+        assert slugs == {'drama', 'comedy'}
+        genre.title_set.clear()
+        assert len(self.get_title(client, title).json()['genre']) == 1
+
+    def test_06_cache_stats(self, client, admin_client, title):
+        self.get_title(client, title)
+        self.get_title(client, title)
+        assert client.get('/api/v1/cache-stats/').status_code in (
+            HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+        )
+        response = admin_client.get('/api/v1/cache-stats/')
+        assert response.status_code == HTTPStatus.OK
+        stats = response.json()['title']
+        assert stats['hits'] >= 1 and stats['misses'] >= 1
+        assert 0 < stats['hit_ratio'] < 1
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import list_cache
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ListCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+
+    @pytest.fixture
+    def titles(self):
+        category = Category.objects.create(name='Книги', slug='books')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        titles = []
+        for number in range(4):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000 + number % 2,
+                category=category
+            )
+            title.genre.add(drama if number % 2 else comedy)
+            titles.append(title)
+        return titles
+
+    def test_01_list_page_is_cached(self, client, titles):
+        hits = list_cache.hits
+        first = client.get(self.TITLES_URL, {'genre': 'drama'})
+        assert first.status_code == HTTPStatus.OK
+        with CaptureQueriesContext(connection) as context:
+            second = client.get(self.TITLES_URL, {'genre': 'drama'})
+        assert not context.captured_queries, (
+            'Проверьте, что повторный запрос списка отдаётся из кеша без '
+            'запросов к базе.'
+        )
+        assert second.content == first.content
+        assert list_cache.hits == hits + 1
+
+    def test_02_params_are_part_of_key(self, client, titles):
+        drama = client.get(self.TITLES_URL, {'genre': 'drama'}).json()
+        comedy = client.get(self.TITLES_URL, {'genre': 'comedy'}).json()
+        assert drama['count'] == comedy['count'] == 2
+        assert {item['id'] for item in drama['results']}.isdisjoint(
+            item['id'] for item in comedy['results']
+        ), 'Проверьте, что ключ кеша учитывает параметры фильтрации.'
+        data = client.get(
+            self.TITLES_URL, {'year': 2001, 'genre': 'drama'}
+        ).json()
+        assert data['count'] == 2
+        data = client.get(self.GENRES_URL, {'search': 'Драм'}).json()
+        assert [item['slug'] for item in data['results']] == ['drama'], (
+            'Проверьте, что ключ кеша учитывает параметр поиска.'
+        )
+        client.get(self.GENRES_URL)
+        response = client.get(self.GENRES_URL, {'page': 2})
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что ключ кеша учитывает номер страницы.'
+        )
+
+    def test_03_param_order_is_normalized(self, client, titles):
+        client.get(self.TITLES_URL + '?year=2001&genre=drama')
+        hits = list_cache.hits
+        client.get(self.TITLES_URL + '?genre=drama&year=2001')
+        assert list_cache.hits == hits + 1
+
+    def test_04_writes_invalidate_pages(self, admin_client, titles):
+        assert admin_client.get(self.GENRES_URL).json()['count'] == 2
+        response = admin_client.post(
+            self.GENRES_URL, data={'name': 'Мюзикл', 'slug': 'musical'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert admin_client.get(self.GENRES_URL).json()['count'] == 3, (
+            'Проверьте, что запись в модель сбрасывает кеш её списков.'
+        )
+
+        admin_client.get(self.TITLES_URL)
+        Genre.objects.filter(slug='drama').update(name='Трагедия')
+        Genre.objects.get(slug='drama').save()
+        names = {
+            genre['name']
+            for item in admin_client.get(self.TITLES_URL).json()['results']
+            for genre in item['genre']
+        }
+        assert 'Трагедия' in names, (
+            'Проверьте, что изменение жанра сбрасывает кеш списка '
+            'произведений.'
+        )
+
+    def test_05_rating_change_invalidates(self, user_client, titles):
+        title = titles[0]
+        data = user_client.get(self.TITLES_URL).json()
+        assert all(item['rating'] is None for item in data['results'])
+        user_client.post(
+            f'/api/v1/titles/{title.pk}/reviews/',
+            data={'text': 'Отзыв', 'score': 9}
+        )
+        ratings = {
+            item['id']: item['rating']
+            for item in user_client.get(self.TITLES_URL).json()['results']
+        }
+        assert ratings[title.pk] == 9
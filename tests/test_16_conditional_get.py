@@ -0,0 +1,219 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.cache import get_model_version
+from api.checks import check_shared_cache
+from reviews.models import Category, Comment, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ConditionalGet:
+
+    TITLE_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @pytest.fixture
+    def review(self, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        Comment.objects.create(review=review, author=user, text='Текст')
+        return review
+
+    def get_not_modified(self, client, url, response):
+        assert response.status_code == HTTPStatus.OK
+        assert response.has_header('ETag') and response.has_header(
+            'Last-Modified'
+        ), 'Проверьте, что ответ содержит заголовки `ETag` и `Last-Modified`.'
+        with CaptureQueriesContext(connection) as context:
+            cached = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert cached.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при совпадении `If-None-Match` возвращается 304.'
+        )
+        assert cached['ETag'] == response['ETag']
+        assert not cached.content
+        return context.captured_queries
+
+    def test_01_title_detail_not_modified(self, client, admin_client,
+                                          review):
+        url = self.TITLE_URL_TEMPLATE.format(title_id=review.title_id)
+        response = client.get(url)
+        queries = self.get_not_modified(client, url, response)
+        assert not queries, (
+            'Проверьте, что ответ 304 для произведения не обращается к базе.'
+        )
+        admin_client.patch(url, data={'year': 2001}, format='json')
+        changed = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert changed.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения произведения ETag меняется.'
+        )
+        assert changed.json()['year'] == 2001
+
+    def test_02_reviews_not_modified(self, client, user_client, review):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=review.title_id)
+        response = client.get(url)
+        queries = self.get_not_modified(client, url, response)
+        assert len(queries) == 1, (
+            'Проверьте, что версия коллекции отзывов вычисляется одним '
+            'запросом без сериализации ответа.'
+        )
+        user_client.patch(f'{url}{review.pk}/', data={'text': 'Новый'})
+        changed = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert changed.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение отзыва меняет ETag коллекции.'
+        )
+        assert changed.json()['results'][0]['text'] == 'Новый'
+
+    def test_03_comments_and_detail_not_modified(self, client, review):
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=review.title_id, review_id=review.pk
+        )
+        queries = self.get_not_modified(client, url, client.get(url))
+        assert len(queries) == 1
+        url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=review.title_id
+        ) + f'{review.pk}/'
+        queries = self.get_not_modified(client, url, client.get(url))
+        assert not queries
+        Comment.objects.create(review=review, author=review.author, text='2')
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=review.title_id, review_id=review.pk
+        )
+        etag = client.get(url)['ETag']
+        review.comments.first().delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что удаление комментария меняет ETag коллекции.'
+
+    def test_04_catalogue_lists(self, client, admin_client, review):
+        url = '/api/v1/categories/'
+        response = client.get(url)
+        assert not self.get_not_modified(client, url, response)
+        assert client.get(url, {'search': 'x'})['ETag'] != response['ETag'], (
+            'Проверьте, что ETag списка зависит от параметров запроса.'
+        )
+        Category.objects.create(name='Книги', slug='books')
+        assert client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        ).status_code == HTTPStatus.OK
+
+    def test_05_if_modified_since(self, client, review):
+        url = self.TITLE_URL_TEMPLATE.format(title_id=review.title_id)
+        response = client.get(url)
+        cached = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert cached.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что при актуальном `If-Modified-Since` '
+            'возвращается 304.'
+        )
+
+    def test_06_version_shared_between_processes(self, client, review,
+                                                 tmp_path):
+        url = self.TITLE_URL_TEMPLATE.format(title_id=review.title_id)
+        response = client.get(url)
+        # Запись в другом воркере меняет версию произведения в общем кеше.
+        # Воркер получает кеш теста и отдельную базу, а не файлы проекта.
+        subprocess.run(
+            [
+                sys.executable, '-c',
+                'import json, sys, django; '
+                'from django.conf import settings; '
+                'settings.CACHES, settings.DATABASES = json.loads('
+                'sys.argv[1]); '
+                'django.setup(); '
+                'from api.cache import bump_object_version; '
+                'from reviews.models import Title; '
+                f'bump_object_version(Title, {review.title_id})',
+                json.dumps([settings.CACHES, {'default': {
+                    **settings.DATABASES['default'],
+                    'NAME': str(tmp_path / 'worker.sqlite3'),
+                }}], default=str),
+            ],
+            cwd=settings.BASE_DIR, check=True,
+            env={
+                **os.environ,
+                'DJANGO_SETTINGS_MODULE': 'api_yamdb.settings',
+            },
+        )
+        response = client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что версии хранятся в кеше, общем для всех '
+            'процессов, и запись в другом воркере меняет ETag.'
+        )
+
+    def test_07_versions_expire(self, settings):
+        settings.RESPONSE_CACHE_SETTINGS = {
+            **settings.RESPONSE_CACHE_SETTINGS, 'VERSION_TIMEOUT': 1
+        }
+        version = get_model_version(Title)
+        time.sleep(1.1)
+        assert get_model_version(Title) != version, (
+            'Проверьте, что у версий в кеше есть срок жизни.'
+        )
+
+    def test_08_local_cache_warning(self, settings):
+        assert check_shared_cache(None) == []
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+        }}
+        assert [
+            message.id for message in check_shared_cache(None)
+        ] == ['api.W001']
+
+    def test_09_deleted_parent(self, client, user):
+        title = Title.objects.create(name='Без отзывов', year=2000)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.pk)
+        etag = client.get(url)['ETag']
+        title.delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == (
+            HTTPStatus.NOT_FOUND
+        ), (
+            'Проверьте, что после удаления произведения старый ETag списка '
+            'отзывов не даёт ответ 304.'
+        )
+        title = Title.objects.create(name='С отзывом', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title.pk, review_id=review.pk
+        )
+        etag = client.get(url)['ETag']
+        review.delete()
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+
+    def test_10_user_writes(self, client, review):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=review.title_id)
+        response = client.get(url)
+        user = review.author
+        user.confirmation_code = '654321'
+        user.save()
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'newuser', 'email': 'newuser@yamdb.fake'
+        })
+        self.get_not_modified(client, url, response)
+        user.username = 'renamed'
+        user.save()
+        changed = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert changed.status_code == HTTPStatus.OK, (
+            'Проверьте, что смена username автора меняет ETag отзывов.'
+        )
+        assert changed.json()['results'][0]['author'] == 'renamed'
@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from users.views import AuthViewSet
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17StatelessJWT:
+
+    URL_TOKEN = '/api/v1/auth/token/'
+    URL_STATS = '/api/v1/cache-stats/'
+    URL_ME = '/api/v1/users/me/'
+
+    def get_client(self, user):
+        user.confirmation_code = '123456'
+        user.save()
+        response = APIClient().post(self.URL_TOKEN, data={
+            'username': user.username, 'confirmation_code': '123456'
+        })
+        assert response.status_code == HTTPStatus.OK
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}'
+        )
+        return client
+
+    def test_01_no_user_query(self, admin):
+        client = self.get_client(admin)
+        assert client.get(self.URL_STATS).status_code == HTTPStatus.OK
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.URL_STATS)
+        assert response.status_code == HTTPStatus.OK
+        assert not context.captured_queries, (
+            'Проверьте, что аутентификация по токену с утверждениями '
+            'не читает пользователя из БД.'
+        )
+
+    def test_02_role_from_claims(self, user, moderator):
+        assert self.get_client(user).get(self.URL_STATS).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        client = self.get_client(moderator)
+        assert client.get(self.URL_STATS).status_code == HTTPStatus.FORBIDDEN
+
+    def test_03_revoked_token(self, admin):
+        client = self.get_client(admin)
+        assert client.get(self.URL_STATS).status_code == HTTPStatus.OK
+        admin.revoke_tokens()
+        assert client.get(self.URL_STATS).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что отозванный токен не принимается.'
+        assert self.get_client(admin).get(self.URL_STATS).status_code == (
+            HTTPStatus.OK
+        )
+
+    def test_04_role_change_revokes(self, admin_client, admin, user):
+        client = self.get_client(user)
+        assert client.get(self.URL_ME).status_code == HTTPStatus.OK
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert client.get(self.URL_ME).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что изменение роли отзывает выданные токены.'
+        user.refresh_from_db()
+        client = self.get_client(user)
+        assert client.get(self.URL_STATS).status_code == HTTPStatus.OK
+
+    def test_05_me_uses_full_row(self, user):
+        client = self.get_client(user)
+        response = client.get(self.URL_ME)
+        assert response.json()['email'] == user.email
+        response = client.patch(self.URL_ME, data={'bio': 'Новая биография'})
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert user.bio == 'Новая биография'
+        assert user.email == 'testuser@yamdb.fake'
+        assert client.get(self.URL_ME).status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение профиля без изменения утверждений '
+            'не отзывает токен.'
+        )
+
+    def test_06_inactive_user(self, user):
+        client = self.get_client(user)
+        user.is_active = False
+        user.save()
+        assert client.get(self.URL_ME).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что отключение пользователя отзывает его токены.'
+        response = APIClient().post(self.URL_TOKEN, data={
+            'username': user.username, 'confirmation_code': '123456'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неактивный пользователь не получает токен.'
+        )
+        client = APIClient()
+        token = AuthViewSet().generate_jwt_token(user)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        assert client.get(self.URL_ME).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что токен неактивного пользователя не принимается.'
@@ -0,0 +1,90 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from users.authentication import DecodedTokenCache, decoded_tokens
+
+
+class Test18TokenCache:
+
+    URL_TOKEN = '/api/v1/auth/token/'
+    URL_ME = '/api/v1/users/me/'
+
+    def get_token(self, user):
+        user.confirmation_code = '123456'
+        user.save()
+        response = APIClient().post(self.URL_TOKEN, data={
+            'username': user.username, 'confirmation_code': '123456'
+        })
+        return response.json()['token']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_repeated_token_is_cached(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(user)}')
+        decoded_tokens.clear()
+        assert client.get(self.URL_ME).status_code == HTTPStatus.OK
+        assert (decoded_tokens.hits, decoded_tokens.misses) == (0, 1)
+        assert client.get(self.URL_ME).status_code == HTTPStatus.OK
+        assert (decoded_tokens.hits, decoded_tokens.misses) == (1, 1), (
+            'Проверьте, что повторный токен берётся из кеша без повторной '
+            'проверки подписи.'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_cached_token_can_be_revoked(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(user)}')
+        assert client.get(self.URL_ME).status_code == HTTPStatus.OK
+        user.revoke_tokens()
+        assert client.get(self.URL_ME).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что кеш токенов не мешает их отзыву.'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_invalid_token_is_not_cached(self):
+        decoded_tokens.clear()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+        for _ in range(2):
+            assert client.get(self.URL_ME).status_code == (
+                HTTPStatus.UNAUTHORIZED
+            )
+        assert decoded_tokens.hits == 0
+
+    def test_04_expired_and_evicted_entries(self):
+        cache = DecodedTokenCache(max_size=2)
+        cache.set(b'expired', {'exp': time.time() - 1})
+        assert cache.get(b'expired') is None, (
+            'Проверьте, что токен не отдаётся из кеша после `exp`.'
+        )
+        tokens = {
+            name: {'exp': time.time() + 60} for name in (b'a', b'b', b'c')
+        }
+        cache.set(b'a', tokens[b'a'])
+        cache.set(b'b', tokens[b'b'])
+        assert cache.get(b'a') is tokens[b'a']
+        cache.set(b'c', tokens[b'c'])
+        assert cache.get(b'b') is None, (
+            'Проверьте, что при переполнении вытесняется давно не '
+            'использованный токен.'
+        )
+        assert cache.get(b'a') is tokens[b'a']
+        assert cache.get(b'c') is tokens[b'c']
+        assert len(cache.tokens) == 2
+
+    def test_05_thread_safety(self):
+        cache = DecodedTokenCache(max_size=50)
+        names = [str(number).encode() for number in range(100)]
+
+        def work(name):
+            if cache.get(name) is None:
+                cache.set(name, {'exp': time.time() + 60})
+
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(work, names * 20))
+        assert cache.hits + cache.misses == len(names) * 20
+        assert len(cache.tokens) <= 50
@@ -0,0 +1,207 @@
+import socketserver
+import threading
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from users.management.commands import send_outbox
+from users.models import OutgoingEmail
+from users.outbox import claim_batch, drain_outbox, queue_mail
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер для проверки отправки писем"""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        recipients = []
+        self.reply('220 localhost')
+        for line in self.rfile:
+            command = line.decode().strip()
+            verb = command.split(' ', 1)[0].split(':', 1)[0].upper()
+            if verb in ('EHLO', 'HELO', 'MAIL', 'RSET', 'NOOP'):
+                if verb == 'RSET':
+                    recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                address = command.split(':', 1)[1].strip(' <>')
+                if address in server.rejected:
+                    self.reply('550 Rejected')
+                else:
+                    recipients.append(address)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                for data_line in self.rfile:
+                    if data_line == b'.\r\n':
+                        break
+                    data.append(data_line.decode())
+                server.messages.append((recipients, ''.join(data)))
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Not implemented')
+
+
+@pytest.fixture
+def smtp_server(settings):
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), SMTPHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.messages = []
+    server.rejected = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    settings.EMAIL_HOST, settings.EMAIL_PORT = server.server_address
+    settings.EMAIL_TIMEOUT = 5
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Outbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_queues_mail(self, client, smtp_server):
+        response = client.post(self.URL_SIGNUP, data={
+            'username': 'newuser', 'email': 'newuser@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert not smtp_server.connections, (
+            'Проверьте, что регистрация не отправляет письмо синхронно.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.recipient == 'newuser@yamdb.fake'
+        assert email.sent_at is None
+
+        call_command('send_outbox', once=True, stdout=open('/dev/null', 'w'))
+        email.refresh_from_db()
+        assert email.sent_at is not None
+        assert len(smtp_server.messages) == 1
+        recipients, data = smtp_server.messages[0]
+        assert recipients == ['newuser@yamdb.fake']
+        assert 'Subject:' in data
+
+    def test_02_batch_uses_one_connection(self, smtp_server):
+        for number in range(7):
+            queue_mail('Тема', f'Текст {number}', f'user{number}@yamdb.fake')
+        assert drain_outbox(batch_size=10) == (7, 0)
+        assert smtp_server.connections == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение.'
+        )
+        assert len(smtp_server.messages) == 7
+        assert drain_outbox() == (0, 0)
+
+    def test_03_retry_with_backoff(self, settings, smtp_server):
+        settings.OUTBOX_SETTINGS = {
+            **settings.OUTBOX_SETTINGS, 'RETRY_DELAY': 60, 'MAX_ATTEMPTS': 3
+        }
+        smtp_server.rejected.add('bad@yamdb.fake')
+        queue_mail('Тема', 'Текст', 'bad@yamdb.fake')
+        queue_mail('Тема', 'Текст', 'good@yamdb.fake')
+        assert drain_outbox() == (1, 1), (
+            'Проверьте, что ошибка одного письма не мешает отправке '
+            'остальных.'
+        )
+        email = OutgoingEmail.objects.get(recipient='bad@yamdb.fake')
+        assert email.attempts == 1 and email.last_error
+        delay = email.next_attempt_at - timezone.now()
+        assert timedelta(seconds=50) < delay <= timedelta(seconds=60)
+
+        for attempt, seconds in ((2, 120), (3, None)):
+            OutgoingEmail.objects.filter(pk=email.pk).update(
+                next_attempt_at=timezone.now()
+            )
+            assert drain_outbox() == (0, 1)
+            email.refresh_from_db()
+            assert email.attempts == attempt
+            if seconds is None:
+                assert email.next_attempt_at is None, (
+                    'Проверьте, что после MAX_ATTEMPTS попыток письмо '
+                    'больше не отправляется.'
+                )
+            else:
+                delay = email.next_attempt_at - timezone.now()
+                assert timedelta(seconds=seconds - 10) < delay, (
+                    'Проверьте, что задержка повтора растёт экспоненциально.'
+                )
+
+    def test_04_unavailable_server(self, settings, smtp_server):
+        settings.EMAIL_PORT = 1
+        queue_mail('Тема', 'Текст', 'user@yamdb.fake')
+        assert drain_outbox() == (0, 1)
+        email = OutgoingEmail.objects.get()
+        assert email.attempts == 1 and email.next_attempt_at > timezone.now()
+        settings.EMAIL_PORT = smtp_server.server_address[1]
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+        assert drain_outbox() == (1, 0)
+
+    def test_05_claim_is_one_conditional_update(self, settings):
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+        for number in range(5):
+            queue_mail('Тема', 'Текст', f'user{number}@yamdb.fake')
+        OutgoingEmail.objects.filter(recipient='user0@yamdb.fake').update(
+            next_attempt_at=timezone.now() + timedelta(minutes=5),
+            claim_token='other'
+        )
+        with CaptureQueriesContext(connection) as context:
+            emails = claim_batch(3)
+        statements = [
+            query['sql'].split(' ', 1)[0] for query in context.captured_queries
+        ]
+        assert statements == ['UPDATE', 'SELECT'], (
+            'Проверьте, что письма захватываются одним условным UPDATE и '
+            'читаются по токену.'
+        )
+        assert len(emails) == 3
+        assert 'user0@yamdb.fake' not in {email.recipient for email in emails}
+        assert len({email.claim_token for email in emails}) == 1
+        rest = claim_batch(10)
+        assert len(rest) == 1, (
+            'Проверьте, что захваченные письма не достаются другому '
+            'обработчику.'
+        )
+        assert not {email.pk for email in emails} & {rest[0].pk}
+
+    def test_06_command_survives_locked_database(self, monkeypatch):
+        results = [OperationalError('database is locked'), (1, 0)]
+
+        def drain(batch_size):
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        def sleep(interval):
+            if not results:
+                raise KeyboardInterrupt
+
+        monkeypatch.setattr(send_outbox, 'drain_outbox', drain)
+        monkeypatch.setattr(send_outbox.time, 'sleep', sleep)
+        devnull = open('/dev/null', 'w')
+        with pytest.raises(KeyboardInterrupt):
+            call_command('send_outbox', stdout=devnull, stderr=devnull)
+        assert not results, (
+            'Проверьте, что ошибка базы данных не останавливает обработчик.'
+        )
+        results.append(OperationalError('database is locked'))
+        with pytest.raises(CommandError):
+            call_command(
+                'send_outbox', once=True, stdout=devnull, stderr=devnull
+            )
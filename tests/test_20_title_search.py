@@ -0,0 +1,105 @@
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api import filters
+from reviews.models import Title
+from reviews.signals import bulk_changed
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        return {
+            'dragon': Title.objects.create(
+                name='Дракон', year=2000,
+                description='Сказка про дракон и рыцарь'
+            ),
+            'hedgehog': Title.objects.create(
+                name='Ёжик в тумане', year=1975,
+                description='Мультфильм о ёжике'
+            ),
+            'knight': Title.objects.create(
+                name='Рыцарь', year=2010,
+                description='Рыцарь встречает дракона'
+            ),
+        }
+
+    def search(self, client, text, **params):
+        response = client.get(self.TITLES_URL, {'search': text, **params})
+        assert response.status_code == 200
+        return [item['id'] for item in response.json()['results']]
+
+    def test_01_fts_index_exists(self):
+        assert filters.fts_available('default'), (
+            'Проверьте, что миграции создают полнотекстовый индекс.'
+        )
+
+    def test_02_words_are_case_folded(self, client, titles):
+        assert self.search(client, 'ДРАКОН') == [
+            titles['dragon'].pk
+        ], 'Проверьте, что поиск не зависит от регистра кириллицы.'
+        assert self.search(client, 'ежик') == [titles['hedgehog'].pk], (
+            'Проверьте, что поиск не различает `ё` и `е`.'
+        )
+        assert self.search(client, 'рыцарь дракона') == [
+            titles['knight'].pk
+        ], 'Проверьте, что все слова запроса должны найтись.'
+        assert self.search(client, '"') == []
+
+    def test_03_ranking(self, client, titles):
+        ids = self.search(client, 'рыцарь')
+        assert ids == [titles['knight'].pk, titles['dragon'].pk], (
+            'Проверьте, что результаты отсортированы по релевантности.'
+        )
+        ids = self.search(client, 'рыцарь', ordering='year')
+        assert ids == [titles['dragon'].pk, titles['knight'].pk], (
+            'Проверьте, что параметр `ordering` заменяет сортировку '
+            'по релевантности.'
+        )
+
+    def test_04_prefix_mode(self, client, titles):
+        assert self.search(client, 'тума') == []
+        assert self.search(client, 'тума', search_mode='prefix') == [
+            titles['hedgehog'].pk
+        ], 'Проверьте режим поиска по началу слова.'
+
+    def test_05_index_follows_writes(self, client, titles):
+        title = titles['knight']
+        title.name = 'Оруженосец'
+        title.save()
+        assert title.pk in self.search(client, 'оруженосец')
+        Title.objects.filter(pk=titles['dragon'].pk).delete()
+        assert self.search(client, 'сказка') == []
+        Title.objects.bulk_create([Title(name='Новая сказка', year=2020)])
+        bulk_changed.send(sender=None, models=[Title])
+        assert len(self.search(client, 'сказка')) == 1, (
+            'Проверьте, что индекс обновляется и при массовой записи.'
+        )
+
+    def test_06_fallback_without_fts(self, client, titles, monkeypatch):
+        monkeypatch.setitem(filters._fts_tables, 'default', False)
+        assert self.search(client, 'Драк') == [titles['dragon'].pk], (
+            'Проверьте, что без FTS5 работает обычный SearchFilter.'
+        )
+
+    def test_07_composes_with_values(self, titles):
+        request = Request(
+            APIRequestFactory().get(self.TITLES_URL, {'search': 'рыцарь'})
+        )
+        queryset = filters.FullTextSearchFilter().filter_queryset(
+            request, Title.objects.all(), view=None
+        )
+        assert list(queryset.values_list('name', flat=True)) == [
+            'Рыцарь', 'Дракон'
+        ], (
+            'Проверьте, что полнотекстовый поиск выражен обычными '
+            'выражениями QuerySet и сочетается с values().'
+        )
+        assert list(queryset.order_by('-year').values('id')) == [
+            {'id': titles['knight'].pk}, {'id': titles['dragon'].pk}
+        ]
@@ -0,0 +1,172 @@
+import threading
+from random import Random
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.suggest import PrefixIndex, rank_by_rating, suggest_index
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Suggest:
+
+    URL = '/api/v1/suggest/'
+
+    @pytest.fixture
+    def catalogue(self):
+        Category.objects.create(name='Фильмы', slug='films')
+        Genre.objects.create(name='Фантастика', slug='sci-fi')
+        Genre.objects.create(name='Драма', slug='drama')
+        return [
+            Title.objects.create(name=name, year=2000, rating=rating)
+            for name, rating in (
+                ('Фаворит', 6), ('Ёлки', 8), ('Последний фараон', 9),
+                ('Дом', None),
+            )
+        ]
+
+    def suggest(self, client, q, **params):
+        response = client.get(self.URL, {'q': q, **params})
+        assert response.status_code == 200
+        return response.json()
+
+    def test_01_prefix_across_models(self, client, catalogue):
+        data = self.suggest(client, 'ФА')
+        assert [item['name'] for item in data['titles']] == [
+            'Последний фараон', 'Фаворит'
+        ], (
+            'Проверьте, что подсказки ищут по началу любого слова без учёта '
+            'регистра и сортируются по рейтингу.'
+        )
+        assert data['genres'] == [{'name': 'Фантастика', 'slug': 'sci-fi'}]
+        assert data['categories'] == []
+        assert self.suggest(client, 'фил')['categories'] == [
+            {'name': 'Фильмы', 'slug': 'films'}
+        ]
+        assert [item['name'] for item in self.suggest(
+            client, 'елк'
+        )['titles']] == ['Ёлки'], 'Проверьте, что `ё` и `е` не различаются.'
+        assert self.suggest(client, '') == {
+            'titles': [], 'genres': [], 'categories': []
+        }
+
+    def test_02_no_queries_on_hot_path(self, client, catalogue):
+        self.suggest(client, 'ф')
+        with CaptureQueriesContext(connection) as context:
+            self.suggest(client, 'фа')
+        assert not context.captured_queries, (
+            'Проверьте, что подсказки отвечают из памяти без запросов к БД.'
+        )
+
+    def test_03_index_follows_writes(self, client, user_client, catalogue):
+        self.suggest(client, 'ф')
+        title = Title.objects.create(name='Фантом', year=2001)
+        assert 'Фантом' in [
+            item['name'] for item in self.suggest(client, 'фан')['titles']
+        ], 'Проверьте, что новое произведение попадает в подсказки.'
+        title.name = 'Призрак'
+        title.save()
+        assert self.suggest(client, 'фан')['titles'] == []
+        assert self.suggest(client, 'приз')['titles'][0]['id'] == title.pk
+        title.delete()
+        assert self.suggest(client, 'приз')['titles'] == []
+
+        Genre.objects.get(slug='drama').delete()
+        assert self.suggest(client, 'драм')['genres'] == []
+
+        home = catalogue[3]
+        user_client.post(
+            f'/api/v1/titles/{home.pk}/reviews/',
+            data={'text': 'Отзыв', 'score': 10}
+        )
+        assert self.suggest(client, 'дом')['titles'] == [
+            {'id': home.pk, 'name': 'Дом', 'rating': 10}
+        ], 'Проверьте, что подсказки учитывают новый рейтинг.'
+
+    def test_04_limit(self, client, catalogue):
+        assert len(self.suggest(client, 'ф', limit=1)['titles']) == 1
+        response = client.get(self.URL, {'q': 'ф', 'limit': 'x'})
+        assert response.status_code == 400
+
+    def test_05_rebuild_serves_old_index(
+        self, client, settings, monkeypatch, catalogue
+    ):
+        self.suggest(client, 'ф')
+        # Запись другого процесса: сигналы здесь не срабатывают.
+        Title.objects.bulk_create([Title(name='Фантом', year=2001)])
+        started, release = threading.Event(), threading.Event()
+
+        class SlowIndex(PrefixIndex):
+            def load(self, rows):
+                started.set()
+                release.wait(5)
+                super().load(rows)
+
+        monkeypatch.setattr(suggest_index, 'create_indexes', lambda: {
+            Title: SlowIndex(rank_by_rating), Genre: PrefixIndex(),
+            Category: PrefixIndex()
+        })
+        suggest_index.built_at -= (
+            settings.SUGGEST_SETTINGS['REBUILD_SECONDS'] + 1
+        )
+        try:
+            with CaptureQueriesContext(connection) as context:
+                data = self.suggest(client, 'фан')
+            assert data['titles'] == [] and not context.captured_queries
+            assert started.wait(5)
+            assert [item['name'] for item in self.suggest(
+                client, 'фа'
+            )['titles']] == ['Последний фараон', 'Фаворит'], (
+                'Проверьте, что во время перестроения подсказки отвечают '
+                'из старого индекса без ожидания.'
+            )
+        finally:
+            release.set()
+            suggest_index.rebuild_thread.join(5)
+        assert [item['name'] for item in self.suggest(
+            client, 'фан'
+        )['titles']] == ['Фантом'], (
+            'Проверьте, что перестроенный индекс подменяет старый.'
+        )
+
+    def test_06_exact_top_by_rating(self, settings):
+        settings.SUGGEST_SETTINGS = {
+            **settings.SUGGEST_SETTINGS, 'MAX_SCAN': 3
+        }
+        random = Random(21)
+        words = ['фа', 'фе', 'фб', 'до', 'дв', 'ма']
+        Title.objects.bulk_create(
+            Title(
+                name=' '.join(random.sample(words, 2)) + f' {number}',
+                year=2000,
+                rating=random.choice([None, *range(1, 11)])
+            )
+            for number in range(80)
+        )
+        Genre.objects.bulk_create(
+            Genre(name=f'{random.choice(words)} {number}', slug=f'g{number}')
+            for number in range(20)
+        )
+        titles = list(Title.objects.values('id', 'name', 'rating'))
+        genres = sorted(Genre.objects.values_list('name', flat=True))
+        for prefix in ('ф', 'фа', 'д', 'дв', 'ма', 'фа 1', 'я'):
+            for limit in (1, 5, 50):
+                data = suggest_index.suggest(prefix, limit)
+                expected = sorted(
+                    (
+                        title for title in titles
+                        if f' {prefix}' in f' {title["name"]}'
+                    ),
+                    key=lambda title: (
+                        -(title['rating'] or 0), title['name'], title['id']
+                    )
+                )[:limit]
+                assert data['titles'] == expected, (
+                    'Проверьте, что подсказки возвращают первые произведения '
+                    'по рейтингу среди всех совпадений.'
+                )
+                assert [item['name'] for item in data['genres']] == [
+                    name for name in genres if f' {prefix}' in f' {name}'
+                ][:limit]
@@ -0,0 +1,152 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+from users.models import User
+from reviews.search import normalize_search
+from tests.test_13_query_plans import get_full_scans
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22NormalizedSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+    CATEGORIES_URL = '/api/v1/categories/'
+    USERS_URL = '/api/v1/users/'
+
+    def names(self, client, url, **params):
+        response = client.get(url, params)
+        assert response.status_code == 200
+        return sorted(item['name'] for item in response.json()['results'])
+
+    def test_01_normalize_search(self):
+        assert normalize_search('  Ёжик в ТУМАНЕ: «Начало»!  ') == (
+            'ежик в тумане начало'
+        )
+        assert normalize_search('Straße') == 'strasse'
+        assert normalize_search(None) == ''
+
+    def test_02_field_follows_writes(self):
+        title = Title.objects.create(name='Ёжик в тумане', year=1975)
+        assert title.name_search == 'ежик в тумане'
+        title.name = 'ЁЛКИ-ПАЛКИ'
+        title.save(update_fields=('name',))
+        title.refresh_from_db()
+        assert title.name_search == 'елки палки', (
+            'Проверьте, что `name_search` обновляется при сохранении '
+            'с `update_fields`.'
+        )
+        genres = Genre.objects.bulk_create([
+            Genre(name='Фэнтези', slug='fantasy'),
+            Genre(name='Драма', slug='drama'),
+        ])
+        assert set(Genre.objects.values_list('name_search', flat=True)) == {
+            'фэнтези', 'драма'
+        }, 'Проверьте, что `bulk_create` заполняет `name_search`.'
+        genres[1].name = 'Трагедия'
+        Genre.objects.bulk_update(genres, ['name'])
+        assert Genre.objects.get(slug='drama').name_search == 'трагедия'
+
+    def test_03_load_csv_fills_field(self, django_user_model):
+        call_command('load_csv', stdout=StringIO())
+        for model in (Title, Genre, Category):
+            for name, name_search in model.objects.values_list(
+                'name', 'name_search'
+            ):
+                assert name_search == normalize_search(name), (
+                    'Проверьте, что `load_csv` заполняет `name_search`.'
+                )
+        for username, username_search in (
+            django_user_model.objects.values_list(
+                'username', 'username_search'
+            )
+        ):
+            assert username_search == normalize_search(username)
+
+    def test_04_title_name_filter(self, client):
+        Title.objects.create(name='Ёжик в тумане', year=1975)
+        Title.objects.create(name='Дракон: Начало', year=2000)
+        assert self.names(client, self.TITLES_URL, name='ЕЖИК') == [
+            'Ёжик в тумане'
+        ], (
+            'Проверьте, что фильтр `name` не учитывает регистр кириллицы '
+            'и различие `ё` и `е`.'
+        )
+        assert self.names(client, self.TITLES_URL, name='дракон начало') == [
+            'Дракон: Начало'
+        ], 'Проверьте, что фильтр `name` не учитывает знаки препинания.'
+        assert len(self.names(client, self.TITLES_URL, name='!')) == 2
+
+    def test_05_search_endpoints(self, client, admin_client, admin):
+        Genre.objects.create(name='Фэнтези', slug='fantasy')
+        Genre.objects.create(name='Драма', slug='drama')
+        Category.objects.create(name='Фильмы', slug='films')
+        assert self.names(client, self.GENRES_URL, search='ФЭН') == [
+            'Фэнтези'
+        ], 'Проверьте, что поиск жанров не учитывает регистр кириллицы.'
+        assert self.names(client, self.CATEGORIES_URL, search='фильм') == [
+            'Фильмы'
+        ]
+        response = admin_client.get(
+            self.USERS_URL, {'search': admin.username.upper()}
+        )
+        assert [
+            user['username'] for user in response.json()['results']
+        ] == [admin.username], (
+            'Проверьте, что поиск пользователей не учитывает регистр.'
+        )
+
+    def test_06_prefix_uses_index(self):
+        Genre.objects.create(name='Драма', slug='drama')
+        with CaptureQueriesContext(connection) as context:
+            slugs = list(Genre.objects.filter(
+                name_search__prefix='дра'
+            ).values_list('slug', flat=True))
+        assert slugs == ['drama']
+        assert not get_full_scans(context.captured_queries[0]['sql']), (
+            'Проверьте, что поиск по началу нормализованного названия '
+            'использует индекс.'
+        )
+
+    def test_07_endpoints_search_by_index(self, client, admin_client):
+        Title.objects.create(name='Крёстный отец', year=1972)
+        Genre.objects.create(name='Мелодрама', slug='melodrama')
+        Category.objects.create(name='Фильмы', slug='films')
+        User.objects.create(username='bingobongo', email='bb@yamdb.fake')
+        for current_client, url, params in (
+            (client, self.TITLES_URL, {'name': 'ОТЕЦ'}),
+            (client, self.TITLES_URL, {'name': 'естный от'}),
+            (client, self.GENRES_URL, {'search': 'Драма'}),
+            (client, self.CATEGORIES_URL, {'search': 'ильм'}),
+            (admin_client, self.USERS_URL, {'search': 'bongo'}),
+        ):
+            with CaptureQueriesContext(connection) as context:
+                response = current_client.get(url, params)
+            assert response.status_code == 200
+            assert len(response.json()['results']) == 1, (
+                f'Проверьте, что `{url}` с параметрами {params} ищет '
+                'подстроку в любом месте названия.'
+            )
+            for query in context.captured_queries:
+                assert not get_full_scans(query['sql']), (
+                    f'Проверьте, что поиск `{url}` с параметрами {params} '
+                    'ищет подстроку по индексу, а не обходит таблицу.'
+                )
+
+    def test_08_short_substring(self, client):
+        Genre.objects.create(name='Мелодрама', slug='melodrama')
+        Genre.objects.create(name='Ужасы', slug='horror')
+        assert self.names(client, self.GENRES_URL, search='ОД') == [
+            'Мелодрама'
+        ], (
+            'Проверьте, что запрос короче трёх символов тоже ищет '
+            'подстроку.'
+        )
+        assert self.names(client, self.GENRES_URL, search='ужасы!') == [
+            'Ужасы'
+        ]
@@ -0,0 +1,71 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23TitleBatch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture
+    def titles(self):
+        category = Category.objects.create(name='Книги', slug='books')
+        genres = [
+            Genre.objects.create(name='Драма', slug='drama'),
+            Genre.objects.create(name='Комедия', slug='comedy'),
+        ]
+        titles = []
+        for number in range(5):
+            title = Title.objects.create(
+                name=f'Произведение {number}', year=2000, category=category
+            )
+            title.genre.set(genres)
+            titles.append(title)
+        return titles
+
+    def test_01_batch_preserves_order(self, client, titles):
+        ids = [titles[3].pk, titles[0].pk, 10 ** 6, titles[4].pk]
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                self.TITLES_URL, {'ids': ','.join(map(str, ids))}
+            )
+        assert response.status_code == 200
+        queries = list(context.captured_queries)
+        data = response.json()
+        assert [item['id'] for item in data['results']] == [
+            titles[3].pk, titles[0].pk, titles[4].pk
+        ], 'Проверьте, что произведения возвращаются в порядке `ids`.'
+        assert data['missing'] == [10 ** 6], (
+            'Проверьте, что ответ перечисляет ненайденные id в `missing`.'
+        )
+        assert data['results'][0] == client.get(
+            f'{self.TITLES_URL}{titles[3].pk}/'
+        ).json(), (
+            'Проверьте, что произведения в пакете сериализуются так же, '
+            'как при запросе по одному.'
+        )
+        assert len(queries) == 2, (
+            'Проверьте, что пакет читается одним запросом произведений '
+            'и одним запросом их жанров.'
+        )
+
+    def test_02_batch_validation(self, client, titles, settings):
+        response = client.get(self.TITLES_URL, {'ids': '1,x'})
+        assert response.status_code == 400
+        settings.BATCH_SETTINGS = {'MAX_SIZE': 3}
+        response = client.get(self.TITLES_URL, {'ids': '1,2,3,4'})
+        assert response.status_code == 400, (
+            'Проверьте, что размер пакета ограничен.'
+        )
+        first, second = titles[0].pk, titles[1].pk
+        data = client.get(
+            self.TITLES_URL, {'ids': f'{first},{first},{second},{first}'}
+        ).json()
+        assert [item['id'] for item in data['results']] == [
+            first, second
+        ], (
+            'Проверьте, что повторяющиеся id возвращаются один раз.'
+        )
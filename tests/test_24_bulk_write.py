@@ -0,0 +1,170 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, GenreTitle, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24BulkWrite:
+
+    TITLES_BULK_URL = '/api/v1/titles/bulk/'
+    GENRES_BULK_URL = '/api/v1/genres/bulk/'
+    CATEGORIES_BULK_URL = '/api/v1/categories/bulk/'
+
+    @pytest.fixture
+    def catalogue(self):
+        Category.objects.create(name='Книги', slug='books')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+
+    def make_titles(self, count):
+        return [
+            {
+                'name': f'Произведение {number}', 'year': 2000,
+                'category': 'books', 'genre': ['drama', 'comedy'][
+                    :number % 2 + 1
+                ],
+            }
+            for number in range(count)
+        ]
+
+    def post_titles(self, client, data):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.TITLES_BULK_URL, data, format='json')
+        return response, len(context.captured_queries)
+
+    def test_01_bulk_create_titles(self, admin_client, catalogue):
+        # Первый запрос загружает соответствие slug → id.
+        self.post_titles(admin_client, self.make_titles(1))
+        response, few_queries = self.post_titles(
+            admin_client, self.make_titles(2)
+        )
+        assert response.status_code == HTTPStatus.CREATED, response.json()
+        response, many_queries = self.post_titles(
+            admin_client, self.make_titles(40)
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        data = response.json()
+        assert len(data) == 40
+        assert data[1]['genre'] == ['drama', 'comedy']
+        assert data[1]['category'] == 'books'
+        assert Title.objects.count() == 43
+        assert GenreTitle.objects.count() == 64
+        assert many_queries == few_queries, (
+            'Проверьте, что массовое создание не ищет каждый slug отдельным '
+            'запросом и пишет произведения через `bulk_create`: число '
+            'запросов не должно зависеть от размера списка.'
+        )
+
+    def test_02_bulk_create_reports_item_errors(self, admin_client,
+                                                catalogue):
+        data = self.make_titles(3)
+        data[1]['genre'] = ['drama', 'horror']
+        data[2]['category'] = 'films'
+        del data[2]['year']
+        response = admin_client.post(self.TITLES_BULK_URL, data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == 3 and errors[0] == {}, (
+            'Проверьте, что ответ содержит ошибки по позициям списка.'
+        )
+        assert set(errors[1]) == {'genre'}
+        assert set(errors[2]) == {'category', 'year'}
+        assert not Title.objects.exists(), (
+            'Проверьте, что при ошибке в элементе ничего не сохраняется.'
+        )
+
+    def test_03_bulk_create_genres_and_categories(self, admin_client,
+                                                  catalogue):
+        response = admin_client.post(self.GENRES_BULK_URL, [
+            {'name': 'Ужасы', 'slug': 'horror'},
+            {'name': 'Мюзикл', 'slug': 'musical'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        assert set(Genre.objects.values_list('slug', flat=True)) == {
+            'drama', 'comedy', 'horror', 'musical'
+        }
+        response = admin_client.post(self.CATEGORIES_BULK_URL, [
+            {'name': 'Книги', 'slug': 'books'},
+            {'name': 'Фильмы', 'slug': 'films'},
+            {'name': 'Кино', 'slug': 'films'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert 'slug' in errors[0] and 'slug' in errors[2], (
+            'Проверьте, что массовое создание отклоняет занятые и '
+            'повторяющиеся slug.'
+        )
+        assert errors[1] == {}
+        assert Category.objects.count() == 1
+
+    def test_04_bulk_update_titles(self, admin_client, client, catalogue):
+        self.post_titles(admin_client, self.make_titles(3))
+        first, second, third = Title.objects.order_by('pk')
+        assert client.get(f'/api/v1/titles/{first.pk}/').status_code == 200
+        response = admin_client.patch(self.TITLES_BULK_URL, [
+            {'id': first.pk, 'name': 'Первое', 'genre': ['comedy']},
+            {'id': third.pk, 'year': 1999},
+        ], format='json')
+        assert response.status_code == HTTPStatus.OK, response.json()
+        assert [item['id'] for item in response.json()] == [
+            first.pk, third.pk
+        ]
+        data = client.get(f'/api/v1/titles/{first.pk}/').json()
+        assert data['name'] == 'Первое' and data['genre'] == [
+            {'name': 'Комедия', 'slug': 'comedy'}
+        ], 'Проверьте, что массовое обновление сбрасывает кеш произведения.'
+        third.refresh_from_db()
+        assert third.year == 1999 and third.genre.count() == 1
+        assert second.genre.count() == 2
+
+        response = admin_client.patch(self.TITLES_BULK_URL, [
+            {'id': second.pk, 'name': 'Второе'},
+            {'id': 10 ** 6, 'name': 'Нет'},
+        ], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'id' in response.json()[1]
+        second.refresh_from_db()
+        assert second.name == 'Произведение 1'
+
+    def test_05_bulk_delete(self, admin_client, catalogue):
+        self.post_titles(admin_client, self.make_titles(3))
+        ids = list(Title.objects.values_list('pk', flat=True))
+        response = admin_client.delete(
+            self.TITLES_BULK_URL, [ids[0], 'x'], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.delete(
+            self.TITLES_BULK_URL, [ids[0], ids[2], 10 ** 6], format='json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'deleted': 2, 'missing': [10 ** 6]}
+        assert list(Title.objects.values_list('pk', flat=True)) == [ids[1]]
+        response = admin_client.delete(
+            self.GENRES_BULK_URL, ['drama', 'horror'], format='json'
+        )
+        assert response.json() == {'deleted': 1, 'missing': ['horror']}
+        assert not Genre.objects.filter(slug='drama').exists()
+
+    def test_06_bulk_access_and_limits(self, admin_client, user_client,
+                                       catalogue, settings):
+        response = user_client.post(
+            self.TITLES_BULK_URL, self.make_titles(1), format='json'
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.patch(self.GENRES_BULK_URL, [], format='json')
+        assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED
+        response = admin_client.post(
+            self.TITLES_BULK_URL, {'name': 'Одно'}, format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        settings.BATCH_SETTINGS = {'MAX_SIZE': 100, 'MAX_WRITE_SIZE': 2}
+        response = admin_client.post(
+            self.TITLES_BULK_URL, self.make_titles(3), format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что размер списка ограничен.'
+        )
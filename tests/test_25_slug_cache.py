@@ -0,0 +1,124 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import TitleWriteSerializer
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25SlugCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+
+    @pytest.fixture
+    def catalogue(self):
+        Category.objects.create(name='Книги', slug='books')
+        for number in range(5):
+            Genre.objects.create(name=f'Жанр {number}', slug=f'genre-{number}')
+
+    def get_data(self, **fields):
+        return {
+            'name': 'Произведение', 'year': 2000, 'category': 'books',
+            'genre': [f'genre-{number}' for number in range(5)], **fields
+        }
+
+    def test_01_validation_without_lookups(self, catalogue):
+        assert TitleWriteSerializer(data=self.get_data()).is_valid()
+        with CaptureQueriesContext(connection) as context:
+            serializer = TitleWriteSerializer(data=self.get_data())
+            assert serializer.is_valid(), serializer.errors
+        assert not context.captured_queries, (
+            'Проверьте, что slug категории и жанров разрешаются без '
+            'запросов к БД.'
+        )
+        title = serializer.save()
+        assert title.category.name == 'Книги'
+        assert sorted(title.genre.values_list('slug', flat=True)) == [
+            f'genre-{number}' for number in range(5)
+        ]
+
+    def test_02_map_follows_writes(self, admin_client, catalogue):
+        response = admin_client.post(
+            self.TITLES_URL, self.get_data(genre=['new']), format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        admin_client.post(
+            self.GENRES_URL, {'name': 'Новый', 'slug': 'new'}, format='json'
+        )
+        response = admin_client.post(
+            self.TITLES_URL, self.get_data(genre=['new']), format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что новый жанр сразу доступен при записи '
+            'произведения.'
+        )
+        assert response.json()['genre'] == ['new']
+        admin_client.delete(f'{self.GENRES_URL}genre-0/')
+        response = admin_client.post(
+            self.TITLES_URL, self.get_data(), format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что удалённый жанр больше не принимается.'
+        )
+        assert 'genre' in response.json()
+        assert Title.objects.count() == 1
+
+    def test_03_out_of_band_insert(self, admin_client, catalogue):
+        assert TitleWriteSerializer(data=self.get_data()).is_valid()
+        Genre.objects.bulk_create([Genre(name='Новый', slug='new')])
+        response = admin_client.post(
+            self.TITLES_URL, self.get_data(genre=['new']), format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что slug, которого нет в словаре, ищется в БД '
+            'перед ошибкой.'
+        )
+        assert response.json()['genre'] == ['new']
+        with CaptureQueriesContext(connection) as context:
+            assert TitleWriteSerializer(
+                data=self.get_data(genre=['new'])
+            ).is_valid()
+        assert not context.captured_queries, (
+            'Проверьте, что найденный slug запоминается в словаре.'
+        )
+
+    def delete_out_of_band(self, slug):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {Genre._meta.db_table} WHERE slug = %s', [slug]
+            )
+
+    def test_04_out_of_band_delete(self, admin_client, catalogue):
+        assert TitleWriteSerializer(data=self.get_data()).is_valid()
+        self.delete_out_of_band('genre-0')
+        response = admin_client.post(
+            self.TITLES_URL, self.get_data(), format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что ссылка на удалённый в обход словаря жанр '
+            'возвращает ошибку 400, а не 500.'
+        )
+        assert 'genre-0' in str(response.json()['genre'])
+        assert not Title.objects.exists()
+        response = admin_client.post(
+            self.TITLES_URL, self.get_data(genre=['genre-1']), format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_05_out_of_band_delete_bulk(self, admin_client, catalogue):
+        assert TitleWriteSerializer(data=self.get_data()).is_valid()
+        self.delete_out_of_band('genre-0')
+        response = admin_client.post(
+            f'{self.TITLES_URL}bulk/', [self.get_data()], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert not Title.objects.exists()
+        response = admin_client.post(
+            f'{self.TITLES_URL}bulk/', [self.get_data()], format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'genre' in response.json()[0]
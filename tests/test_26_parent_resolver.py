@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ParentResolver:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/'
+    )
+
+    def post(self, client, url, data):
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(url, data)
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(('SELECT', 'INSERT', 'UPDATE'))
+        ]
+        return response, queries
+
+    def test_01_review_create_queries(self, user_client, admin_client):
+        title = Title.objects.create(name='Произведение', year=2000)
+        other = Title.objects.create(name='Другое', year=2000)
+        # Первый запрос прогревает кеши токена и версий.
+        admin_client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=other.pk),
+            {'text': 'Текст', 'score': 5}
+        )
+        response, queries = self.post(
+            user_client, self.REVIEWS_URL_TEMPLATE.format(title_id=title.pk),
+            {'text': 'Текст', 'score': 5}
+        )
+        assert response.status_code == HTTPStatus.CREATED, response.json()
+        title_lookups = [
+            sql for sql in queries
+            if sql.startswith('SELECT') and '"reviews_title"."name"' in sql
+        ]
+        assert len(title_lookups) == 1, (
+            'Проверьте, что произведение из URL загружается один раз на '
+            'запрос и переиспользуется при проверке и сохранении отзыва.'
+        )
+        assert len(queries) == 4, queries
+
+    def test_02_comment_chain_checked(self, user_client, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        other = Title.objects.create(name='Другое', year=2000)
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=5
+        )
+        comment = Comment.objects.create(
+            review=review, author=user, text='Комментарий'
+        )
+        response, queries = self.post(
+            user_client, self.COMMENTS_URL_TEMPLATE.format(
+                title_id=title.pk, review_id=review.pk
+            ), {'text': 'Ещё'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        review_lookups = [
+            sql for sql in queries
+            if sql.startswith('SELECT') and 'FROM "reviews_review"' in sql
+        ]
+        assert len(review_lookups) == 1
+
+        urls = (
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=other.pk, review_id=review.pk
+            ),
+            self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                title_id=other.pk, review_id=review.pk, comment_id=comment.pk
+            ),
+        )
+        for url in urls:
+            assert user_client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что отзыв из URL должен относиться к '
+                'произведению из URL.'
+            )
+        response = user_client.post(urls[0], {'text': 'Ещё'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert Comment.objects.count() == 2
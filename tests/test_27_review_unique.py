@@ -0,0 +1,48 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27ReviewUnique:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    DUPLICATE_ERROR = {
+        'non_field_errors': ['Вы уже оставили отзыв на это произведение']
+    }
+
+    def test_01_no_duplicate_precheck(self, user_client):
+        title = Title.objects.create(name='Произведение', year=2000)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.pk)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, {'text': 'Текст', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        assert not [
+            query for query in context.captured_queries
+            if 'FROM "reviews_review"' in query['sql']
+        ], (
+            'Проверьте, что перед созданием отзыва не выполняется запрос '
+            'на проверку повтора: его отклоняет ограничение в БД.'
+        )
+
+        response = user_client.post(url, {'text': 'Ещё', 'score': 3})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == self.DUPLICATE_ERROR
+        assert Review.objects.count() == 1
+
+    def test_02_concurrent_duplicate(self, user_client, user):
+        title = Title.objects.create(name='Произведение', year=2000)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.pk)
+        # Отзыв появился после того, как запрос прошел проверку данных.
+        Review.objects.create(title=title, author=user, text='Т', score=1)
+        response = user_client.post(url, {'text': 'Текст', 'score': 5})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == self.DUPLICATE_ERROR
+        title.refresh_from_db()
+        assert title.rating == 1, (
+            'Проверьте, что отклоненный отзыв не меняет рейтинг.'
+        )
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.mixins import RowReadMixin
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28RowSerializers:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @pytest.fixture
+    def catalogue(self, user, admin, moderator):
+        books = Category.objects.create(name='Книги', slug='books')
+        films = Category.objects.create(name='Фильмы', slug='films')
+        genres = [
+            Genre.objects.create(name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(4)
+        ]
+        titles = []
+        for number in range(15):
+            title = Title.objects.create(
+                name=f'Произведение «{number}»', year=1990 + number % 4,
+                category=(books, films, None)[number % 3],
+                description=None if number % 2 else f'Описание {number}'
+            )
+            title.genre.set(genres[number % 3:number % 3 + number % 4])
+            titles.append(title)
+        date = datetime(2024, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+        for number, author in enumerate((user, admin, moderator)):
+            review = Review.objects.create(
+                title=titles[0], author=author, text=f'Отзыв {number}',
+                score=number + 5
+            )
+            for comment_number in range(12):
+                Comment.objects.create(
+                    review=review, author=author,
+                    text=f'Ответ {comment_number}'
+                )
+        # Одинаковые даты проверяют порядок по id внутри курсора.
+        Review.objects.update(pub_date=date)
+        Comment.objects.filter(pk__lte=6).update(pub_date=date)
+        Comment.objects.filter(pk__gt=6).update(
+            pub_date=date + timedelta(seconds=1)
+        )
+        return titles, Review.objects.order_by('pk').first()
+
+    def get_both(self, client, monkeypatch, url, params=None):
+        """Ответы быстрого пути и обычных сериализаторов на один запрос"""
+        cache.clear()
+        fast = client.get(url, params)
+        cache.clear()
+        with monkeypatch.context() as patch:
+            patch.setattr(RowReadMixin, 'use_rows', lambda self: False)
+            slow = client.get(url, params)
+        assert fast.status_code == slow.status_code == 200, url
+        return fast.content, slow.content
+
+    def assert_identical(self, client, monkeypatch, url, params=None):
+        fast, slow = self.get_both(client, monkeypatch, url, params)
+        assert fast == slow, (
+            'Проверьте, что сериализатор строк отдаёт тот же JSON, что и '
+            f'обычный сериализатор: `{url}` с параметрами {params}.'
+        )
+        return fast
+
+    def test_01_titles_identical(self, client, monkeypatch, catalogue):
+        titles, _ = catalogue
+        for params in (
+            None,
+            {'page': 2},
+            {'genre': 'genre-1'},
+            {'category': 'books', 'year': 1991},
+            {'ordering': '-rating,name'},
+            {'search': 'Описание'},
+            {'ids': ','.join(str(title.pk) for title in titles[::-2])},
+        ):
+            self.assert_identical(client, monkeypatch, self.TITLES_URL, params)
+        for title in titles[:4]:
+            self.assert_identical(
+                client, monkeypatch, f'{self.TITLES_URL}{title.pk}/'
+            )
+
+    def test_02_reviews_and_comments_identical(self, client, monkeypatch,
+                                               catalogue):
+        titles, review = catalogue
+        urls = (
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0].pk),
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=titles[0].pk, review_id=review.pk
+            ),
+        )
+        for url in urls:
+            for params in (None, {'cursor': ''}):
+                self.assert_identical(client, monkeypatch, url, params)
+        self.assert_identical(client, monkeypatch, urls[1], {'page': 2})
+        page = client.get(urls[1], {'cursor': ''}).json()
+        while page['next']:
+            self.assert_identical(client, monkeypatch, page['next'])
+            page = client.get(page['next']).json()
+
+    def test_03_titles_without_model_serialization(self, client, catalogue):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL)
+        queries = [query['sql'] for query in context.captured_queries]
+        assert response.status_code == 200
+        assert len(response.json()['results']) == 10
+        assert not [sql for sql in queries if 'name_search' in sql], (
+            'Проверьте, что список произведений читает только поля ответа '
+            'через `values()`.'
+        )
+
+    def test_04_browsable_api_uses_serializers(self, client, catalogue):
+        response = client.get(self.TITLES_URL, HTTP_ACCEPT='text/html')
+        assert response.status_code == 200